@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : bench_stories.py
+    Description : cost of generating 1M stories by batches (NumPy draws when
+                  installed, pure Python otherwise) against one at a time
+                  (core_process.iter_stories)
+    Python Version : 3.6
+
+    Usage : python benchmarks/bench_stories.py [number of stories]
+"""
+
+import sys
+import time
+import random
+from xwords import core_batch
+from xwords.core_batch import iter_batch_stories
+from xwords.core_process import iter_stories
+
+entities_dic = {
+    "@[subject]": ["subject value %d" % k for k in range(1000)],
+    "@[geo]": ["country number %d" % k for k in range(200)],
+    "@[time]": ["period %d" % k for k in range(50)],
+    "@[channel]": ["channel %d" % k for k in range(5)],
+}
+
+
+def run(name, stories, count):
+    start = time.perf_counter()
+    for _ in stories:
+        pass
+    seconds = time.perf_counter() - start
+    print("%-16s %8.3f s  %8.3f us/story" % (name, seconds,
+                                             seconds / count * 10**6))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    run("one at a time", iter_stories("acquisition", entities_dic, count,
+                                      rng=random.Random(0)), count)
+    if core_batch.np is not None:
+        run("batch (numpy)", iter_batch_stories("acquisition", entities_dic,
+                                                count, seed=0), count)
+    numpy, core_batch.np = core_batch.np, None
+    run("batch (python)", iter_batch_stories("acquisition", entities_dic,
+                                             count, seed=0), count)
+    core_batch.np = numpy
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : bench_templates.py
+    Description : per-sentence cost of compiled templates against successive
+                  str.replace calls
+    Python Version : 3.6
+
+    Usage : python benchmarks/bench_templates.py
+"""
+
+import itertools
+import timeit
+from xwords.core_process import replace_in_str
+from xwords.core_template import SentenceTemplate, get_placeholders
+
+sentence = ("could you tell me ~[please] how many @[subject] were sold in "
+            "@[geo] @[time] through @[channel] for @[segment] ~[thanks]")
+replacement_dic = {
+    "@[subject]": ["subject value %d" % k for k in range(12)],
+    "@[geo]": ["country number %d" % k for k in range(10)],
+    "@[time]": ["period %d" % k for k in range(8)],
+    "@[channel]": ["channel %d" % k for k in range(5)],
+    "@[segment]": ["segment %d" % k for k in range(4)],
+    "~[please]": ["please", "kindly"],
+    "~[thanks]": ["thanks", "thank you", "cheers"],
+}
+
+
+def replace_loop():
+    # per-combination work done before templates were compiled
+    placeholder_list = get_placeholders(sentence, replacement_dic)
+    placeholder_replacements = [replacement_dic[pos]
+                                for pos in placeholder_list]
+    for combi in itertools.product(*placeholder_replacements):
+        sentence_mod = sentence
+        for i in range(len(placeholder_list)):
+            sentence_mod = replace_in_str(sentence_mod, placeholder_list[i],
+                                          list(combi)[i])
+
+
+def template_loop():
+    for _ in SentenceTemplate(sentence, replacement_dic):
+        pass
+
+
+if __name__ == "__main__":
+    count = len(SentenceTemplate(sentence, replacement_dic))
+    for name, func in (("str.replace", replace_loop),
+                       ("template", template_loop)):
+        seconds = min(timeit.repeat(func, number=1, repeat=3))
+        print("%-12s %8.3f s  %8.3f us/sentence"
+              % (name, seconds, seconds / count * 10**6))
@@ -14,6 +14,13 @@ setup(
     description="Chat bot sentences & story generator.",
     long_description=open('README.md').read(),
     include_package_data=True,
+    extras_require={
+        # vectorized random draws for batch story generation
+        "fast": ["numpy"],
+    },
+    entry_points={
+        "console_scripts": ["xwords = xwords.cli:main"],
+    },
     license='MIT',
     url='https://github.com/data-chirps/xwords',
     classifiers=[
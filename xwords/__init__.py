@@ -2,6 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from xwords.core_parse import parse_input
+from xwords.core_process import combination_report
+from xwords.core_compile import compile_config, load_compiled
 from xwords.core_output import generate
+from xwords.core_corpus import generate_corpus
+from xwords.core_grammar import Grammar
 
-__all__ = ["parse_input", "generate"]
+__all__ = ["parse_input", "generate", "combination_report", "compile_config",
+           "load_compiled", "generate_corpus", "Grammar"]
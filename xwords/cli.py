@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: cli.py
+    Description: command line interface, e.g.
+                 xwords compile config.txt
+                 xwords generate config.txt --n-sub 1000
+    Python Version: 3.6
+"""
+
+import argparse
+from .core_compile import compile_config
+from .core_output import generate
+
+
+def build_parser():
+    """
+    Summary
+    ----------
+    Building the parser of the xwords command
+
+    Returns
+    -------
+        argparse.ArgumentParser with one sub-command per action
+
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="xwords", description="Chat bot sentences & story generator.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    compile_parser = commands.add_parser(
+        "compile", help="compile a config file into a binary file reused by "
+                        "generate while the config file is unchanged")
+    compile_parser.add_argument("input_path", help="path to config file")
+    compile_parser.add_argument("-o", "--output", dest="compiled_path",
+                                help="path to the compiled file (defaults to "
+                                     "the config path followed by .xwc)")
+
+    generate_parser = commands.add_parser(
+        "generate", help="generate train and test files for Rasa NLU/Core")
+    generate_parser.add_argument("input_path", help="path to config file")
+    generate_parser.add_argument("--output-path", default="./xwords/outputs/")
+    generate_parser.add_argument("--intent", dest="intent_string")
+    generate_parser.add_argument("--prefix", dest="output_prefix", default='')
+    generate_parser.add_argument("--training-ratio", type=float, default=1.0)
+    generate_parser.add_argument("--story", dest="for_story",
+                                 action="store_true")
+    generate_parser.add_argument("--n-sub", type=int)
+    generate_parser.add_argument("--dry-run", action="store_true")
+    generate_parser.add_argument("--max-combinations", type=int)
+    generate_parser.add_argument("--workers", type=int, default=1)
+    generate_parser.add_argument("--seed", type=int)
+    generate_parser.add_argument("--split", default="exact",
+                                 choices=["exact", "bernoulli", "hash"])
+    generate_parser.add_argument("--format", dest="output_format",
+                                 default="md",
+                                 choices=["md", "jsonl", "rasa_json"])
+    generate_parser.add_argument("--compression",
+                                 choices=["gzip", "bz2", "lzma"])
+    generate_parser.add_argument("--cache-dir")
+    generate_parser.add_argument("--coverage",
+                                 help="full, pairwise or <t>-wise")
+    generate_parser.add_argument("--distinct-stories", action="store_true")
+    generate_parser.add_argument("--dedup", choices=["exact", "bloom"])
+    generate_parser.add_argument("--shard", type=int,
+                                 help="index of the shard to generate, in "
+                                      "range(--num-shards)")
+    generate_parser.add_argument("--num-shards", type=int, default=1)
+    generate_parser.add_argument("--shuffle", action="store_true")
+    generate_parser.add_argument("--synonyms",
+                                 choices=["annotate", "canonical"])
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Summary
+    ----------
+    Entry point of the xwords command
+
+    Parameters
+    ----------
+    argv:
+        list of command line arguments. If None, uses sys.argv
+
+    Returns
+    -------
+        None
+
+    """
+
+    arguments = vars(build_parser().parse_args(argv))
+    command = arguments.pop("command")
+
+    if command == "compile":
+        compile_config(**arguments)
+    else:
+        generate(**arguments)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_batch.py
+    Description: batch story generation: the entities given in the first
+                 user input, their order and their values are drawn for
+                 thousands of stories at once (with NumPy when installed),
+                 then each story is assembled with a single join
+    Python Version: 3.6
+"""
+
+import random
+from .core_grammar import get_grammar
+from .core_template import format_values
+from .core_weights import get_alias_table
+
+try:
+    import numpy as np
+except ImportError:  # pure Python draws, see _draw_python
+    np = None
+
+# number of stories whose random choices are drawn together
+STORY_BATCH_SIZE = 10000
+
+
+class StoryFormatter(object):
+    """
+    Summary
+    ----------
+    Constant pieces of the stories of an intent, joined with the values of
+    each story
+
+    Parameters
+    ----------
+    intent_string:
+        intent of the stories to be generated
+    keys:
+        list of the entities of the stories
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    """
+
+    def __init__(self, intent_string, keys, grammar=None):
+        if intent_string is None:
+            raise ValueError("stories need an intent_string")
+        grammar = get_grammar(grammar)
+        self.request = "\n* " + intent_string + "{"
+        self.asks = ["    - utter_ask_" + grammar.strip(key)
+                     + "\n* " + intent_string + "{" for key in keys]
+        self.action = "    - action_" + intent_string + "\n"
+
+    def join(self, story_id, inputs, asked, combi):
+        """
+        Summary
+        ----------
+        Building a story
+
+        Parameters
+        ----------
+        story_id:
+            number of the story, written in its title
+        inputs:
+            positions of the entities given in the first user input
+        asked:
+            positions of the entities the bot asks for, in order
+        combi:
+            formatted value of each entity, "entity": "value"
+
+        Returns
+        -------
+        String
+            story in Rasa Core markdown format
+
+        """
+
+        parts = ["## Generated Story ", str(story_id), self.request,
+                 ", ".join([combi[e] for e in inputs]), "}\n"]
+        for e in inputs:
+            parts += ("    - slot{", combi[e], "}\n")
+        for e in asked:
+            parts += (self.asks[e], combi[e], "}\n    - slot{", combi[e],
+                      "}\n")
+        parts.append(self.action)
+        return "".join(parts)
+
+
+def _draw_numpy(rng, size, cardinalities, tables):
+    nb_entities = len(cardinalities)
+    nb_inputs = rng.integers(0, nb_entities + 1, size)
+    # sorting random keys gives a uniform random order of the entities, the
+    # first nb_inputs ones being given in the first user input
+    orders = np.argsort(rng.random((size, nb_entities)), axis=1)
+    columns = list()
+    for cardinality, table in zip(cardinalities, tables):
+        if table is None:
+            columns.append(rng.integers(0, cardinality, size))
+            continue
+        # alias method, for all stories at once
+        prob = np.frombuffer(table.prob, dtype=np.float64)
+        alias = np.frombuffer(table.alias, dtype=np.dtype(
+            table.alias.typecode)).astype(np.int64)
+        drawn = (rng.random(size) * cardinality).astype(np.int64)
+        columns.append(np.where(rng.random(size) < prob[drawn], drawn,
+                                alias[drawn]))
+    indices = np.stack(columns, axis=1) if columns \
+        else np.zeros((size, 0), dtype=np.int64)
+    ids = (rng.random(size) * 10**15).astype(np.int64)
+    return nb_inputs.tolist(), orders.tolist(), indices.tolist(), ids.tolist()
+
+
+def _draw_python(rng, size, cardinalities, tables):
+    nb_entities = len(cardinalities)
+    nb_inputs = [rng.randint(0, nb_entities) for _ in range(size)]
+    orders = [rng.sample(range(nb_entities), nb_entities)
+              for _ in range(size)]
+    indices = [[rng.randrange(cardinality) if table is None
+                else table.draw(rng)
+                for cardinality, table in zip(cardinalities, tables)]
+               for _ in range(size)]
+    ids = [int(rng.random() * 10**15) for _ in range(size)]
+    return nb_inputs, orders, indices, ids
+
+
+def iter_batch_stories(intent_string, entities_dic, n_sub, grammar=None,
+                       seed=None, batch_size=STORY_BATCH_SIZE):
+    """
+    Summary
+    ----------
+    Generating stories by batches, with the same structure as iter_stories:
+    a random subset of the entities is given in the first user input, in
+    random order, and the bot asks for the others. Random choices of a whole
+    batch are drawn together, with NumPy arrays when NumPy is installed, and
+    each story is joined from preformatted pieces, without regular
+    expressions
+
+    Parameters
+    ----------
+    intent_string:
+        intent of the stories to be generated
+    entities_dic:
+        dictionary of all entities to generate combinations
+    n_sub:
+        number of stories to create
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    seed:
+        integer seed of the random generator. If None, a random one is drawn.
+        Stories differ whether NumPy is installed or not
+    batch_size:
+        number of stories drawn together
+
+    Returns
+    -------
+    Generator
+        yields generated stories with values placed
+
+    """
+
+    grammar = get_grammar(grammar)
+    if entities_dic == {} or not n_sub:
+        return
+
+    keys = list(entities_dic)
+    cardinalities = [len(entities_dic[key]) for key in keys]
+    tables = [get_alias_table(entities_dic[key]) for key in keys]
+    values = [format_values(entities_dic[key], key, True, grammar)
+              for key in keys]
+    if np is not None:
+        rng, draw = np.random.default_rng(seed), _draw_numpy
+    else:
+        rng, draw = random.Random(seed), _draw_python
+
+    formatter = StoryFormatter(intent_string, keys, grammar)
+
+    for start in range(0, n_sub, batch_size):
+        size = min(batch_size, n_sub - start)
+        for nb_input, order, positions, story_id in zip(
+                *draw(rng, size, cardinalities, tables)):
+            combi = [column[k] for column, k in zip(values, positions)]
+            yield formatter.join(story_id, order[:nb_input],
+                                 sorted(order[nb_input:]), combi)
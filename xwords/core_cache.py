@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_cache.py
+    Description: on-disk cache of the sentences generated for each intent, so
+                 that only intents whose inputs changed are regenerated
+    Python Version: 3.6
+"""
+
+import os
+import json
+import hashlib
+from .core_template import SentenceTemplate, get_placeholders
+from .core_coverage import coverage_strength
+from .core_grammar import get_grammar
+from .core_synonyms import get_canonical_values
+
+# bumped whenever the generated output changes for identical inputs
+CACHE_VERSION = 1
+
+
+def intent_key(intent_sentence, replacement_dic, annotated=False,
+               grammar=None, constraints=None, coverage=None):
+    """
+    Summary
+    ----------
+    Hashing an intent sentence together with the value lists of the entities
+    and aliases it references
+
+    Parameters
+    ----------
+    intent_sentence:
+        intent sentence to be generated
+    replacement_dic:
+        merged dictionary of entities and aliases
+    annotated:
+        whether examples with entity offsets are generated
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, only the ones applying to the
+        intent sentence being hashed
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+
+    Returns
+    -------
+    String
+        hexadecimal digest, changing whenever the generated sentences would
+
+    """
+
+    placeholders = get_placeholders(intent_sentence, replacement_dic, grammar)
+    inputs = [CACHE_VERSION, intent_sentence, annotated,
+              list(get_grammar(grammar).sigils),
+              [[key, _values_fingerprint(replacement_dic[key])]
+               for key in placeholders],
+              [pairs for pairs in constraints or ()
+               if all(key in placeholders for key, _ in pairs)],
+              coverage_strength(coverage)]
+    return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
+
+def _values_fingerprint(values):
+    # file-backed sources are hashed from their content, without being loaded
+    if hasattr(values, "digest"):
+        return [type(values).__name__, values.digest()]
+    canonicals = get_canonical_values(values)
+    if canonicals is not None:
+        return [list(values), canonicals]
+    return list(values)
+
+
+def iter_cached_sentences(intents_list, entities_dic, aliases_dic, cache_dir,
+                          grammar=None, annotated=False, constraints=None,
+                          coverage=None, templates=None):
+    """
+    Summary
+    ----------
+    Generating all placeholder combinations for all source sentences, reading
+    the sentences of unchanged intents from cache_dir and caching the others
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file
+    aliases_dic:
+        dictionnary of all aliases in source config file
+    cache_dir:
+        path (string) to the folder holding one cache file per intent
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    annotated:
+        if True, yields examples with entity offsets instead of sentences
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        core_process.build_templates, used for the intents not in cache. If
+        None, they are built when needed
+
+    Returns
+    -------
+    Generator
+        yields the same sentences as iter_sentences, in the same order
+
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    replacement_dic = {**entities_dic, **aliases_dic}
+    hits = 0
+
+    for i, intent_sentence in enumerate(intents_list):
+        cache_path = os.path.join(cache_dir, intent_key(
+            intent_sentence, replacement_dic, annotated, grammar,
+            constraints, coverage) + ".jsonl")
+
+        if os.path.exists(cache_path):
+            hits += 1
+            with open(cache_path, mode='r', encoding="utf-8") as cache_file:
+                for line in cache_file:
+                    yield json.loads(line)
+            continue
+
+        # written under a temporary name, so that an interrupted run never
+        # leaves a partial cache file behind
+        if templates is not None:
+            template = templates[i]
+        else:
+            template = SentenceTemplate(intent_sentence, replacement_dic,
+                                        False, grammar, constraints, coverage)
+        temp_path = cache_path + ".%d.tmp" % os.getpid()
+        try:
+            with open(temp_path, mode='w', encoding="utf-8") as cache_file:
+                for sentence in template.iter_range(annotated=annotated):
+                    cache_file.write(json.dumps(sentence) + "\n")
+                    yield sentence
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    print(hits, "intents read from cache,", len(intents_list) - hits,
+          "regenerated")
@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_compile.py
+    Description: helper functions to compile a parsed config file into a
+                 memory-mappable binary file, reused while the source is
+                 unchanged
+    Python Version: 3.6
+"""
+
+import os
+import mmap
+import array
+import struct
+import hashlib
+from collections.abc import Sequence
+from .core_parse import parse_config
+from .core_expand import expand_config, get_references
+from .core_sources import parse_source
+from .core_weights import AliasTable
+from .core_synonyms import SynonymTree, ROOT
+
+MAGIC = b"XWC5"
+# magic, sha256 of the source file, then the number of strings, intents,
+# entities, aliases, constraint paragraphs, values, value weights and value
+# parents, padded to 8 bytes
+HEADER = struct.Struct("<4s32s8Q4x")
+# number of ids describing an entity, alias or constraint paragraph
+GROUP_SIZE = 4
+COMPILED_SUFFIX = ".xwc"
+# number of values marking an entity or alias stored as a source directive
+SOURCE_DIRECTIVE = 0xFFFFFFFF
+# flags of an entity or alias whose values are weighted, have synonyms, or
+# reference other entities or aliases
+WEIGHTED = 1
+SYNONYMS = 2
+NESTED = 4
+
+
+def source_digest(input_path):
+    """
+    Summary
+    ----------
+    Hashing a config file without parsing it
+
+    Parameters
+    ----------
+    input_path:
+        path to config file
+
+    Returns
+    -------
+        sha256 digest (bytes) of the file content
+
+    """
+
+    digest = hashlib.sha256()
+    with open(input_path, mode='rb') as input_file:
+        for chunk in iter(lambda: input_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class StringTable(object):
+    """
+    Summary
+    ----------
+    Interned strings of a compiled file, decoded on access from the
+    memory-mapped file
+
+    Parameters
+    ----------
+    compiled_path:
+        path to the compiled file
+
+    """
+
+    def __init__(self, compiled_path):
+        self.path = compiled_path
+        with open(compiled_path, mode='rb') as compiled_file:
+            self.buffer = mmap.mmap(compiled_file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        (magic, self.digest, self.nb_strings, self.nb_intents,
+         self.nb_entities, self.nb_aliases, self.nb_constraints,
+         self.nb_values, self.nb_weights,
+         self.nb_parents) = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(compiled_path + " is not a compiled config file")
+
+        # sections follow the header, each one 8-byte aligned
+        position = HEADER.size
+        self.offsets = memoryview(self.buffer)[
+            position:position + 8 * (self.nb_strings + 1)].cast("Q")
+        position += 8 * (self.nb_strings + 1)
+        self.ids = memoryview(self.buffer)[position:].cast("B")
+        self.nb_groups = (self.nb_entities + self.nb_aliases
+                          + self.nb_constraints)
+        # parent of each value (as signed integers, ROOT being -1), when
+        # some values have synonyms
+        self.parents = memoryview(self.buffer)[
+            position + 4 * (self.nb_intents + GROUP_SIZE * self.nb_groups
+                            + self.nb_values):].cast("B")
+        position += 4 * _aligned(self.nb_intents + GROUP_SIZE * self.nb_groups
+                                 + self.nb_values + self.nb_parents)
+        # weight of each value, when some values are weighted
+        self.weights = memoryview(self.buffer)[
+            position:position + 8 * self.nb_weights].cast("d")
+        self.blob = position + 8 * self.nb_weights
+
+    def __reduce__(self):
+        # mmaps cannot be pickled: worker processes map the file again
+        return StringTable, (self.path,)
+
+    def __len__(self):
+        return self.nb_strings
+
+    def __getitem__(self, string_id):
+        return self.buffer[self.blob + self.offsets[string_id]:
+                           self.blob + self.offsets[string_id + 1]
+                           ].decode("utf-8")
+
+    def id_array(self, start, count):
+        """
+        Summary
+        ----------
+        Viewing count string ids stored from position start of the ids section
+
+        Returns
+        -------
+            memoryview of unsigned 32 bits integers
+
+        """
+
+        return self.ids[4 * start:4 * (start + count)].cast("I")
+
+    def parent_array(self, start, count):
+        """
+        Summary
+        ----------
+        Viewing the parents of count values stored from position start of the
+        values section
+
+        Returns
+        -------
+            memoryview of signed 32 bits integers
+
+        """
+
+        return self.parents[4 * start:4 * (start + count)].cast("i")
+
+
+class MappedStrings(Sequence):
+    """
+    Summary
+    ----------
+    Read-only list of strings backed by a compiled file: only string ids are
+    held, strings are decoded when accessed
+
+    Parameters
+    ----------
+    table:
+        StringTable of the compiled file
+    start:
+        position of the first id in the ids section of the file
+    count:
+        number of strings
+    weights_start:
+        position of the weight of the first string in the weights section of
+        the file, None if the strings are not weighted
+    parents_start:
+        position of the parent of the first string in the parents section of
+        the file, None if the strings have no synonyms
+    nested:
+        False if no string references another entity or alias, so that they
+        are not scanned for placeholders (see core_expand.get_references)
+
+    """
+
+    def __init__(self, table, start, count, weights_start=None,
+                 parents_start=None, nested=True):
+        self.table = table
+        self.start = start
+        self.count = count
+        self.weights_start = weights_start
+        self.parents_start = parents_start
+        self.nested = nested
+        self._ids = table.id_array(start, count)
+        if weights_start is not None:
+            self.weights = table.weights[weights_start:weights_start + count]
+        self.synonyms = None
+        if parents_start is not None:
+            self.synonyms = SynonymTree(table.parent_array(parents_start,
+                                                           count))
+        self._table = None
+
+    def __reduce__(self):
+        return MappedStrings, (self.table, self.start, self.count,
+                               self.weights_start, self.parents_start,
+                               self.nested)
+
+    @property
+    def alias_table(self):
+        if self._table is None:
+            self._table = AliasTable(self.weights)
+        return self._table
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table[string_id] for string_id in self._ids[index]]
+        return self.table[self._ids[index]]
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self):
+        return "MappedStrings(" + repr(list(self)) + ")"
+
+
+def _aligned(nb_ids):
+    # number of 4 bytes ids rounded up to keep the next section 8-byte aligned
+    return nb_ids + nb_ids % 2
+
+
+def compile_config(input_path, compiled_path=None):
+    """
+    Summary
+    ----------
+    Parsing a config file once and serializing its intents, entities,
+    aliases and constraints into a compact binary file with interned strings
+
+    Parameters
+    ----------
+    input_path:
+        path to config file
+    compiled_path:
+        path to the compiled file. If None, COMPILED_SUFFIX is appended to
+        input_path, where load_config looks for it
+
+    Returns
+    -------
+    String
+        path to the compiled file
+
+    """
+
+    if compiled_path is None:
+        compiled_path = input_path + COMPILED_SUFFIX
+    digest = source_digest(input_path)
+    constraints_dic = dict()
+    # values are stored as written, nested placeholders being expanded when
+    # the compiled file is loaded
+    intents_list, entities_dic, aliases_dic = parse_config(
+        input_path, constraints_dic=constraints_dic, expand=False)
+
+    strings = dict()
+
+    def intern(string):
+        return strings.setdefault(string, len(strings))
+
+    intent_ids = array.array("I", (intern(s) for s in intents_list))
+    # each entity, alias or constraint paragraph is stored as (key id, first
+    # value, nb values, WEIGHTED | SYNONYMS | NESTED flags), or as (key id,
+    # directive id, SOURCE_DIRECTIVE, 0) when its values are read from a file
+    # or generated (see core_sources)
+    replacement_dic = {**entities_dic, **aliases_dic}
+    group_ids = array.array("I")
+    value_ids = array.array("I")
+    weights = array.array("d")
+    parents = array.array("i")
+    for dic in (entities_dic, aliases_dic, constraints_dic):
+        for key, values in dic.items():
+            if hasattr(values, "directive"):
+                group_ids.extend((intern(key), intern(values.directive),
+                                  SOURCE_DIRECTIVE, 0))
+                continue
+            value_weights = getattr(values, "weights", None)
+            synonyms = getattr(values, "synonyms", None)
+            # placeholders are only looked for once, here
+            nested = dic is not constraints_dic and \
+                bool(get_references(values, replacement_dic))
+            group_ids.extend((intern(key), len(value_ids), len(values),
+                              WEIGHTED * (value_weights is not None)
+                              | SYNONYMS * (synonyms is not None)
+                              | NESTED * nested))
+            value_ids.extend(intern(value) for value in values)
+            weights.extend(value_weights or [1.0] * len(values))
+            parents.extend(synonyms.parents if synonyms is not None
+                           else [ROOT] * len(values))
+    if not any(getattr(values, "weights", None) is not None
+               for dic in (entities_dic, aliases_dic)
+               for values in dic.values()):
+        weights = array.array("d")
+    if not any(getattr(values, "synonyms", None) is not None
+               for dic in (entities_dic, aliases_dic)
+               for values in dic.values()):
+        parents = array.array("i")
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array.array("Q", [0])
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    # parents are signed, stored with the same 4 bytes as unsigned ids
+    parent_ids = array.array("I", parents.tobytes())
+    ids = intent_ids + group_ids + value_ids + parent_ids
+    if len(ids) % 2:
+        ids.append(0)
+
+    with open(compiled_path, mode='wb') as compiled_file:
+        compiled_file.write(HEADER.pack(MAGIC, digest, len(strings),
+                                        len(intent_ids), len(entities_dic),
+                                        len(aliases_dic), len(constraints_dic),
+                                        len(value_ids), len(weights),
+                                        len(parents)))
+        compiled_file.write(offsets.tobytes())
+        compiled_file.write(ids.tobytes())
+        compiled_file.write(weights.tobytes())
+        compiled_file.writelines(encoded)
+
+    print(len(strings), "strings compiled into", compiled_path)
+    return compiled_path
+
+
+def load_compiled(compiled_path, constraints_dic=None):
+    """
+    Summary
+    ----------
+    Loading a compiled config file, entity and alias values staying in the
+    memory-mapped file until they are accessed
+
+    Parameters
+    ----------
+    compiled_path:
+        path to the compiled file
+    constraints_dic:
+        dictionary filled in place with the constraint paragraphs, as with
+        parse_config. If None, they are not loaded
+
+    Returns
+    -------
+    Tuple
+        (intents_list, entities_dic, aliases_dic) as returned by
+        populate_entry_dicts, values being MappedStrings (or
+        expanded values, see core_expand.expand_config)
+
+    """
+
+    table = StringTable(compiled_path)
+    intents_list = [table[i] for i in table.id_array(0, table.nb_intents)]
+
+    values_start = table.nb_intents + GROUP_SIZE * table.nb_groups
+    groups = table.id_array(table.nb_intents, GROUP_SIZE * table.nb_groups)
+    dics = (dict(), dict(), dict())
+    for k in range(table.nb_groups):
+        key, first, count, flags = groups[GROUP_SIZE * k:
+                                          GROUP_SIZE * (k + 1)]
+        if k < table.nb_entities:
+            dic = dics[0]
+        elif k < table.nb_entities + table.nb_aliases:
+            dic = dics[1]
+        else:
+            dic = dics[2]
+        if count == SOURCE_DIRECTIVE:
+            dic[table[key]] = parse_source(table[first])
+        else:
+            dic[table[key]] = MappedStrings(
+                table, values_start + first, count,
+                first if flags & WEIGHTED else None,
+                first if flags & SYNONYMS else None, bool(flags & NESTED))
+
+    if constraints_dic is not None:
+        constraints_dic.update((key, list(lines))
+                               for key, lines in dics[2].items())
+    entities_dic, aliases_dic = expand_config(dics[0], dics[1])
+    return intents_list, entities_dic, aliases_dic
+
+
+def load_config(input_path, compiled_path=None, constraints_dic=None):
+    """
+    Summary
+    ----------
+    Loading a config file from its compiled file when it is up to date with
+    the source, parsing it otherwise
+
+    Parameters
+    ----------
+    input_path:
+        path to config file
+    compiled_path:
+        path to the compiled file. If None, COMPILED_SUFFIX is appended to
+        input_path
+    constraints_dic:
+        dictionary filled in place with the constraint paragraphs, as with
+        parse_config
+
+    Returns
+    -------
+    Tuple
+        (intents_list, entities_dic, aliases_dic) as returned by
+        populate_entry_dicts
+
+    """
+
+    if compiled_path is None:
+        compiled_path = input_path + COMPILED_SUFFIX
+    if os.path.exists(compiled_path):
+        with open(compiled_path, mode='rb') as compiled_file:
+            header = compiled_file.read(HEADER.size)
+        if len(header) == HEADER.size and header[:4] == MAGIC and \
+                header[4:36] == source_digest(input_path):
+            return load_compiled(compiled_path, constraints_dic)
+
+    return parse_config(input_path, constraints_dic=constraints_dic)
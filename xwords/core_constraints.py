@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_constraints.py
+    Description: helper functions to exclude incompatible combinations of
+                 entity and alias values, declared in the config file as
+                 ![never]
+                     @[geo_filter] = US, @[currency] = EUR
+    Python Version: 3.6
+"""
+
+import re
+import bisect
+from .core_grammar import get_grammar
+
+
+def parse_constraints(constraints_dic, grammar=None, replacement_dic=None):
+    """
+    Summary
+    ----------
+    Parsing the lines of constraint paragraphs into forbidden combinations
+
+    Parameters
+    ----------
+    constraints_dic:
+        dictionary of constraint paragraphs, in the form
+        "![name]": [list of lines], each line listing placeholder = value
+        conditions separated by commas, which must never be met together
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    replacement_dic:
+        merged dictionary of entities and aliases. If given, constraints on
+        an unknown entity or alias are refused
+
+    Returns
+    -------
+    List
+        forbidden combinations, each one being a list of
+        (placeholder, value) pairs.
+        Raises ValueError on a malformed line or an unknown placeholder
+
+    """
+
+    placeholder = get_grammar(grammar).placeholder_pattern
+    condition = re.compile(r"\s*(" + placeholder + r")\s*=\s*(.*?)\s*"
+                           r"(?:,(?=\s*" + placeholder + r"\s*=)|$)")
+
+    nogoods = list()
+    for name, lines in constraints_dic.items():
+        for line in lines:
+            pairs = list()
+            position = 0
+            while position < len(line):
+                match = condition.match(line, position)
+                if match is None or not match.group(2):
+                    raise ValueError(name + ": malformed constraint "
+                                     + repr(line) + ", expected "
+                                     "@[entity] = value, ~[alias] = value")
+                if replacement_dic is not None and \
+                        match.group(1) not in replacement_dic:
+                    raise ValueError(name + ": unknown " + match.group(1)
+                                     + " in constraint " + repr(line))
+                pairs.append((match.group(1), match.group(2)))
+                position = match.end()
+            nogoods.append(pairs)
+
+    return nogoods
+
+
+class ConstrainedSpace(object):
+    """
+    Summary
+    ----------
+    Combinations of a sentence template that meet none of the forbidden
+    combinations, in itertools.product order. Enumeration backtracks as soon
+    as a partial combination is forbidden, and counting only distinguishes
+    values named in constraints, so that combinations can be counted and
+    indexed (for uniform subsampling) without being enumerated.
+
+    Parameters
+    ----------
+    template:
+        SentenceTemplate whose placeholders and raw values are constrained
+    nogoods:
+        forbidden combinations, as returned by parse_constraints
+
+    """
+
+    def __init__(self, template, nogoods):
+        self.cardinalities = template.cardinalities
+        depth = {key: d for d, key in enumerate(template.placeholders)}
+        nb_depths = len(self.cardinalities)
+
+        # mentions[d] maps the index of a value of the d-th placeholder to
+        # the set of forbidden combinations whose condition it meets
+        self.mentions = [dict() for _ in range(nb_depths)]
+        self.first = list()
+        self.last = list()
+        self.at_depth = [list() for _ in range(nb_depths)]
+        for pairs in nogoods:
+            if any(key not in depth for key, _ in pairs):
+                # a placeholder absent from the sentence: never forbidden
+                continue
+            conditions = dict()
+            for key, value in pairs:
+                values = template.raw_values[depth[key]]
+                indices = {k for k in range(len(values)) if values[k] == value}
+                conditions[depth[key]] = conditions.get(depth[key],
+                                                        indices) & indices
+            if not all(conditions.values()):
+                continue
+            n = len(self.first)
+            self.first.append(min(conditions))
+            self.last.append(max(conditions))
+            for d, indices in conditions.items():
+                self.at_depth[d].append(n)
+                for k in indices:
+                    self.mentions[d].setdefault(k, set()).add(n)
+
+        self.mentions = [{k: frozenset(signature)
+                          for k, signature in mentions.items()}
+                         for mentions in self.mentions]
+        self.mentioned = [sorted(mentions) for mentions in self.mentions]
+        self.at_depth = [frozenset(nogoods) for nogoods in self.at_depth]
+        self._counts = dict()
+
+    def __bool__(self):
+        return bool(self.first)
+
+    def __len__(self):
+        return self.count(0, frozenset())
+
+    def step(self, d, alive, k):
+        """
+        Summary
+        ----------
+        Assigning the k-th value to the d-th placeholder
+
+        Parameters
+        ----------
+        d:
+            depth (placeholder position)
+        alive:
+            forbidden combinations whose conditions are all met by the values
+            assigned so far
+        k:
+            value index
+
+        Returns
+        -------
+            the new set of alive forbidden combinations, or None if the
+            assignment completes a forbidden combination
+
+        """
+
+        signature = self.mentions[d].get(k, frozenset())
+        new = [n for n in alive if n not in self.at_depth[d]]
+        for n in self.at_depth[d]:
+            if n in signature and (n in alive or self.first[n] == d):
+                if self.last[n] == d:
+                    return None
+                new.append(n)
+        return frozenset(new)
+
+    def count(self, d, alive):
+        """
+        Summary
+        ----------
+        Counting the valid completions of a partial combination, memoized on
+        the forbidden combinations it has started to meet
+
+        Parameters
+        ----------
+        d:
+            number of placeholders already assigned
+        alive:
+            forbidden combinations whose conditions are all met so far
+
+        Returns
+        -------
+        Integer
+            number of valid ways to assign the remaining placeholders
+
+        """
+
+        if d == len(self.cardinalities):
+            return 1
+        if (d, alive) in self._counts:
+            return self._counts[d, alive]
+
+        total = 0
+        for k in self.mentioned[d]:
+            new = self.step(d, alive, k)
+            if new is not None:
+                total += self.count(d + 1, new)
+        # values named in no constraint all lead to the same completions
+        others = self.cardinalities[d] - len(self.mentioned[d])
+        if others:
+            total += others * self.count(d + 1, self.step(d, alive, None))
+
+        self._counts[d, alive] = total
+        return total
+
+    def _completions(self, d, alive, k):
+        new = self.step(d, alive, k)
+        if new is None:
+            return None, 0
+        return new, self.count(d + 1, new)
+
+    def unrank(self, index):
+        """
+        Summary
+        ----------
+        Decoding the index of a valid combination into value positions
+
+        Parameters
+        ----------
+        index:
+            integer in range(len(self))
+
+        Returns
+        -------
+            list of value positions, one for each placeholder
+
+        """
+
+        if not 0 <= index < len(self):
+            raise IndexError("combination index out of range")
+        positions = list()
+        alive = frozenset()
+        for d, cardinality in enumerate(self.cardinalities):
+            other_alive, other_count = self._completions(d, alive, None)
+            previous = 0
+            for m in self.mentioned[d] + [cardinality]:
+                # run of values named in no constraint, before value m
+                run = m - previous
+                if run and index < run * other_count:
+                    positions.append(previous + index // other_count)
+                    index %= other_count
+                    alive = other_alive
+                    break
+                index -= run * other_count
+                new, count = self._completions(d, alive, m)
+                if index < count:
+                    positions.append(m)
+                    alive = new
+                    break
+                index -= count
+                previous = m + 1
+
+        return positions
+
+    def rank(self, positions):
+        """
+        Summary
+        ----------
+        Encoding value positions into the index of a valid combination, the
+        inverse of unrank
+
+        Parameters
+        ----------
+        positions:
+            list of value positions, one for each placeholder
+
+        Returns
+        -------
+            integer in range(len(self)), or None if the combination is
+            forbidden
+
+        """
+
+        index = 0
+        alive = frozenset()
+        for d, k in enumerate(positions):
+            other_count = self._completions(d, alive, None)[1]
+            # values before k: the ones named in constraints are counted one
+            # by one, the others all have other_count completions
+            before = bisect.bisect_left(self.mentioned[d], k)
+            index += (k - before) * other_count
+            for m in self.mentioned[d][:before]:
+                index += self._completions(d, alive, m)[1]
+            alive = self.step(d, alive, k)
+            if alive is None:
+                return None
+        return index
+
+    def iter_positions(self, start=0):
+        """
+        Summary
+        ----------
+        Enumerating valid combinations by backtracking, skipping every
+        partial combination that has no valid completion
+
+        Parameters
+        ----------
+        start:
+            index of the first combination
+
+        Returns
+        -------
+        Generator
+            yields lists of value positions, in itertools.product order
+
+        """
+
+        if start >= len(self):
+            return
+        nb_depths = len(self.cardinalities)
+        positions = self.unrank(start)
+        alive = [frozenset()]
+        for d in range(nb_depths):
+            alive.append(self.step(d, alive[d], positions[d]))
+        yield list(positions)
+
+        d = nb_depths - 1
+        while d >= 0:
+            # next value of the d-th placeholder with valid completions
+            k = positions[d] + 1
+            while k < self.cardinalities[d]:
+                new, count = self._completions(d, alive[d], k)
+                if count:
+                    break
+                k += 1
+            if k == self.cardinalities[d]:
+                d -= 1
+                continue
+            positions[d] = k
+            alive[d + 1] = new
+            # first valid values of the following placeholders
+            for e in range(d + 1, nb_depths):
+                k = 0
+                new, count = self._completions(e, alive[e], k)
+                while not count:
+                    k += 1
+                    new, count = self._completions(e, alive[e], k)
+                positions[e] = k
+                alive[e + 1] = new
+            yield list(positions)
+            d = nb_depths - 1
+
+    def complete(self, partial):
+        """
+        Summary
+        ----------
+        Finding a valid combination agreeing with a partial one
+
+        Parameters
+        ----------
+        partial:
+            value position of each placeholder, None where unassigned
+
+        Returns
+        -------
+            list of value positions of a valid combination, or None if no
+            valid combination agrees with partial
+
+        """
+
+        nb_depths = len(self.cardinalities)
+        positions = list(partial)
+
+        def search(d, alive):
+            if d == nb_depths:
+                return True
+            if partial[d] is not None:
+                candidates = [partial[d]]
+            else:
+                # values named in no constraint are interchangeable: only
+                # the first of them is tried
+                candidates = list(self.mentioned[d])
+                other = next((k for k, m in enumerate(self.mentioned[d])
+                              if k != m), len(self.mentioned[d]))
+                if other < self.cardinalities[d]:
+                    candidates.append(other)
+            for k in candidates:
+                new, count = self._completions(d, alive, k)
+                if count and search(d + 1, new):
+                    positions[d] = k
+                    return True
+            return False
+
+        return positions if search(0, frozenset()) else None
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_corpus.py
+    Description: in-memory corpus of generated sentences, stored as
+                 (template id, combination index) integer columns and
+                 formatted only when accessed
+    Python Version: 3.6
+"""
+
+import array
+import bisect
+import itertools
+from collections.abc import Sequence
+from .core_template import SentenceTemplate
+from .core_grammar import get_grammar
+from .core_process import sample_sentence_indices
+from .core_output import training_selector, write_sentences
+from .core_write import ANNOTATED_FORMATS
+
+
+def _id_typecode(nb_templates):
+    # smallest unsigned array type holding every template id
+    for typecode in ("B", "H", "I"):
+        if nb_templates <= 1 << (8 * array.array(typecode).itemsize):
+            return typecode
+    return "Q"
+
+
+def _index_column(indices):
+    try:
+        return array.array("Q", indices)
+    except OverflowError:
+        # combination indices beyond 2**64 are kept as Python integers
+        return list(indices)
+
+
+class Corpus(Sequence):
+    """
+    Summary
+    ----------
+    Sequence of generated sentences holding only, for each sentence, the id
+    of its template and its combination index (a few bytes per sentence).
+    Sentences are built when accessed, iterated or written
+
+    Parameters
+    ----------
+    templates:
+        list of SentenceTemplate, shared by all the corpora sliced or split
+        from this one
+    template_ids:
+        template id of each sentence (array or list of integers)
+    indices:
+        combination index of each sentence within its template
+    annotated:
+        if True, sentences are built as annotated examples with entity
+        offsets (see SentenceTemplate.annotate)
+
+    """
+
+    def __init__(self, templates, template_ids, indices, annotated=False):
+        self.templates = templates
+        typecode = _id_typecode(len(templates))
+        # columns already in compact form are kept without being copied
+        if not (isinstance(template_ids, array.array)
+                and template_ids.typecode == typecode):
+            template_ids = array.array(typecode, template_ids)
+        self.template_ids = template_ids
+        if not (isinstance(indices, array.array) and indices.typecode == "Q"):
+            indices = _index_column(indices)
+        self.indices = indices
+        self.annotated = annotated
+        if len(self.template_ids) != len(self.indices):
+            raise ValueError("one template id is expected for each index")
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return Corpus(self.templates, self.template_ids[position],
+                          self.indices[position], self.annotated)
+        return self.templates[self.template_ids[position]].combination(
+            self.indices[position], self.annotated)
+
+    def __iter__(self):
+        return self.iter_records(self.annotated)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and len(self) == len(other) and \
+            all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return "Corpus(" + str(len(self)) + " sentences)"
+
+    def nbytes(self):
+        """
+        Summary
+        ----------
+        Computing the memory held by the columns of the corpus
+
+        Returns
+        -------
+        Integer
+            size in bytes of the template id and index columns
+
+        """
+
+        size = self.template_ids.itemsize * len(self.template_ids)
+        if isinstance(self.indices, array.array):
+            return size + self.indices.itemsize * len(self.indices)
+        return size + sum(index.__sizeof__() for index in self.indices)
+
+    def iter_records(self, annotated=False):
+        """
+        Summary
+        ----------
+        Building the sentences of the corpus in order. Runs of consecutive
+        indices of a template are built with SentenceTemplate.iter_range
+
+        Parameters
+        ----------
+        annotated:
+            if True, builds annotated examples instead of sentences
+
+        Returns
+        -------
+        Generator
+            yields sentences (or examples)
+
+        """
+
+        position = 0
+        while position < len(self):
+            template_id = self.template_ids[position]
+            start = stop = self.indices[position]
+            end = position
+            while end < len(self) and \
+                    self.template_ids[end] == template_id and \
+                    self.indices[end] == stop:
+                end += 1
+                stop += 1
+            yield from self.templates[template_id].iter_range(start, stop,
+                                                              annotated)
+            position = end
+
+    def split(self, training_ratio, split="exact", rng=None):
+        """
+        Summary
+        ----------
+        Splitting the corpus into training and testing corpora, without
+        building the sentences (except for the "hash" split)
+
+        Parameters
+        ----------
+        training_ratio:
+            percentage of sentences to be kept in the training corpus
+        split:
+            "exact", "bernoulli" or "hash", see training_selector
+        rng:
+            random.Random instance to draw with. If None, uses the random
+            module
+
+        Returns
+        -------
+        Tuple
+            (training corpus, testing corpus), both in the order of this one
+
+        """
+
+        is_training = training_selector(training_ratio, split, len(self), rng)
+        sentences = iter(self) if split == "hash" \
+            else itertools.repeat(None, len(self))
+        # both sets keep the compact columns of this corpus
+        columns = tuple((array.array(self.template_ids.typecode),
+                         array.array("Q")
+                         if isinstance(self.indices, array.array) else list())
+                        for _ in range(2))
+        for position, sentence in enumerate(sentences):
+            template_ids, indices = columns[0 if is_training(sentence) else 1]
+            template_ids.append(self.template_ids[position])
+            indices.append(self.indices[position])
+        return tuple(Corpus(self.templates, template_ids, indices,
+                            self.annotated)
+                     for template_ids, indices in columns)
+
+    def write(self, output_path="./xwords/outputs/", intent_string=None,
+              output_prefix='', training_ratio=1.0, rng=None, split="exact",
+              output_format="md", compression=None):
+        """
+        Summary
+        ----------
+        Writing the corpus into training and testing files, as
+        write_sentences, sentences being built as they are written
+
+        Parameters
+        ----------
+        output_path, intent_string, output_prefix, training_ratio, rng,
+        split, output_format, compression:
+            see write_sentences
+
+        Returns
+        -------
+            None
+
+        """
+
+        write_sentences(self.iter_records(output_format in ANNOTATED_FORMATS),
+                        output_path, intent_string, output_prefix,
+                        training_ratio, False, len(self), rng, split,
+                        output_format, compression)
+
+
+def generate_corpus(intents_list, entities_dic, aliases_dic, n_sub=None,
+                    grammar=None, rng=None, annotated=False, constraints=None,
+                    coverage=None):
+    """
+    Summary
+    ----------
+    Generating the same sentences as generate_sentences, as a Corpus
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file
+    aliases_dic:
+        dictionnary of all aliases in source config file
+    n_sub:
+        number of randomly selected sentences to subsample from the total
+        number of combinations. If None, keeps every combination
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance used to subsample sentences. If None, uses the
+        random module
+    annotated:
+        if True, sentences are built as annotated examples
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only keep a
+        covering array of each intent sentence (see core_coverage)
+
+    Returns
+    -------
+        Corpus, in the order of iter_sentences
+
+    """
+
+    grammar = get_grammar(grammar)
+    replacement_dic = {**entities_dic, **aliases_dic}
+    templates = [SentenceTemplate(intent_sentence, replacement_dic, False,
+                                  grammar, constraints, coverage)
+                 for intent_sentence in intents_list]
+    counts = [len(template) for template in templates]
+
+    if n_sub is None or n_sub >= sum(counts):
+        template_ids = itertools.chain.from_iterable(
+            itertools.repeat(i, count) for i, count in enumerate(counts))
+        indices = itertools.chain.from_iterable(
+            range(count) for count in counts)
+        return Corpus(templates, template_ids, indices, annotated)
+
+    ends = list(itertools.accumulate(counts))
+    global_indices = sample_sentence_indices(intents_list, replacement_dic,
+                                             counts, n_sub, grammar, rng,
+                                             constraints, coverage)
+    template_ids = [bisect.bisect_right(ends, k) for k in global_indices]
+    indices = [k - ends[i] + counts[i]
+               for i, k in zip(template_ids, global_indices)]
+    return Corpus(templates, template_ids, indices, annotated)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_coverage.py
+    Description: helper functions to generate a covering array of an intent
+                 sentence instead of all its combinations: every pair (or
+                 t-tuple) of placeholder values appears in at least one
+                 sentence
+    Python Version: 3.6
+"""
+
+import re
+import itertools
+import collections
+
+
+def coverage_strength(coverage):
+    """
+    Summary
+    ----------
+    Reading the coverage option of the generation functions
+
+    Parameters
+    ----------
+    coverage:
+        None or "full" for all combinations, "pairwise" for every pair of
+        values, "<t>-wise" (e.g. "3-wise") or an integer t for every t-tuple
+
+    Returns
+    -------
+        None for all combinations, otherwise the integer strength t.
+        Raises ValueError on an unknown coverage
+
+    """
+
+    if coverage is None or coverage == "full":
+        return None
+    if coverage == "pairwise":
+        return 2
+    if isinstance(coverage, str):
+        match = re.match(r"(\d+)-wise$", coverage)
+        if match is None:
+            raise ValueError("unknown coverage " + repr(coverage)
+                             + ", expected 'full', 'pairwise' or 't-wise'")
+        coverage = int(match.group(1))
+    if coverage < 1:
+        raise ValueError("coverage strength must be at least 1")
+    return coverage
+
+
+def _fill(row):
+    # without constraints, any value completes a row
+    return [0 if k is None else k for k in row]
+
+
+def _assign(row, columns, values, complete):
+    # setting the values of a tuple in the unassigned cells of a row, as long
+    # as the row can still be completed
+    if any(row[c] is not None and row[c] != k
+           for c, k in zip(columns, values)):
+        return False
+    previous = row[:]
+    for c, k in zip(columns, values):
+        row[c] = k
+    if complete(row) is None:
+        row[:] = previous
+        return False
+    return True
+
+
+def covering_array(cardinalities, strength=2, complete=None):
+    """
+    Summary
+    ----------
+    Building a covering array with a greedy IPOG strategy: the array is built
+    for the first strength placeholders, then grown one placeholder at a
+    time, first by choosing its value in each existing row (horizontal
+    growth), then by covering the value tuples still uncovered (vertical
+    growth) in the unassigned cells of existing rows, or in new rows.
+    Unassigned values left at the end are chosen by complete
+
+    Parameters
+    ----------
+    cardinalities:
+        number of values of each placeholder
+    strength:
+        size t of the tuples of values to cover
+    complete:
+        function returning a valid full row (list of value positions) from a
+        row where unassigned positions are None, or None if the row cannot be
+        completed (see ConstrainedSpace.complete). If None, every row is valid
+
+    Returns
+    -------
+    List
+        rows of value positions, one for each placeholder, such that every
+        t-tuple of values of any t placeholders appearing in a valid
+        combination appears in at least one row
+
+    """
+
+    if complete is None:
+        complete = _fill
+    nb_columns = len(cardinalities)
+    strength = min(strength, nb_columns)
+
+    rows = list()
+    for combi in itertools.product(*(range(cardinality) for cardinality
+                                     in cardinalities[:strength])):
+        row = list(combi) + [None] * (nb_columns - strength)
+        if complete(row) is not None:
+            rows.append(row)
+
+    for i in range(strength, nb_columns):
+        column_sets = list(itertools.combinations(range(i), strength - 1))
+        # values of placeholder i still to be covered with each (t-1)-tuple
+        # of values of previous placeholders
+        uncovered = {(columns, values): set(range(cardinalities[i]))
+                     for columns in column_sets
+                     for values in itertools.product(
+                         *(range(cardinalities[c]) for c in columns))}
+
+        def cover(row):
+            if row[i] is None:
+                return
+            for columns in column_sets:
+                values = tuple(row[c] for c in columns)
+                if None not in values:
+                    uncovered[(columns, values)].discard(row[i])
+
+        # horizontal growth: the value covering most new tuples in each row,
+        # the cell staying unassigned if no value covers any
+        for row in rows:
+            gains = collections.Counter(
+                k for columns in column_sets
+                for k in uncovered.get((columns, tuple(row[c]
+                                                       for c in columns)), ()))
+            if not gains:
+                continue
+            best = max(gains, key=lambda k: (gains[k], -k))
+            row[i] = best
+            if complete(row) is None:
+                row[i] = None
+                for k in sorted(gains, key=lambda k: (-gains[k], k)):
+                    row[i] = k
+                    if complete(row) is not None:
+                        break
+                    row[i] = None
+            cover(row)
+
+        # vertical growth: each remaining tuple goes into the first row whose
+        # unassigned cells can hold it, or into a new row. Rows with
+        # unassigned cells are indexed by (value of placeholder i, column,
+        # value of the column), None included, so that a tuple only tries
+        # the rows agreeing with it on placeholder i and on its first column
+        pending = collections.defaultdict(dict)
+
+        def index(position, row):
+            if None in row[:i + 1]:
+                for c in range(i):
+                    pending[(row[i], c, row[c])][position] = row
+
+        def unindex(position, row):
+            for c in range(i):
+                pending[(row[i], c, row[c])].pop(position, None)
+
+        for position, row in enumerate(rows):
+            index(position, row)
+        for key in sorted(uncovered):
+            columns, values = key
+            first, value = columns[0], values[0]
+            columns += (i,)
+            for k in sorted(uncovered[key]):
+                if k not in uncovered[key]:
+                    # covered by a row completed in the meantime
+                    continue
+                candidates = itertools.chain.from_iterable(
+                    pending[(x, first, y)].items() for x in (k, None)
+                    for y in (None, value))
+                for position, row in candidates:
+                    previous = row[:]
+                    if _assign(row, columns, values + (k,), complete):
+                        unindex(position, previous)
+                        break
+                else:
+                    position, row = len(rows), [None] * nb_columns
+                    # a tuple no valid combination contains is left
+                    # uncovered
+                    if not _assign(row, columns, values + (k,), complete):
+                        continue
+                    rows.append(row)
+                index(position, row)
+                cover(row)
+
+    # rows whose unassigned values are completed alike may end up equal
+    completed = list()
+    seen = set()
+    for row in rows:
+        row = complete(row)
+        if tuple(row) not in seen:
+            seen.add(tuple(row))
+            completed.append(row)
+    return completed
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_dedup.py
+    Description: helper functions to drop duplicate sentences or stories
+                 while they stream to the output files, with memory bounded
+                 by a compact 64 bits hash set or a Bloom filter
+    Python Version: 3.6
+"""
+
+import math
+import array
+import hashlib
+from .utils import record_key
+
+DEDUP_MODES = ("exact", "bloom")
+# expected number of records when it is not known in advance
+DEFAULT_CAPACITY = 1 << 20
+
+
+def record_hash(record, digest_size=8):
+    """
+    Summary
+    ----------
+    Hashing a sentence, story or annotated example
+
+    Parameters
+    ----------
+    record:
+        string, or dictionary for annotated examples
+    digest_size:
+        number of bytes of the hash
+
+    Returns
+    -------
+    Integer
+        blake2b hash of the record, on digest_size bytes
+
+    """
+
+    return int.from_bytes(hashlib.blake2b(record_key(record),
+                                          digest_size=digest_size).digest(),
+                          "little")
+
+
+class HashSet64(object):
+    """
+    Summary
+    ----------
+    Set of 64 bits hashes stored in a flat array (8 bytes per slot) with open
+    addressing and linear probing, kept at most half full. The array doubles
+    when it gets half full, so it is between a quarter and half full past
+    capacity: 16 to 32 bytes per distinct hash, and 48 while it doubles as
+    the old array is copied into the new one
+
+    Parameters
+    ----------
+    capacity:
+        expected number of hashes, the set grows beyond it
+
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        size = 16
+        while size < 2 * capacity:
+            size *= 2
+        self.slots = array.array("Q", bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        """
+        Summary
+        ----------
+        Adding a hash to the set
+
+        Parameters
+        ----------
+        value:
+            integer in range(2**64)
+
+        Returns
+        -------
+            True if value was not in the set yet
+
+        """
+
+        # 0 marks empty slots
+        value = value or 1
+        slots, mask = self.slots, self.mask
+        i = value & mask
+        while slots[i]:
+            if slots[i] == value:
+                return False
+            i = (i + 1) & mask
+        slots[i] = value
+        self.count += 1
+        if 2 * self.count > len(slots):
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self.slots
+        self.slots = array.array("Q", bytes(16 * len(old)))
+        self.mask = len(self.slots) - 1
+        for value in old:
+            if value:
+                i = value & self.mask
+                while self.slots[i]:
+                    i = (i + 1) & self.mask
+                self.slots[i] = value
+
+
+class BloomFilter(object):
+    """
+    Summary
+    ----------
+    Bloom filter over 128 bits hashes, using about
+    -capacity * ln(error_rate) / ln(2)^2 bits whatever the size of the
+    records (29 bits per record for an error rate of 1e-6)
+
+    Parameters
+    ----------
+    capacity:
+        expected number of records
+    error_rate:
+        probability for a new record to be reported as already seen, once
+        capacity records were added
+
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=1e-6):
+        capacity = max(capacity, 1)
+        self.nb_bits = max(8, int(-capacity * math.log(error_rate)
+                                  / math.log(2) ** 2))
+        self.nb_hashes = max(1, round(self.nb_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.nb_bits + 7) // 8)
+
+    def add(self, value):
+        """
+        Summary
+        ----------
+        Adding a hash to the filter
+
+        Parameters
+        ----------
+        value:
+            integer in range(2**128)
+
+        Returns
+        -------
+            True if value was certainly not in the filter yet
+
+        """
+
+        # double hashing: the k bit positions are h1 + i * h2
+        h1, h2 = value & (2**64 - 1), (value >> 64) | 1
+        new = False
+        for i in range(self.nb_hashes):
+            bit = (h1 + i * h2) % self.nb_bits
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                new = True
+        return new
+
+
+class Deduplicator(object):
+    """
+    Summary
+    ----------
+    Dropping the records already seen from a stream of sentences or stories
+
+    Parameters
+    ----------
+    mode:
+        - "exact": 64 bits hashes of the records are kept in a HashSet64
+          (16 to 32 bytes per distinct record past capacity), a record is
+          only dropped as a duplicate on a 64 bits hash collision
+        - "bloom": records are kept in a BloomFilter of fixed size, a few
+          distinct records (error_rate) may be dropped as duplicates
+    capacity:
+        expected number of records. If None, DEFAULT_CAPACITY
+    error_rate:
+        false positive rate of the Bloom filter
+    for_story:
+        if True, records are Rasa Core stories, compared without their
+        "## Generated Story <id>" title line as ids are random
+
+    """
+
+    def __init__(self, mode="exact", capacity=None, error_rate=1e-6,
+                 for_story=False):
+        if capacity is None:
+            capacity = DEFAULT_CAPACITY
+        if mode == "exact":
+            self.seen = HashSet64(capacity)
+            self.digest_size = 8
+        elif mode == "bloom":
+            self.seen = BloomFilter(capacity, error_rate)
+            self.digest_size = 16
+        else:
+            raise ValueError("unknown dedup mode: " + str(mode)
+                             + ", expected one of " + ", ".join(DEDUP_MODES))
+        self.mode = mode
+        self.for_story = for_story
+        self.dropped = 0
+
+    def filter(self, records):
+        """
+        Summary
+        ----------
+        Lazily dropping duplicates
+
+        Parameters
+        ----------
+        records:
+            iterable of sentences, stories or annotated examples
+
+        Returns
+        -------
+        Generator
+            yields the records seen for the first time, in order
+
+        """
+
+        add, digest_size = self.seen.add, self.digest_size
+        for record in records:
+            # the body of a story follows its title line
+            key = record.partition("\n")[2] if self.for_story else record
+            if add(record_hash(key, digest_size)):
+                yield record
+            else:
+                self.dropped += 1
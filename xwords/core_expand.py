@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_expand.py
+    Description: helper functions to expand entity and alias values written
+                 with placeholders of other entities and aliases, e.g.
+                 ~[polite_request]
+                     ~[please] give me
+    Python Version: 3.6
+"""
+
+import json
+import bisect
+import hashlib
+import itertools
+from collections.abc import Sequence
+from .utils import unique, unrank
+from .core_grammar import get_grammar
+
+# expanded value lists up to this size are built once and kept in memory,
+# larger ones are indexed lazily
+EXPANSION_CACHE_SIZE = 100000
+
+
+class ExpandedValues(Sequence):
+    """
+    Summary
+    ----------
+    Values of an entity or alias with every placeholder replaced by every
+    expanded value of the entity or alias it names, numbered value after
+    value, in itertools.product order within each value. A placeholder
+    written several times in a value takes the same expanded value at each
+    occurrence. Any expanded value is built from its index, so huge
+    expansions are never enumerated
+
+    Parameters
+    ----------
+    values:
+        values of the entity or alias, as written in the config file
+    expanded_dic:
+        dictionary of the (already expanded) values of the entities and
+        aliases referenced by values
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    """
+
+    def __init__(self, values, expanded_dic, grammar=None):
+        grammar = get_grammar(grammar)
+        self.values = values
+        # each value is split around its placeholders: literal parts, and
+        # the expanded values filling the slots between them. A placeholder
+        # written several times in a value is one slot, filled with the same
+        # expanded value at each of its gaps, as in sentence templates
+        self.parts = list()
+        self.slots = list()
+        self.gaps = list()
+        counts = list()
+        for value in values:
+            parts = [value]
+            keys = list()
+            gaps = list()
+            for placeholder in grammar.placeholders(value):
+                if placeholder in expanded_dic:
+                    before, _, after = parts.pop().partition(placeholder)
+                    parts.extend((before, after))
+                    if placeholder not in keys:
+                        keys.append(placeholder)
+                    gaps.append(keys.index(placeholder))
+            slots = [expanded_dic[key] for key in keys]
+            count = 1
+            for slot in slots:
+                count *= len(slot)
+            self.parts.append(parts)
+            self.slots.append(slots)
+            self.gaps.append(gaps)
+            counts.append(count)
+        self.ends = list(itertools.accumulate(counts))
+        self.count = self.ends[-1] if self.ends else 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("expanded value index out of range")
+        i = bisect.bisect_right(self.ends, index)
+        index -= self.ends[i - 1] if i else 0
+        parts, slots = self.parts[i], self.slots[i]
+        positions = unrank(index, [len(slot) for slot in slots])
+        filled = [slot[k] for slot, k in zip(slots, positions)]
+        pieces = [parts[0]]
+        for gap, part in zip(self.gaps[i], parts[1:]):
+            pieces.append(filled[gap])
+            pieces.append(part)
+        return "".join(pieces)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and len(self) == len(other) \
+            and list(self) == list(other)
+
+    def __repr__(self):
+        return "ExpandedValues(" + repr(list(self.values)) + ")"
+
+    def digest(self):
+        """
+        Summary
+        ----------
+        Hashing the values as written and the expanded values they reference,
+        without enumerating the expansion
+
+        Returns
+        -------
+            hexadecimal digest
+
+        """
+
+        referenced = [[slot.digest() if hasattr(slot, "digest")
+                       else list(slot) for slot in slots]
+                      for slots in self.slots]
+        return hashlib.sha256(json.dumps(
+            [list(self.values), referenced]).encode("utf-8")).hexdigest()
+
+
+def get_references(values, replacement_dic, grammar=None):
+    """
+    Summary
+    ----------
+    Listing the entities and aliases referenced by the values of an entity or
+    alias
+
+    Parameters
+    ----------
+    values:
+        values of the entity or alias
+    replacement_dic:
+        merged dictionary of entities and aliases
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    List
+        placeholders found in replacement_dic, without duplicates. Values
+        sources (file, range, date, pattern) reference nothing, nor do
+        compiled values flagged as not nested (see core_compile)
+
+    """
+
+    if hasattr(values, "digest") or not getattr(values, "nested", True):
+        return []
+    grammar = get_grammar(grammar)
+    return unique([placeholder for value in values
+                   for placeholder in grammar.placeholders(value)
+                   if placeholder in replacement_dic])
+
+
+def expand_values(replacement_dic, grammar=None,
+                  cache_size=EXPANSION_CACHE_SIZE):
+    """
+    Summary
+    ----------
+    Expanding the placeholders written in entity and alias values. Entities
+    and aliases are expanded in depth-first order of their references, each
+    one exactly once, then shared by all the ones referencing it
+
+    Parameters
+    ----------
+    replacement_dic:
+        merged dictionary of entities and aliases
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    cache_size:
+        expansions of at most cache_size values are built into lists, larger
+        ones stay ExpandedValues
+
+    Returns
+    -------
+    Dictionary
+        same keys as replacement_dic, values without placeholders. Values
+        referencing nothing are returned as is.
+        Raises ValueError on a cycle of references or on weighted values
+        referencing placeholders
+
+    """
+
+    grammar = get_grammar(grammar)
+    references = {key: get_references(values, replacement_dic, grammar)
+                  for key, values in replacement_dic.items()}
+    if not any(references.values()):
+        return replacement_dic
+
+    expanded_dic = dict()
+    path = list()
+
+    def expand(key):
+        if key in expanded_dic:
+            return
+        if key in path:
+            raise ValueError("cycle of placeholders: " + " -> ".join(
+                path[path.index(key):] + [key]))
+        values = replacement_dic[key]
+        if not references[key]:
+            expanded_dic[key] = values
+            return
+        if getattr(values, "weights", None) is not None:
+            raise ValueError(key + ": weighted values cannot contain "
+                             "placeholders")
+        path.append(key)
+        for reference in references[key]:
+            expand(reference)
+        path.pop()
+        expanded = ExpandedValues(values, expanded_dic, grammar)
+        if len(expanded) <= cache_size:
+            expanded = list(expanded)
+        expanded_dic[key] = expanded
+
+    for key in replacement_dic:
+        expand(key)
+
+    return expanded_dic
+
+
+def expand_config(entities_dic, aliases_dic, grammar=None):
+    """
+    Summary
+    ----------
+    Expanding the placeholders written in the values of entities and aliases
+    (see expand_values)
+
+    Parameters
+    ----------
+    entities_dic:
+        dictionary of all entities in source config file
+    aliases_dic:
+        dictionary of all aliases in source config file
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    Tuple
+        (entities_dic, aliases_dic) with expanded values
+
+    """
+
+    expanded_dic = expand_values({**entities_dic, **aliases_dic}, grammar)
+    return ({key: expanded_dic[key] for key in entities_dic},
+            {key: expanded_dic[key] for key in aliases_dic})
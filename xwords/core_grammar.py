@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_grammar.py
+    Description: grammar of config files, the keywords signaling entities,
+                 aliases and constraints, compiled once and shared by the
+                 parsing and generation functions
+    Python Version: 3.6
+"""
+
+import re
+import functools
+
+
+class Grammar(object):
+    """
+    Summary
+    ----------
+    Keywords signaling configuration structure, with the regular expressions
+    and strip characters derived from them
+
+    Parameters
+    ----------
+    sigils:
+        list of keywords of placeholders, the second one signaling entities
+        and the third one aliases. If None, ["%", "@", "~", "&"]
+    constraint:
+        keyword of constraint paragraphs, or None to refuse them
+
+    """
+
+    def __init__(self, sigils=None, constraint="!"):
+        if sigils is None:
+            sigils = ["%", "@", "~", "&"]
+        if len(sigils) < 3:
+            raise ValueError("a grammar needs at least 3 keywords, got "
+                             + repr(sigils))
+        self.sigils = tuple(sigils)
+        self.entity = sigils[1]
+        self.alias = sigils[2]
+        self.constraint = constraint
+        # e.g. [%@~&]\[\w+\] for the default grammar
+        self.placeholder_pattern = "[" + re.escape("".join(sigils)) + \
+            r"]\[\w+\]"
+        self.placeholder = re.compile(self.placeholder_pattern)
+        self.header = re.compile("[" + re.escape(self.entity + self.alias)
+                                 + r"]\[\w+\](?=\s|$)")
+        self.constraint_header = None
+        if constraint is not None:
+            self.constraint_header = re.compile(re.escape(constraint)
+                                                + r"\[\w+\]$")
+        self.strip_chars = "[" + "".join(sigils) + "]"
+
+    @classmethod
+    def from_keywords(cls, keywords=None):
+        """
+        Summary
+        ----------
+        Building the grammar of a list of keywords in config file order, as
+        taken by core_parse functions
+
+        Parameters
+        ----------
+        keywords:
+            list of keywords of entities, aliases, intents and (optionally)
+            constraints. If None, ["@", "~", "&", "!"]
+
+        Returns
+        -------
+            Grammar
+
+        """
+
+        if keywords is None:
+            return DEFAULT_GRAMMAR
+        return _cached_grammar(("%",) + tuple(keywords[:3]),
+                               keywords[3] if len(keywords) > 3 else None)
+
+    def __eq__(self, other):
+        return isinstance(other, Grammar) and self.sigils == other.sigils \
+            and self.constraint == other.constraint
+
+    def __hash__(self):
+        return hash((self.sigils, self.constraint))
+
+    def __repr__(self):
+        return "Grammar(" + repr(list(self.sigils)) + ", " + \
+            repr(self.constraint) + ")"
+
+    def __reduce__(self):
+        # compiled patterns are rebuilt rather than pickled
+        return Grammar, (list(self.sigils), self.constraint)
+
+    def strip(self, element):
+        """
+        Summary
+        ----------
+        Removing grammar keywords (and brackets) around a sentence element,
+        e.g. "@[city]" gives "city"
+
+        """
+
+        return element.strip(self.strip_chars)
+
+    def placeholders(self, sentence):
+        """
+        Summary
+        ----------
+        Listing the placeholders written in a sentence, in order of
+        appearance and with duplicates
+
+        """
+
+        return self.placeholder.findall(sentence)
+
+    def is_entity(self, key):
+        """
+        Summary
+        ----------
+        Checking whether a placeholder is an entity (rather than an alias)
+
+        """
+
+        return key[0] == self.entity
+
+
+DEFAULT_GRAMMAR = Grammar()
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_grammar(sigils, constraint="!"):
+    return Grammar(sigils, constraint)
+
+
+def get_grammar(grammar=None):
+    """
+    Summary
+    ----------
+    Getting the compiled grammar of a grammar argument, compiling each list
+    of keywords only once
+
+    Parameters
+    ----------
+    grammar:
+        None for the default grammar, a Grammar, or a list of keywords
+        signaling configuration structure (entities, aliases, intents), as
+        taken by core_process functions
+
+    Returns
+    -------
+        Grammar
+
+    """
+
+    if grammar is None:
+        return DEFAULT_GRAMMAR
+    if isinstance(grammar, Grammar):
+        return grammar
+    return _cached_grammar(tuple(grammar))
@@ -11,12 +11,66 @@
 
 import os
 import random
-from .core_parse import parse_input, populate_entry_dicts
-from .core_process import generate_sentences, generate_stories
+import hashlib
+from .core_compile import load_config
+from .core_constraints import parse_constraints
+from .core_process import (combination_report, iter_sentences,
+                           build_templates)
+from .core_batch import iter_batch_stories
+from .core_skeletons import StorySpace, count_stories
+from .core_dedup import Deduplicator
+from .core_shuffle import iter_shuffled
+from .core_synonyms import apply_synonyms
+from .core_parallel import (iter_parallel_sentences, iter_parallel_stories,
+                            block_seed, shard_range)
+from .utils import record_key
+from .core_cache import iter_cached_sentences
+from .core_write import SentenceWriter, FORMAT_EXTENSIONS, ANNOTATED_FORMATS
+
+
+def open_output(file_name="output.txt", output_path="./xwords/outputs/",
+                intent_string=None, for_story=False, output_format="md",
+                compression=None, header=True):
+    """
+    Summary
+    ----------
+    Opens a buffered writer on an output file and writes its header if needed
+
+    Parameters
+    ----------
+    file_name:
+        name (string) of the file to be written
+    output_path:
+        path (string) to the folder where to write file
+    intent_string:
+        string specifying the intent of sentences in the case of
+        Rasa NLU training file, or of stories. If None, stories take the
+        name of the config file (without extension) as intent
+    for_story:
+        if True, writes output using Rasa Core's training format
+        if False, writes output using Rasa NLU's training format
+    output_format:
+        "md" for Rasa markdown, "jsonl" for one JSON document per line or
+        "rasa_json" for Rasa NLU JSON training data
+    compression:
+        None, "gzip", "bz2" or "lzma"
+    header:
+        if False, the "## intent" line of markdown files is not written
+
+    Returns
+    -------
+    SentenceWriter
+        to be closed by the caller
+
+    """
+
+    return SentenceWriter(output_path + file_name, intent_string, for_story,
+                          output_format, compression, header=header)
 
 
 def write_file(sentences, file_name="output.txt", output_path="./xwords/outputs/", 
-               intent_string=None, for_story=False):
+               intent_string=None, for_story=False, output_format="md",
+               compression=None, header=True):
     """
     Summary
     ----------
@@ -25,7 +79,8 @@ def write_file(sentences, file_name="output.txt", output_path="./xwords/outputs/
     Parameters
     ----------
     sentences:
-        list of generated sentences to be written in the file
+        iterable of generated sentences to be written in the file, consumed
+        one at a time
     file_name:
         name (string) of the file to be written
     output_path: 
@@ -38,6 +93,13 @@ def write_file(sentences, file_name="output.txt", output_path="./xwords/outputs/
     for_story:
         if True, writes output using Rasa Core's training format
         if False, writes output using Rasa NLU's training format
+    output_format:
+        "md" for Rasa markdown, "jsonl" for one JSON document per line or
+        "rasa_json" for Rasa NLU JSON training data
+    compression:
+        None, "gzip", "bz2" or "lzma"
+    header:
+        if False, the "## intent" line of markdown files is not written
 
     Returns
     -------
@@ -45,25 +107,81 @@ def write_file(sentences, file_name="output.txt", output_path="./xwords/outputs/
 
     """
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    full_path = output_path + file_name
-
-    with open(full_path, mode='w') as output_file:
-        if not for_story and intent_string is not None:
-            output_file.write("## intent:" + intent_string + "\n")
+    with open_output(file_name, output_path, intent_string, for_story,
+                     output_format, compression, header) as output_file:
         for s in sentences:
-            # using Rasa Core (conversations) or Rasa NLU (only sentences)
-            # training format
-            if for_story:
-                output_file.write(s + "\n")
-            else:
-                output_file.write("- " + s + "\n")
+            output_file.write(s)
 
-        print(len(sentences), "objects written in file", full_path)
+    print(output_file.count, "objects written in file", output_file.name)
+
+
+def training_selector(training_ratio, split="exact", nb_sentences=None,
+                      rng=None):
+    """
+    Summary
+    ----------
+    Builds a function assigning sentences to the training or testing set one
+    at a time, in a single pass and with constant memory
+
+    Parameters
+    ----------
+    training_ratio:
+        percentage of sentences/conversations to be kept in the training set
+    split:
+        - "exact": selection sampling, exactly int(nb_sentences*training_ratio)
+          sentences are kept for training, uniformly among all subsets
+        - "bernoulli": each sentence is kept for training with probability
+          training_ratio
+        - "hash": each sentence is kept for training depending on a stable
+          hash of its text, so a given sentence always lands in the same set
+    nb_sentences:
+        number of sentences to be split, required when split is "exact"
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+
+    Returns
+    -------
+    Function
+        to be called on every sentence in order, returning True if the
+        sentence goes into the training set
+
+    """
+
+    if rng is None:
+        rng = random
+
+    if split == "bernoulli":
+        return lambda sentence: rng.random() < training_ratio
+
+    if split == "hash":
+        threshold = int(training_ratio * 2**64)
+        return lambda sentence: int.from_bytes(hashlib.blake2b(
+            record_key(sentence), digest_size=8).digest(),
+            "big") < threshold
+
+    if split != "exact":
+        raise ValueError("unknown split: " + str(split))
+
+    # Knuth's selection sampling: the k-th sentence is selected with
+    # probability (still needed) / (still available)
+    state = {"needed": int(nb_sentences*training_ratio),
+             "available": nb_sentences}
+
+    def is_training(sentence):
+        selected = rng.random() * state["available"] < state["needed"]
+        state["available"] -= 1
+        if selected:
+            state["needed"] -= 1
+        return selected
+
+    return is_training
 
 
 def write_sentences(sentences, output_path="./xwords/outputs/", intent_string=None,
-                    output_prefix='', training_ratio=1.0, for_story=False):
+                    output_prefix='', training_ratio=1.0, for_story=False,
+                    nb_sentences=None, rng=None, split="exact",
+                    output_format="md", compression=None, dedup=None,
+                    shard=None, num_shards=1, shuffle=False):
     """
     Summary
     ----------
@@ -72,7 +190,9 @@ def write_sentences(sentences, output_path="./xwords/outputs/", intent_string=No
     Parameters
     ----------
     sentences:
-        list of generated sentences to be written into a flat text file
+        iterable of generated sentences to be written into a flat text file.
+        Sentences are consumed one at a time, so a generator such as
+        iter_sentences can be written without being held in memory
     output_path:
         path to the desired location for generated files
     intent_string:
@@ -85,6 +205,34 @@ def write_sentences(sentences, output_path="./xwords/outputs/", intent_string=No
     for_story:
         if True, writes output using Rasa Core's training format
         if False, writes output using Rasa NLU's training format
+    nb_sentences:
+        number of elements in sentences, required when sentences has no len
+        (e.g. a generator), training_ratio is not 1.0 and split is "exact"
+    rng:
+        random.Random instance used to split training and testing sets. If
+        None, uses the random module
+    split:
+        how sentences are assigned to the training set, see training_selector
+    output_format:
+        "md" for Rasa markdown, "jsonl" for one JSON document per line or
+        "rasa_json" for Rasa NLU JSON training data
+    compression:
+        None, "gzip", "bz2" or "lzma"
+    dedup:
+        None, or "exact" or "bloom" to drop duplicate sentences (or stories,
+        whatever their title) before they are split, so that none lands in
+        both sets (see core_dedup.Deduplicator). With the "exact" split, the
+        training ratio then applies to nb_sentences and is approximate
+    shard:
+        if not None, sentences are the shard of this index of a run cut into
+        num_shards: file names are suffixed with "-<shard>-of-<num_shards>"
+        and only the first shard writes the "## intent" line, so that the
+        files of all shards concatenate into the files of the whole run
+    num_shards:
+        number of shards of the run
+    shuffle:
+        if True, sentences are shuffled before being split, with bounded
+        memory (see core_shuffle.iter_shuffled), using rng
 
     Returns
     -------
@@ -94,28 +242,58 @@ def write_sentences(sentences, output_path="./xwords/outputs/", intent_string=No
 
     """
 
-    nb_sentences = len(sentences)
-    # select a subsample of sentences and split into training and testing set
-    sub_samp = sorted(random.sample(range(nb_sentences),
-                      int(nb_sentences*training_ratio)))
-    training_sentences = [sentences[k] for k in sub_samp]
-
     # outputing into 'training.md' if no prefix is given
-    file_name = output_prefix + "training.md"
-    write_file(training_sentences, file_name, output_path, intent_string, for_story)
+    extension = FORMAT_EXTENSIONS[output_format]
+    shard_tag = ""
+    if shard is not None:
+        shard_tag = "-%05d-of-%05d" % (shard, num_shards)
+    header = not shard
+    file_name = output_prefix + "training" + shard_tag + extension
+
+    if split == "exact" and nb_sentences is None and training_ratio != 1.0:
+        nb_sentences = len(sentences)
+
+    deduplicator = None
+    if dedup is not None:
+        deduplicator = Deduplicator(dedup, nb_sentences, for_story=for_story)
+        sentences = deduplicator.filter(sentences)
+    if shuffle:
+        sentences = iter_shuffled(sentences, rng)
 
-    if training_ratio != 1.0:
-        # case of split between training and testing set
-        traintest_sep = sorted(list(set(range(nb_sentences)) - set(sub_samp)))
-        testing_sentences = [sentences[k] for k in traintest_sep]
-        # outputing into 'test.md' if no prefix is given
-        file_name_test = output_prefix + "testing.md"
-        write_file(testing_sentences, file_name_test,
-                   output_path, intent_string, for_story)
+    if training_ratio == 1.0:
+        write_file(sentences, file_name, output_path, intent_string, for_story,
+                   output_format, compression, header)
+        if deduplicator is not None:
+            print(deduplicator.dropped, "duplicates dropped")
+        return
+
+    # each sentence is sent to the training or testing set as it streams past
+    is_training = training_selector(training_ratio, split, nb_sentences, rng)
+
+    # outputing into 'test.md' if no prefix is given
+    file_name_test = output_prefix + "testing" + shard_tag + extension
+    with open_output(file_name, output_path, intent_string, for_story,
+                     output_format, compression, header) as training_file, \
+            open_output(file_name_test, output_path, intent_string, for_story,
+                        output_format, compression, header) as testing_file:
+        for s in sentences:
+            if is_training(s):
+                training_file.write(s)
+            else:
+                testing_file.write(s)
+
+    print(training_file.count, "objects written in file", training_file.name)
+    print(testing_file.count, "objects written in file", testing_file.name)
+    if deduplicator is not None:
+        print(deduplicator.dropped, "duplicates dropped")
 
 
 def generate(input_path, output_path="./xwords/outputs/", intent_string=None, output_prefix='',
-             training_ratio=1.0, for_story=False, n_sub=None):
+             training_ratio=1.0, for_story=False, n_sub=None, dry_run=False,
+             max_combinations=None, workers=1, seed=None, split="exact",
+             output_format="md", compression=None, cache_dir=None,
+             coverage=None, distinct_stories=False, dedup=None, shard=None,
+             num_shards=1, shuffle=False, synonyms=None):
     """
     Summary
     ----------
@@ -141,24 +319,193 @@ def generate(input_path, output_path="./xwords/outputs/", intent_string=None, ou
         number of randomly selected sentences or created stories to subsample 
         from the total number of combinations. If None, returns the full set of 
         sentence combinations (only possible when for_story=False).       
+    dry_run:
+        if True, only counts the sentences (or stories) that would be
+        generated and returns the report, without writing any file
+    max_combinations:
+        maximum number of sentences or stories allowed to be generated. If
+        exceeded, a ValueError is raised before anything is generated
+    workers:
+        number of processes generating sentences or stories. Above 1, each
+        process writes its own shard file, merged back in order
+    seed:
+        integer seed making subsampling, stories and the training/testing
+        split reproducible, whatever the number of workers
+    split:
+        how sentences/conversations are assigned to the training set, one of
+        "exact", "bernoulli" or "hash" (see training_selector)
+    output_format:
+        "md" for Rasa markdown, "jsonl" for one JSON document per line or
+        "rasa_json" for Rasa NLU JSON training data with entity offsets
+        (sentences only)
+    compression:
+        None, "gzip", "bz2" or "lzma" to compress output files while they are
+        written
+    cache_dir:
+        path to a folder caching the sentences of each intent. When given and
+        n_sub is None, only intents whose sentence or referenced entity/alias
+        values changed since a previous run are regenerated (in the current
+        process, whatever workers)
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        the sentences of a covering array of each intent sentence, in which
+        every pair (or t-tuple) of values appears at least once
+    distinct_stories:
+        if True, the n_sub stories are drawn without duplicates among every
+        distinct story (see core_skeletons.StorySpace), in the current
+        process whatever workers. With n_sub=None, every distinct story is
+        generated
+    dedup:
+        None, or "exact" (64 bits hash set) or "bloom" (Bloom filter, for
+        outputs whose hashes do not fit in memory) to drop duplicate
+        sentences or stories before the training/testing split
+    shard:
+        index of the shard to generate, in range(num_shards), e.g. on one
+        node of a multi-node run. All combinations (or the subsample drawn
+        from seed) are numbered in the order of a single run and cut into
+        num_shards contiguous ranges, so that concatenating the files of all
+        shards, in order, gives the files of the single run. Requires a seed
+        when subsampling or generating stories and, with training_ratio
+        below 1, the "hash" split
+    num_shards:
+        number of shards of the run
+    shuffle:
+        if True, sentences or stories are written in random order instead of
+        grouped by intent, shuffled through temporary files so that outputs
+        larger than memory can be shuffled (reproducible with seed)
+    synonyms:
+        how values indented under another value (its synonyms) are
+        generated: None as independent values, "annotate" to annotate entity
+        synonyms with their canonical value, e.g. [America](geo_filter:US),
+        or "canonical" to only generate canonical values
 
     Returns
     -------
-        None.
+        None, or the report of combination_report if dry_run is True.
         Writes the number of sentences in the created training and testing sets
         files
 
     """
 
-    lines = parse_input(input_path)
-    intents_list, entities_dic, aliases_dic = populate_entry_dicts(lines)
+    annotated = output_format in ANNOTATED_FORMATS
+    if annotated and for_story:
+        raise ValueError(output_format + " output is only available for "
+                         "sentences")
+    if shard is not None:
+        # every shard must select its records without knowing the others
+        if output_format == "rasa_json":
+            raise ValueError("rasa_json files of shards cannot be "
+                             "concatenated, use md or jsonl")
+        if dedup is not None:
+            raise ValueError("duplicates cannot be dropped across shards")
+        if shuffle:
+            raise ValueError("shards cannot be shuffled together")
+        if training_ratio != 1.0 and split != "hash":
+            raise ValueError("sharded runs need the hash split")
+
+    # reusing the compiled file of the config (see compile_config) when it
+    # is up to date
+    constraints_dic = dict()
+    intents_list, entities_dic, aliases_dic = load_config(
+        input_path, constraints_dic=constraints_dic)
+    entities_dic, aliases_dic = apply_synonyms(entities_dic, aliases_dic,
+                                               synonyms)
+    # combinations forbidden by the ![name] paragraphs of the config
+    constraints = parse_constraints(constraints_dic, None,
+                                    {**entities_dic, **aliases_dic})
+
+    if for_story and intent_string is None:
+        intent_string = os.path.splitext(os.path.basename(input_path))[0]
 
     if for_story:
-        output = generate_stories(intent_string, entities_dic, n_sub)
+        if n_sub is None or distinct_stories:
+            nb_stories = count_stories(entities_dic)
+            selected = nb_stories if n_sub is None else min(n_sub, nb_stories)
+        else:
+            nb_stories = selected = n_sub if entities_dic else 0
+        report = {"intents": [], "total": nb_stories, "bytes": None,
+                  "selected": selected, "selected_bytes": None}
     else:
-        output = generate_sentences(intents_list, entities_dic, aliases_dic,
-                                    n_sub)
-    write_sentences(output, output_path, intent_string,
-                    output_prefix, training_ratio, for_story)
+        # built once, with their covering arrays, for the whole run
+        templates = build_templates(intents_list,
+                                    {**entities_dic, **aliases_dic},
+                                    constraints=constraints,
+                                    coverage=coverage)
+        report = combination_report(intents_list, entities_dic, aliases_dic,
+                                    n_sub, constraints=constraints,
+                                    coverage=coverage, templates=templates)
+
+    if dry_run:
+        for intent in report["intents"]:
+            print(intent["count"], "sentences (", intent["bytes"], "bytes ) for",
+                  intent["sentence"])
+        print(report["selected"], "objects would be generated out of",
+              report["total"], "(", report["selected_bytes"], "bytes )")
+        return report
+
+    if max_combinations is not None and report["selected"] > max_combinations:
+        raise ValueError(str(report["selected"]) + " objects to generate, "
+                         "more than max_combinations="
+                         + str(max_combinations))
+
+    if shard is not None and seed is None and (
+            report["selected"] < report["total"] if not for_story
+            else n_sub is not None):
+        raise ValueError("sharded runs need a seed to draw the same "
+                         "subsample on every shard")
 
+    split_rng = None
+    if seed is not None:
+        split_rng = random.Random(block_seed(seed, -1))
 
+    start, stop = shard_range(report["selected"], shard, num_shards)
+    if shard is not None:
+        print(stop - start, "objects in shard", shard, "of", num_shards)
+
+    if for_story:
+        if not entities_dic:
+            output = []
+        elif n_sub is None or distinct_stories:
+            space = StorySpace(intent_string, entities_dic)
+            output = space.sample(report["selected"], random.Random(seed),
+                                  start, stop)
+        elif workers > 1 or seed is not None:
+            output = iter_parallel_stories(intent_string, entities_dic, n_sub,
+                                           workers, seed, shard=shard,
+                                           num_shards=num_shards)
+        else:
+            # random choices drawn by batches of stories (see core_batch)
+            output = iter_batch_stories(intent_string, entities_dic, n_sub)
+        print(report["selected"], "stories generated")
+    else:
+        # sentences are streamed from the combination iterator to the output
+        # files, so memory does not grow with the number of combinations
+        print(report["total"], "sentences generated")
+        if report["selected"] < report["total"]:
+            print(n_sub, "sentences selected out of", report["total"])
+        if cache_dir is not None and report["selected"] == report["total"] \
+                and shard is None:
+            output = iter_cached_sentences(intents_list, entities_dic,
+                                           aliases_dic, cache_dir,
+                                           annotated=annotated,
+                                           constraints=constraints,
+                                           coverage=coverage,
+                                           templates=templates)
+        elif workers > 1 or shard is not None:
+            output = iter_parallel_sentences(intents_list, entities_dic,
+                                             aliases_dic, n_sub, workers, seed,
+                                             annotated=annotated,
+                                             constraints=constraints,
+                                             coverage=coverage, shard=shard,
+                                             num_shards=num_shards,
+                                             templates=templates)
+        else:
+            output = iter_sentences(intents_list, entities_dic, aliases_dic,
+                                    n_sub, rng=random.Random(seed),
+                                    annotated=annotated,
+                                    constraints=constraints,
+                                    coverage=coverage, templates=templates)
+    write_sentences(output, output_path, intent_string,
+                    output_prefix, training_ratio, for_story,
+                    stop - start, split_rng, split, output_format,
+                    compression, dedup, shard, num_shards, shuffle)
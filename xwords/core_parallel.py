@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_parallel.py
+    Description: helper functions to spread sentence and story generation
+                 across a pool of processes, each writing its own shard file
+    Python Version: 3.6
+"""
+
+import os
+import json
+import random
+import shutil
+import bisect
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from .core_template import SentenceTemplate
+from .core_process import count_sentences, sample_sentence_indices
+from .core_batch import iter_batch_stories
+
+# number of stories generated with the same seeded random generator
+STORY_BLOCK_SIZE = 1000
+
+# state shared by all the tasks of a worker, set once by _init_worker
+_worker_state = dict()
+
+
+def block_seed(seed, block):
+    """
+    Summary
+    ----------
+    Deriving the seed of a block of work from the seed of the whole run
+
+    Parameters
+    ----------
+    seed:
+        integer seed of the run
+    block:
+        index of the block
+
+    Returns
+    -------
+        integer seed, identical whatever the number of workers
+
+    """
+    return random.Random(seed * 1000003 + block).getrandbits(64)
+
+
+def shard_range(total, shard=None, num_shards=1):
+    """
+    Summary
+    ----------
+    Cutting the global order of total records into num_shards contiguous
+    ranges of (almost) equal sizes
+
+    Parameters
+    ----------
+    total:
+        number of records of the whole run
+    shard:
+        index of the shard in range(num_shards). If None, the whole run
+    num_shards:
+        number of shards
+
+    Returns
+    -------
+    Tuple
+        (start, stop) global positions of the records of the shard
+
+    """
+
+    if shard is None:
+        return 0, total
+    if not 0 <= shard < num_shards:
+        raise ValueError("shard " + str(shard) + " out of range(" +
+                         str(num_shards) + ")")
+    return total * shard // num_shards, total * (shard + 1) // num_shards
+
+
+def _init_worker(state):
+    _worker_state.clear()
+    _worker_state.update(state)
+    _worker_state["templates"] = dict(enumerate(state.get("templates")
+                                                or ()))
+
+
+def _get_template(i):
+    templates = _worker_state["templates"]
+    if i not in templates:
+        templates[i] = SentenceTemplate(_worker_state["intents_list"][i],
+                                        _worker_state["replacement_dic"],
+                                        False, _worker_state["grammar"],
+                                        _worker_state["constraints"],
+                                        _worker_state["coverage"])
+    return templates[i]
+
+
+def _write_shard(shard_path, task, args):
+    count = 0
+    with open(shard_path, mode='w') as shard_file:
+        for record in task(*args):
+            # one JSON document per line, as stories span several lines
+            shard_file.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def _sentence_range_task(start, stop):
+    ends = _worker_state["ends"]
+    counts = _worker_state["counts"]
+    i = bisect.bisect_right(ends, start)
+    position = start
+    while position < stop and i < len(ends):
+        offset = ends[i] - counts[i]
+        yield from _get_template(i).iter_range(position - offset,
+                                               min(stop, ends[i]) - offset,
+                                               _worker_state["annotated"])
+        position = ends[i]
+        i += 1
+
+
+def _sentence_indices_task(indices):
+    ends = _worker_state["ends"]
+    counts = _worker_state["counts"]
+    for k in indices:
+        i = bisect.bisect_right(ends, k)
+        yield _get_template(i).combination(k - ends[i] + counts[i],
+                                           _worker_state["annotated"])
+
+
+def _story_block_task(block, size, start=0, stop=None):
+    # the whole block is drawn so that its random choices do not depend on
+    # the part of it that is kept
+    yield from itertools.islice(
+        iter_batch_stories(_worker_state["intent_string"],
+                           _worker_state["entities_dic"], size,
+                           _worker_state["grammar"],
+                           block_seed(_worker_state["seed"], block), size),
+        start, stop)
+
+
+def _merge_shards(state, tasks, workers):
+    """
+    Summary
+    ----------
+    Running tasks in a pool of processes, each one writing its own shard file,
+    and streaming the shards back in task order
+
+    Parameters
+    ----------
+    state:
+        dictionary set as module state in each worker
+    tasks:
+        list of (function, arguments), the function yielding the records of
+        one shard
+    workers:
+        number of processes. If 1, tasks are run in the current process
+        without shard files
+
+    Returns
+    -------
+    Generator
+        yields records of all shards, in task order
+
+    """
+
+    if workers <= 1:
+        _init_worker(state)
+        for task, args in tasks:
+            yield from task(*args)
+        return
+
+    shard_dir = tempfile.mkdtemp(prefix="xwords_")
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(state,)) as executor:
+            shard_paths = [os.path.join(shard_dir, "shard_%06d.jsonl" % k)
+                           for k in range(len(tasks))]
+            futures = [executor.submit(_write_shard, shard_path, task, args)
+                       for shard_path, (task, args)
+                       in zip(shard_paths, tasks)]
+            for shard_path, future in zip(shard_paths, futures):
+                future.result()
+                with open(shard_path, mode='r') as shard_file:
+                    for line in shard_file:
+                        yield json.loads(line)
+                os.remove(shard_path)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def iter_parallel_sentences(intents_list, entities_dic, aliases_dic, n_sub=None,
+                            workers=1, seed=None, grammar=None,
+                            annotated=False, constraints=None,
+                            coverage=None, shard=None, num_shards=1,
+                            templates=None):
+    """
+    Summary
+    ----------
+    Generating sentences across a pool of processes. The combination space of
+    all intents is cut into contiguous index ranges, so that large intents are
+    spread over several workers too.
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file
+    aliases_dic:
+        dictionnary of all aliases in source config file
+    n_sub:
+        number of randomly selected sentences to subsample from the total
+        number of combinations. If None, yields the full set of sentence
+        combinations.
+    workers:
+        number of processes
+    seed:
+        integer seed of the subsampling. If None, a random one is drawn
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    annotated:
+        if True, yields examples with entity offsets instead of sentences
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    shard:
+        if not None, only the sentences of this shard of the global order
+        are generated (see shard_range). The subsample is drawn in full from
+        seed on every shard, so that concatenating the shards gives the
+        sentences of the whole run
+    num_shards:
+        number of shards the run is cut into
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        core_process.build_templates, so that they are built once per run
+        and sent to the workers. If None, each worker builds the templates
+        it needs
+
+    Returns
+    -------
+    Generator
+        yields the same sentences as iter_sentences with the same seed, in
+        the same order
+
+    """
+
+    counts = count_sentences(intents_list, entities_dic, aliases_dic, grammar,
+                             constraints, coverage, templates)
+    total = sum(counts)
+    state = {"intents_list": intents_list,
+             "replacement_dic": {**entities_dic, **aliases_dic},
+             "grammar": grammar, "constraints": constraints,
+             "coverage": coverage, "templates": templates,
+             "counts": counts, "annotated": annotated,
+             "ends": list(itertools.accumulate(counts))}
+    # a few tasks per worker to balance intents of uneven sizes
+    nb_tasks = max(1, 4 * workers)
+
+    if n_sub is not None and n_sub < total:
+        indices = sample_sentence_indices(intents_list,
+                                          state["replacement_dic"], counts,
+                                          n_sub, grammar, random.Random(seed),
+                                          constraints, coverage, templates)
+        start, stop = shard_range(n_sub, shard, num_shards)
+        chunk = max(1, -(-(stop - start) // nb_tasks))
+        tasks = [(_sentence_indices_task, (indices[k:min(k + chunk, stop)],))
+                 for k in range(start, stop, chunk)]
+    else:
+        start, stop = shard_range(total, shard, num_shards)
+        chunk = max(1, -(-(stop - start) // nb_tasks))
+        tasks = [(_sentence_range_task, (k, min(k + chunk, stop)))
+                 for k in range(start, stop, chunk)]
+
+    yield from _merge_shards(state, tasks, workers)
+
+
+def iter_parallel_stories(intent_string, entities_dic, n_sub, workers=1,
+                          seed=None, grammar=None, shard=None, num_shards=1):
+    """
+    Summary
+    ----------
+    Generating stories across a pool of processes. Stories are generated by
+    blocks of STORY_BLOCK_SIZE, each one with its own random generator seeded
+    from seed, so the output does not depend on the number of workers.
+
+    Parameters
+    ----------
+    intent_string:
+        intent of the stories to be generated
+    entities_dic:
+        dictionary of all entities to generate combinations
+    n_sub:
+        number of stories to create
+    workers:
+        number of processes
+    seed:
+        integer seed of the run. If None, a random one is drawn
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    shard:
+        if not None, only the stories of this shard of the run are generated
+        (see shard_range), the blocks it overlaps being drawn from seed as
+        in the whole run
+    num_shards:
+        number of shards the run is cut into
+
+    Returns
+    -------
+    Generator
+        yields generated stories
+
+    """
+
+    if seed is None:
+        seed = random.getrandbits(32)
+    if entities_dic == {}:
+        return
+    state = {"intent_string": intent_string, "entities_dic": entities_dic,
+             "grammar": grammar, "seed": seed}
+    start, stop = shard_range(n_sub, shard, num_shards)
+    tasks = list()
+    for block in range(start // STORY_BLOCK_SIZE,
+                       -(-stop // STORY_BLOCK_SIZE)):
+        offset = block * STORY_BLOCK_SIZE
+        tasks.append((_story_block_task,
+                      (block, min(STORY_BLOCK_SIZE, n_sub - offset),
+                       max(start - offset, 0), min(stop - offset,
+                                                   STORY_BLOCK_SIZE))))
+
+    yield from _merge_shards(state, tasks, workers)
@@ -9,10 +9,83 @@
     Python Version: 3.6
 """
 
-import re
+import os
+from .core_grammar import Grammar
+from .core_sources import parse_source
+from .core_constraints import parse_constraints
+from .core_weights import split_weight, WeightedValues
+from .core_synonyms import SynonymValues, indent_parents, ROOT
+from .core_expand import expand_config
 
 
-def parse_input(input_path):
+class ConfigError(ValueError):
+    """
+    Summary
+    ----------
+    Raised when a paragraph of a config file is malformed
+
+    Parameters
+    ----------
+    message:
+        description of the problem
+    line_number:
+        line (starting at 1) where the malformed paragraph starts, None if
+        unknown
+
+    """
+
+    def __init__(self, message, line_number=None):
+        if line_number is not None:
+            message = "line " + str(line_number) + ": " + message
+        super(ConfigError, self).__init__(message)
+        self.line_number = line_number
+
+
+def iter_paragraphs(input_path, keep_indent=False):
+    """
+    Summary
+    ----------
+    Reading a config file line by line and yielding its paragraphs as soon as
+    they are complete
+
+    Parameters
+    ----------
+    input_path:
+        path to config file
+    keep_indent:
+        if True, leading spaces and tabs are kept, so that the hierarchy of
+        indented values can be read by add_paragraph
+
+    Returns
+    -------
+    Generator
+        yields (line_number, lines) for each paragraph, line_number being the
+        line (starting at 1) of its first line and lines the list of its lines
+        without leading spaces and tabs (unless keep_indent)
+
+    """
+
+    paragraph = list()
+    first_line = None
+    with open(input_path, mode='r') as input_file:
+        for line_number, line in enumerate(input_file, 1):
+            # paragraphs are separated by at least 1 blank line
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                if paragraph:
+                    yield first_line, paragraph
+                    paragraph = list()
+                continue
+            if not paragraph:
+                first_line = line_number
+            # removing space and tabs at beginning of lines
+            paragraph.append(line if keep_indent else line.lstrip())
+
+    if paragraph:
+        yield first_line, paragraph
+
+
+def parse_input(input_path, keep_indent=False):
     """
     Summary
     ----------
@@ -22,34 +95,220 @@ def parse_input(input_path):
     ----------
     input_path:
         path to config file
+    keep_indent:
+        if True, leading spaces and tabs of lines are kept, e.g. to keep the
+        hierarchy of synonyms with populate_entry_dicts
 
     Returns
     -------
     List
         List (one element for each paragraph) of lists (one element for each
-        line within the paragraph)
+        line within the paragraph). An empty config file gives a single empty
+        paragraph
 
     """
 
-    with open(input_path, mode='r') as input_file:
-        text = input_file.read().rstrip()
+    lines_cleaned = [lines for _, lines in iter_paragraphs(input_path,
+                                                           keep_indent)]
+
+    return lines_cleaned or [[]]
+
+
+def add_paragraph(paragraph, intents_list, entities_dic, aliases_dic,
+                  grammar=None, line_number=None, base_path=None,
+                  constraints_dic=None):
+    """
+    Summary
+    ----------
+    Classifies a single paragraph according to input grammar, filling the
+    structures returned by populate_entry_dicts
+
+    Parameters
+    ----------
+    paragraph:
+        list of lines of the paragraph. When lines keep their leading spaces,
+        values more indented than the previous value are its synonyms
+    intents_list:
+        list of intents, extended in place
+    entities_dic:
+        dictionary of entities, updated in place
+    aliases_dic:
+        dictionary of aliases, updated in place
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    line_number:
+        line of the paragraph in the config file, used in error messages
+    base_path:
+        folder the files of values source directives are looked for in
+    constraints_dic:
+        dictionary of constraint paragraphs, updated in place. If None,
+        constraint paragraphs are refused
+
+    Returns
+    -------
+        None.
+        Raises ConfigError if an entity, alias or constraint paragraph is
+        malformed
+
+    """
+
+    if not isinstance(grammar, Grammar):
+        grammar = Grammar.from_keywords(grammar)
+    if not paragraph or not paragraph[0].strip():
+        return
+    indents = [len(line) - len(line.lstrip()) for line in
+               (line.expandtabs(4) for line in paragraph)]
+    paragraph = [line.lstrip() for line in paragraph]
+
+    if paragraph[0][0] == grammar.constraint:
+        # forbidden combinations of values, one per line, e.g.
+        # ![never]
+        #     @[geo_filter] = US, @[currency] = EUR
+        key = paragraph[0]
+        if grammar.constraint_header.match(key) is None:
+            raise ConfigError("malformed header " + repr(key) + ", expected "
+                              + grammar.constraint + "[name]", line_number)
+        if constraints_dic is None:
+            raise ConfigError(key + ": constraints are not supported here, "
+                              "use parse_config", line_number)
+        if len(paragraph) < 2:
+            raise ConfigError(key + " has no constraint", line_number)
+        try:
+            parse_constraints({key: paragraph[1:]}, grammar)
+        except ValueError as error:
+            raise ConfigError(str(error), line_number)
+        constraints_dic.setdefault(key, list()).extend(paragraph[1:])
+        return
+
+    # detecting first character of first line of the paragraph
+    if paragraph[0][0] in (grammar.entity, grammar.alias):
+        # the name may be followed by a values source directive, e.g.
+        # @[city] <file:cities.txt>
+        header = grammar.header.match(paragraph[0])
+        if header is None:
+            raise ConfigError("malformed header " + repr(paragraph[0])
+                              + ", expected " + paragraph[0][0] + "[name]",
+                              line_number)
+        key = header.group()
+        directive = paragraph[0][header.end():].strip()
+        dic = entities_dic if grammar.is_entity(key) else aliases_dic
+        if directive:
+            if len(paragraph) > 1:
+                raise ConfigError(key + " has both a values source and "
+                                  "values", line_number)
+            try:
+                dic[key] = parse_source(directive, base_path)
+            except (ValueError, OSError) as error:
+                raise ConfigError(str(error), line_number)
+        elif len(paragraph) < 2:
+            raise ConfigError(key + " has no value", line_number)
+        else:
+            # values may end with a weight, e.g. this month  ^5
+            values, weights = zip(*(split_weight(line)
+                                    for line in paragraph[1:]))
+            if any(weight == 0 for weight in weights):
+                raise ConfigError(key + " has a value of weight 0",
+                                  line_number)
+            if all(weight is None for weight in weights):
+                weights = None
+            else:
+                weights = [1.0 if weight is None else weight
+                           for weight in weights]
+            # indented values are synonyms of the value above them
+            parents = indent_parents(indents[1:])
+            if any(parent != ROOT for parent in parents):
+                dic[key] = SynonymValues(values, parents, weights)
+            elif weights is None:
+                dic[key] = paragraph[1:]
+            else:
+                dic[key] = WeightedValues(values, weights)
+    else:
+        intents_list.extend(paragraph)
+
+
+def expand_entry_dicts(entities_dic, aliases_dic, grammar=None):
+    """
+    Summary
+    ----------
+    Expanding the placeholders written in entity and alias values, e.g.
+    ~[polite_request]
+        ~[please] give me
+
+    Parameters
+    ----------
+    entities_dic:
+        dictionary of entities
+    aliases_dic:
+        dictionary of aliases
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents, constraints)
+
+    Returns
+    -------
+    Tuple
+        (entities_dic, aliases_dic) with expanded values.
+        Raises ConfigError on a cycle of placeholders
+
+    """
+
+    if not isinstance(grammar, Grammar):
+        grammar = Grammar.from_keywords(grammar)
+    try:
+        return expand_config(entities_dic, aliases_dic, grammar)
+    except ValueError as error:
+        raise ConfigError(str(error))
+
+
+def parse_config(input_path, grammar=None, constraints_dic=None, expand=True):
+    """
+    Summary
+    ----------
+    Streaming version of populate_entry_dicts(parse_input(input_path)): the
+    config file is read line by line and each paragraph is classified as soon
+    as it is complete
+
+    Parameters
+    ----------
+    input_path:
+        path to config file
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents, constraints)
+    constraints_dic:
+        dictionary filled in place with the constraint paragraphs, in the
+        form "![name]": [list of lines]. If None, constraint paragraphs are
+        refused
+    expand:
+        if True, placeholders written in entity and alias values are
+        expanded (see core_expand.expand_config)
 
-    # splitting raw text file into paragraphs
-    # paragraphs are separated by at least 2 new lines
-    # variable paragraphs is a list of strings (1 string = 1 paragraph)
-    paragraphs = re.compile("\n{2,}").split(text)
+    Returns
+    -------
+    Tuple
+        (intents_list, entities_dic, aliases_dic) as returned by
+        populate_entry_dicts.
+        Raises ConfigError, with its line number, on a malformed paragraph
 
-    # splitting each paragraph into lines
-    # variable lines is a list of lists of strings (1 string = 1 line)
-    lines = [p.splitlines() for p in paragraphs]
+    """
 
-    # removing space and tabs at beginning of lines
-    lines_cleaned = [[line.lstrip() for line in p] for p in lines]
+    intents_list = list()
+    entities_dic = dict()
+    aliases_dic = dict()
+    base_path = os.path.dirname(input_path)
+    for line_number, paragraph in iter_paragraphs(input_path, True):
+        add_paragraph(paragraph, intents_list, entities_dic, aliases_dic,
+                      grammar, line_number, base_path, constraints_dic)
 
-    return lines_cleaned
+    if expand:
+        entities_dic, aliases_dic = expand_entry_dicts(entities_dic,
+                                                       aliases_dic, grammar)
+    return intents_list, entities_dic, aliases_dic
 
 
-def populate_entry_dicts(lines_cleaned, grammar=None):
+def populate_entry_dicts(lines_cleaned, grammar=None, constraints_dic=None,
+                         expand=True):
     """
     Summary
     ----------
@@ -60,8 +319,14 @@ def populate_entry_dicts(lines_cleaned, grammar=None):
     lines_cleaned:
         List of lists as returned by parse_input
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents, constraints)
+    constraints_dic:
+        dictionary filled in place with the constraint paragraphs. If None,
+        constraint paragraphs are refused
+    expand:
+        if True, placeholders written in entity and alias values are
+        expanded (see core_expand.expand_config)
 
 
     Returns
@@ -71,24 +336,19 @@ def populate_entry_dicts(lines_cleaned, grammar=None):
         - intents_list
         - entities_dic
         - aliases_dic
+        Raises ConfigError on a malformed paragraph
 
     """
 
-    if grammar is None:
-        grammar = ["@", "~", "&"]
     intents_list = list()
     entities_dic = dict()
     aliases_dic = dict()
 
-    # populating dicts by detecting first character of first line of
-    # each paragraph
-    try:
-        for paragraph in lines_cleaned:
-            if paragraph[0][0] == grammar[0]:
-                entities_dic[paragraph[0]] = paragraph[1:]
-            elif paragraph[0][0] == grammar[1]:
-                aliases_dic[paragraph[0]] = paragraph[1:]
-            else:
-                intents_list.extend(paragraph)
-    finally:
-        return intents_list, entities_dic, aliases_dic
+    for paragraph in lines_cleaned:
+        add_paragraph(paragraph, intents_list, entities_dic, aliases_dic,
+                      grammar, constraints_dic=constraints_dic)
+
+    if expand:
+        entities_dic, aliases_dic = expand_entry_dicts(entities_dic,
+                                                       aliases_dic, grammar)
+    return intents_list, entities_dic, aliases_dic
@@ -10,10 +10,14 @@
     Python Version: 3.6
 """
 
-import re
+import bisect
 import itertools
 import random
-from .utils import unique, remove_grammar
+from .utils import sample_indices
+from .core_grammar import get_grammar
+from .core_template import SentenceTemplate, get_placeholders, \
+    format_value, format_values
+from .core_weights import sample_weighted_indices, get_alias_table
 
 
 def replace_in_str(sentence, key, value, for_story=False, grammar=None):
@@ -35,8 +39,8 @@ def replace_in_str(sentence, key, value, for_story=False, grammar=None):
         bool to indicate whether the replacement should be done according to
         Rasa Core scheme
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
 
     Returns
     -------
@@ -48,22 +52,125 @@ def replace_in_str(sentence, key, value, for_story=False, grammar=None):
 
     """
 
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
-    if for_story:  # true if replacing for Rasa Core format
-        # replacing key by "key": "value"
-        replacement = "\"" + remove_grammar(key, grammar) + \
-            "\": \"" + remove_grammar(value, grammar) + "\""
-    else:  # Rasa NLU format
-        if key[0] == grammar[1]:  # identifying an entity
-            # replacing key by [value](key)
-            replacement = "[" + value + "](" + \
-                          remove_grammar(key, grammar) + ")"
-        else:
-            # replacing key by value
-            replacement = value
+    return sentence.replace(key, format_value(key, value, for_story, grammar))
+
+
+def count_combinations(sentence, replacement_dic, grammar=None,
+                       constraints=None, coverage=None):
+    """
+    Summary
+    ----------
+    Counting combinations of a sentence without generating them
+
+    Parameters
+    ----------
+    sentence:
+        string to place combinations into
+    replacement_dic:
+        base dictionary to generate combinations from
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+
+    Returns
+    -------
+    Integer
+        number of sentences place_combinations would return
+
+    """
+
+    if constraints or coverage is not None:
+        return len(SentenceTemplate(sentence, replacement_dic, False, grammar,
+                                    constraints, coverage))
+
+    count = 1
+    for pos in get_placeholders(sentence, replacement_dic, grammar):
+        count *= len(replacement_dic[pos])
+
+    return count
+
+
+def iter_combinations(sentence, replacement_dic, for_story=False, grammar=None,
+                      constraints=None, coverage=None):
+    """
+    Summary
+    ----------
+    Lazily placing all combinations from a replacement dictionary into a
+    sentence, one at a time
+
+    Parameters
+    ----------
+    sentence:
+        string to place combinations into
+    replacement_dic:
+        base dictionary to generate combinations from
+    for_story:
+        bool to indicate whether the placement should be done according to
+        Rasa Core scheme
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+
+    Returns
+    -------
+    Generator
+        yields every valid combination of replacement elements into the
+        source sentence, in itertools.product order
+
+    """
+
+    template = SentenceTemplate(sentence, replacement_dic, for_story, grammar,
+                                constraints, coverage)
+
+    if for_story:
+        # create one random combination of dict values
+        yield template.choice()
+    else:
+        # iterate over all possible combinations of dict values
+        yield from template
+
+
+def get_combination(sentence, replacement_dic, index, grammar=None):
+    """
+    Summary
+    ----------
+    Building a single combination of a sentence from its index, without
+    building the other ones
+
+    Parameters
+    ----------
+    sentence:
+        string to place the combination into
+    replacement_dic:
+        base dictionary to generate combinations from
+    index:
+        position of the combination in the order of iter_combinations
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    String
+        the index-th combination of replacement elements into the sentence
 
-    return sentence.replace(key, replacement)
+    """
+
+    return SentenceTemplate(sentence, replacement_dic, False, grammar)[index]
 
 
 def place_combinations(sentence, replacement_dic, for_story=False, grammar=None):
@@ -82,8 +189,8 @@ def place_combinations(sentence, replacement_dic, for_story=False, grammar=None)
         bool to indicate whether the placement should be done according to
         Rasa Core scheme
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
 
     Returns
     -------
@@ -93,46 +200,368 @@ def place_combinations(sentence, replacement_dic, for_story=False, grammar=None)
 
     """
 
-    # grammar_pattern = "[%@~&]\[w+\]" # for default grammar
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
-    grammar_pattern = "[" + "".join(grammar) + r"]\[\w+\]"
+    return list(iter_combinations(sentence, replacement_dic, for_story,
+                                  grammar))
 
-    # getting placeholders in sentence while keeping order
-    placeholder_list = [pos for pos
-                        in re.compile(grammar_pattern).findall(sentence)
-                        if pos in set(replacement_dic.keys())]
-    placeholder_list = unique(placeholder_list)
 
-    # create list of replacements to be inserted into placeholders
-    placeholder_replacements = [replacement_dic[pos]
-                                for pos in placeholder_list]
+def build_templates(intents_list, replacement_dic, grammar=None,
+                    constraints=None, coverage=None):
+    """
+    Summary
+    ----------
+    Compiling each intent sentence into a SentenceTemplate, once per run:
+    counting, reporting, sampling and generating the sentences then share
+    the templates, and their covering arrays are built only once
 
-    # create all possible combinations of replacement values
-    if for_story:
-        # create one random combination of dict values
-        combinations = [[random.choice(ls) for ls in placeholder_replacements]]
-    else:
-        # create all possible combinations of dict values
-        combinations = list(itertools.product(*placeholder_replacements))
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    replacement_dic:
+        merged dictionary of entities and aliases
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+
+    Returns
+    -------
+    List
+        SentenceTemplate of each intent sentence, in order
+
+    """
+
+    return [SentenceTemplate(intent_sentence, replacement_dic, False, grammar,
+                             constraints, coverage)
+            for intent_sentence in intents_list]
+
+
+def count_sentences(intents_list, entities_dic, aliases_dic, grammar=None,
+                    constraints=None, coverage=None, templates=None):
+    """
+    Summary
+    ----------
+    Counting the sentences generated for each intent sentence, from the
+    placeholder cardinalities only
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file
+    aliases_dic:
+        dictionnary of all aliases in source config file
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        build_templates, so that they are built once per run. If None, they
+        are built from the other arguments
+
+    Returns
+    -------
+    List
+        number of valid combinations for each intent sentence, in order
+
+    """
+
+    if templates is not None:
+        return [len(template) for template in templates]
+    entities_and_aliases = {**entities_dic, **aliases_dic}
+    return [count_combinations(intent_sentence, entities_and_aliases, grammar,
+                               constraints, coverage)
+            for intent_sentence in intents_list]
+
+
+def combination_report(intents_list, entities_dic, aliases_dic, n_sub=None,
+                       grammar=None, constraints=None, coverage=None,
+                       templates=None):
+    """
+    Summary
+    ----------
+    Reporting the number of sentences and the size of the Rasa NLU output
+    for each intent sentence, without building any sentence
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file
+    aliases_dic:
+        dictionnary of all aliases in source config file
+    n_sub:
+        number of sentences to be subsampled. If not None, the overall
+        selected count and size are reported as well
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        build_templates, so that they are built once per run. If None, they
+        are built from the other arguments
+
+    Returns
+    -------
+    Dictionary
+        - "intents": list of dictionaries with the intent "sentence", its
+          exact "count" of combinations and its output size in "bytes"
+        - "total": overall number of combinations
+        - "bytes": overall output size, one "- sentence" line per combination
+        - "selected": number of sentences kept after subsampling
+        - "selected_bytes": expected output size after subsampling
+
+    """
+
+    if templates is None:
+        templates = build_templates(intents_list,
+                                    {**entities_dic, **aliases_dic}, grammar,
+                                    constraints, coverage)
+    intents = list()
+    for intent_sentence, template in zip(intents_list, templates):
+        count = len(template)
+        # each line is written as "- " + sentence + "\n"
+        intents.append({"sentence": intent_sentence, "count": count,
+                        "bytes": template.byte_size() + 3 * count})
+
+    total = sum(intent["count"] for intent in intents)
+    size = sum(intent["bytes"] for intent in intents)
+    selected = total if n_sub is None else min(n_sub, total)
+
+    return {"intents": intents, "total": total, "bytes": size,
+            "selected": selected,
+            "selected_bytes": size * selected // total if total else 0}
+
+
+def iter_sentences(intents_list, entities_dic, aliases_dic, n_sub=None,
+                   grammar=None, rng=None, annotated=False, constraints=None,
+                   coverage=None, templates=None):
+    """
+    Summary
+    ----------
+    Lazily generating all placeholder combinations for all source sentences,
+    one sentence at a time. To be used for Rasa NLU only.
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    entities_dic:
+        dictionnary of all entities in source config file, in the form
+        "entity": [list of all variants of this entity]
+    aliases_dic:
+        dictionnary of all aliases in source config file, in the form
+        "alias": [list of all variants of this alias]
+    n_sub:
+        number of randomly selected sentences to subsample from the total
+        number of combinations. If None, yields the full set of sentence
+        combinations.
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance used to subsample sentences. If None, uses the
+        random module
+    annotated:
+        if True, yields examples with entity offsets (see
+        SentenceTemplate.annotate) instead of Rasa markdown sentences
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        build_templates, so that they are built once per run. If None, they
+        are built from the other arguments
+
+    Returns
+    -------
+    Generator
+        yields generated sentences, in the same order as generate_sentences
+
+    """
+
+    grammar = get_grammar(grammar)
+    entities_and_aliases = {**entities_dic, **aliases_dic}
+
+    if n_sub is not None:
+        counts = count_sentences(intents_list, entities_dic, aliases_dic,
+                                 grammar, constraints, coverage, templates)
+        sentence_count = sum(counts)
+        if n_sub < sentence_count:
+            # sampling in the index space: only the selected sentences are
+            # ever built
+            yield from sample_sentences(intents_list, entities_and_aliases,
+                                        counts, n_sub, grammar, rng,
+                                        annotated, constraints, coverage,
+                                        templates)
+            return
+
+    if templates is not None:
+        for template in templates:
+            yield from template.iter_range(annotated=annotated) \
+                if annotated else template
+        return
+
+    for intent_sentence in intents_list:
+        # replace by every possible combination of entities and aliases
+        if annotated:
+            yield from SentenceTemplate(intent_sentence, entities_and_aliases,
+                                        False, grammar,
+                                        constraints, coverage).iter_range(
+                                            annotated=True)
+        else:
+            yield from iter_combinations(intent_sentence,
+                                         entities_and_aliases,
+                                         for_story=False, grammar=grammar,
+                                         constraints=constraints,
+                                         coverage=coverage)
+
+
+def sample_sentences(intents_list, replacement_dic, counts, n_sub,
+                     grammar=None, rng=None, annotated=False,
+                     constraints=None, coverage=None, templates=None):
+    """
+    Summary
+    ----------
+    Sampling sentences across all intents by drawing global combination
+    indices, without enumerating the combination space. Sampling is uniform,
+    unless entity or alias values are weighted (see sample_sentence_indices)
+
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    replacement_dic:
+        merged dictionary of entities and aliases
+    counts:
+        number of combinations for each intent sentence, as returned by
+        count_sentences
+    n_sub:
+        number of sentences to draw, lower than sum(counts)
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+    annotated:
+        if True, yields examples with entity offsets instead of sentences
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        build_templates, so that they are built once per run. If None, they
+        are built from the other arguments
+
+    Returns
+    -------
+    Generator
+        yields the sampled sentences, in the same order as iter_sentences
 
-    output = list()
+    """
 
-    for combi in combinations:
-        sentence_mod = sentence
-        # replacing regex matches by every possible value combination
-        match_len = len(placeholder_list)
-        if match_len >= 1:
-            for i in range(match_len):
-                sentence_mod = replace_in_str(
-                    sentence_mod, placeholder_list[i], list(combi)[i],
-                    for_story, grammar)
-        output.append(sentence_mod)
+    # global index k belongs to intent i if ends[i-1] <= k < ends[i]
+    ends = list(itertools.accumulate(counts))
+    indices = sample_sentence_indices(intents_list, replacement_dic, counts,
+                                      n_sub, grammar, rng, constraints,
+                                      coverage, templates)
+    templates = dict(enumerate(templates or ()))
+
+    for k in indices:
+        i = bisect.bisect_right(ends, k)
+        if i not in templates:
+            templates[i] = SentenceTemplate(intents_list[i], replacement_dic,
+                                            False, grammar, constraints,
+                                            coverage)
+        yield templates[i].combination(k - ends[i] + counts[i], annotated)
+
+
+def sample_sentence_indices(intents_list, replacement_dic, counts, n_sub,
+                            grammar=None, rng=None, constraints=None,
+                            coverage=None, templates=None):
+    """
+    Summary
+    ----------
+    Drawing the global indices of the sentences to subsample. Indices are
+    drawn uniformly, or, when some entity or alias values are weighted (e.g.
+    "this month  ^5"), each sentence is drawn with probability proportional
+    to the product of the weights of its values, among the sentences not
+    drawn yet
 
-    return output
+    Parameters
+    ----------
+    intents_list:
+        list of all intents in source config file
+    replacement_dic:
+        merged dictionary of entities and aliases
+    counts:
+        number of combinations for each intent sentence, as returned by
+        count_sentences
+    n_sub:
+        number of sentences to draw, lower than sum(counts)
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
+    templates:
+        list of the SentenceTemplate of each intent sentence, as returned by
+        build_templates, so that they are built once per run. If None, they
+        are built from the other arguments
 
+    Returns
+    -------
+        sorted list of n_sub distinct global indices, intent after intent
 
-def generate_sentences(intents_list, entities_dic, aliases_dic, n_sub=None, grammar=None):
+    """
+
+    if not any(getattr(values, "weights", None) is not None
+               for values in replacement_dic.values()):
+        return sample_indices(sum(counts), n_sub, rng)
+    if templates is None:
+        templates = build_templates(intents_list, replacement_dic, grammar,
+                                    constraints, coverage)
+    return sample_weighted_indices(templates, n_sub, rng)
+
+
+def generate_sentences(intents_list, entities_dic, aliases_dic, n_sub=None, grammar=None,
+                       constraints=None, coverage=None):
     """
     Summary
     ----------
@@ -154,8 +583,15 @@ def generate_sentences(intents_list, entities_dic, aliases_dic, n_sub=None, gram
         number of combinations. If None, returns the full set of sentence
         combinations.
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. If None, every combination is
+        valid
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only generate
+        a covering array of each intent sentence (see core_coverage)
 
     Returns
     -------
@@ -164,29 +600,18 @@ def generate_sentences(intents_list, entities_dic, aliases_dic, n_sub=None, gram
 
     """
 
-    # building all combinations of entities x aliases
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
-    entities_and_aliases = {**entities_dic, **aliases_dic}
-    sentence_count = 0
-    sentences = list()
-
-    # generating all intent sentences with their combinative duplicates
-    for intent_sentence in intents_list:
-        # replace by every possible combination of entities and aliases
-        combo_list = place_combinations(intent_sentence, entities_and_aliases,
-                                        for_story=False, grammar=grammar)
-        sentences.extend(combo_list)
-        sentence_count = sentence_count + len(combo_list)
+    grammar = get_grammar(grammar)
+    sentence_count = sum(count_sentences(intents_list, entities_dic,
+                                         aliases_dic, grammar, constraints,
+                                         coverage))
     print(sentence_count, "sentences generated")
 
-    # returning a subsample of generated sentences if asked
     if n_sub is not None and n_sub < sentence_count:
         print(n_sub, "sentences selected out of", sentence_count)
-        samp = sorted(random.sample(range(sentence_count), n_sub))
-        return [sentences[k] for k in samp]
-    else:
-        return sentences
+
+    return list(iter_sentences(intents_list, entities_dic, aliases_dic,
+                               n_sub, grammar, constraints=constraints,
+                               coverage=coverage))
 
 
 def generate_utter_actions(entities_dic, grammar=None):
@@ -201,8 +626,8 @@ def generate_utter_actions(entities_dic, grammar=None):
         dictionary of all entities in source config file, in the form
         "entity": [list of all variants of that entity]
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
 
     Returns
     -------
@@ -211,16 +636,15 @@ def generate_utter_actions(entities_dic, grammar=None):
 
     """
 
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
+    grammar = get_grammar(grammar)
     actions_dic = dict()
     for key in entities_dic.keys():
-        actions_dic[key] = "utter_ask_" + remove_grammar(key, grammar)
+        actions_dic[key] = "utter_ask_" + grammar.strip(key)
 
     return actions_dic
 
 
-def generate_empty_story(intent_string, entities_dic, actions_dic):
+def generate_empty_story(intent_string, entities_dic, actions_dic, rng=None):
     """
     Summary
     ----------
@@ -234,6 +658,8 @@ def generate_empty_story(intent_string, entities_dic, actions_dic):
         dictionary of entities to prepare placeholders for in intent_string
     actions_dic:
         dictionary of actions as output by generate_utter_actions
+    rng:
+        random.Random instance to draw with. If None, uses the random module
 
     Returns
     -------
@@ -242,17 +668,19 @@ def generate_empty_story(intent_string, entities_dic, actions_dic):
 
     """
 
+    if rng is None:
+        rng = random
     entities_len = len(entities_dic)
 
     # pick n random entities among the entities_len available in entities dict
     # n entities are asked in first user imput
     # n-entities_len are asked by the bot usin utter_ask_ actions
     # all entities in random order
-    n = random.randint(0, entities_len)
-    entities_input = random.sample(list(entities_dic.keys()), n)
+    n = rng.randint(0, entities_len)
+    entities_input = rng.sample(list(entities_dic.keys()), n)
     entities_asked = [ent for ent in entities_dic if ent not in entities_input]
 
-    story = "## Generated Story " + str(int(random.random()*10**15)) + "\n"
+    story = "## Generated Story " + str(int(rng.random()*10**15)) + "\n"
     story += "* " + intent_string + "{" + ', '.join(entities_input) + "}\n"
 
     for ent in entities_input:
@@ -266,7 +694,58 @@ def generate_empty_story(intent_string, entities_dic, actions_dic):
     return story
 
 
-def generate_stories(intent_string, entities_dic, n_sub, grammar=None):
+def iter_stories(intent_string, entities_dic, n_sub, grammar=None, rng=None):
+    """
+    Summary
+    ----------
+    Lazily generating stories with their combinative duplicates for Rasa Core,
+    one story at a time
+
+    Parameters
+    ----------
+    intent_string:
+        intent of the stories to be generated
+    entities_dic:
+        dictionary of all entities to generate combinations
+    n_sub:
+        number of stories to create
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+
+    Returns
+    -------
+    Generator
+        yields generated stories with combinations placed
+
+    """
+
+    grammar = get_grammar(grammar)
+    if rng is None:
+        rng = random
+
+    if entities_dic != {}:
+        actions = generate_utter_actions(entities_dic, grammar)
+        # values are formatted once, each story only draws their positions
+        columns = [(format_values(values, key, True, grammar),
+                    get_alias_table(values))
+                   for key, values in entities_dic.items()]
+        for _ in range(0, n_sub):
+            # generate one story with placeholders for entities
+            single_story = generate_empty_story(intent_string, entities_dic,
+                                                actions, rng)
+            # replace placeholders by random values picked in entities dict
+            combi = {key: values[rng.randrange(len(values)) if table is None
+                                 else table.draw(rng)]
+                     for key, (values, table) in zip(entities_dic, columns)}
+            yield grammar.placeholder.sub(
+                lambda match: combi.get(match.group(), match.group()),
+                single_story)
+
+
+def generate_stories(intent_string, entities_dic, n_sub, grammar=None, rng=None):
     """
     Summary
     ----------
@@ -284,8 +763,10 @@ def generate_stories(intent_string, entities_dic, n_sub, grammar=None):
         number of combinations. If None, returns the full set of story
         combinations.
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    rng:
+        random.Random instance to draw with. If None, uses the random module
 
     Returns
     -------
@@ -293,20 +774,10 @@ def generate_stories(intent_string, entities_dic, n_sub, grammar=None):
         List of all generated stories with combinations placed
 
     """
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
-    output_stories = list()
 
+    output_stories = list(iter_stories(intent_string, entities_dic, n_sub,
+                                       grammar, rng))
     if entities_dic != {}:
-        actions = generate_utter_actions(entities_dic, grammar)
-        for _ in range(0, n_sub):
-            # generate one story with placeholders for entities
-            single_story = generate_empty_story(intent_string, entities_dic,
-                                                actions)
-            # replace placeholders by random values picked in entities dict
-            single_story = place_combinations(single_story, entities_dic,
-                                              for_story=True)
-            output_stories.extend(single_story)
         print(n_sub, "stories generated")
 
     return output_stories
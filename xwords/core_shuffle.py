@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_shuffle.py
+    Description: helper functions to shuffle generated sentences or stories
+                 with bounded memory, through shuffled run files merged in
+                 random order
+    Python Version: 3.6
+"""
+
+import os
+import json
+import random
+import shutil
+import tempfile
+
+# number of records shuffled in memory before being spilled to a run file
+SHUFFLE_BUFFER_SIZE = 1000000
+# number of run files open at once while merging
+MERGE_FAN_IN = 64
+
+
+class RemainingCounts(object):
+    """
+    Summary
+    ----------
+    Numbers of records left in each run file, as a Fenwick tree so that the
+    run holding the r-th remaining record is found in O(log(nb_runs))
+
+    Parameters
+    ----------
+    counts:
+        list of the number of records of each run
+
+    """
+
+    def __init__(self, counts):
+        self.size = len(counts)
+        self.tree = [0] * (self.size + 1)
+        for k, count in enumerate(counts):
+            self.add(k, count)
+
+    def add(self, k, delta):
+        """
+        Summary
+        ----------
+        Adding delta to the count of run k
+
+        """
+
+        k += 1
+        while k <= self.size:
+            self.tree[k] += delta
+            k += k & -k
+
+    def find(self, r):
+        """
+        Summary
+        ----------
+        Finding the run holding the remaining record of rank r
+
+        Parameters
+        ----------
+        r:
+            integer in range(total)
+
+        Returns
+        -------
+            index of the run
+
+        """
+
+        k = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            if k + step <= self.size and self.tree[k + step] <= r:
+                k += step
+                r -= self.tree[k]
+            step >>= 1
+        return k
+
+
+def _spill(buffer, run_dir, rng):
+    rng.shuffle(buffer)
+    descriptor, run_path = tempfile.mkstemp(suffix=".jsonl", dir=run_dir)
+    with open(descriptor, mode='w', encoding="utf-8") as run_file:
+        # one JSON document per line, as stories span several lines
+        run_file.writelines(json.dumps(record) + "\n" for record in buffer)
+    return run_path
+
+
+def _iter_merged(run_paths, counts, rng):
+    # lines of the runs in random order, the next line being drawn from a run
+    # chosen with probability proportional to its remaining lines
+    run_files = [open(run_path, mode='r', encoding="utf-8")
+                 for run_path in run_paths]
+    try:
+        remaining = RemainingCounts(counts)
+        for left in range(sum(counts), 0, -1):
+            k = remaining.find(rng.randrange(left))
+            remaining.add(k, -1)
+            yield run_files[k].readline()
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+
+def _merge_runs(run_paths, counts, run_dir, rng, fan_in):
+    """
+    Summary
+    ----------
+    Merging run files fan_in at a time, pass after pass, until at most
+    fan_in of them are left. A random merge of shuffled runs is a shuffled
+    run of all their records, so the final merge is still uniform
+
+    Parameters
+    ----------
+    run_paths:
+        list of paths to the shuffled run files
+    counts:
+        list of the number of records of each run
+    run_dir:
+        folder where merged run files are written
+    rng:
+        random.Random instance to draw with
+    fan_in:
+        number of run files open at once
+
+    Returns
+    -------
+    Tuple
+        (run_paths, counts) of the runs left, merged runs being removed
+
+    """
+
+    while len(run_paths) > fan_in:
+        merged_paths, merged_counts = list(), list()
+        for k in range(0, len(run_paths), fan_in):
+            paths, group_counts = run_paths[k:k + fan_in], counts[k:k + fan_in]
+            if len(paths) > 1:
+                descriptor, merged_path = tempfile.mkstemp(suffix=".jsonl",
+                                                           dir=run_dir)
+                with open(descriptor, mode='w',
+                          encoding="utf-8") as merged_file:
+                    merged_file.writelines(_iter_merged(paths, group_counts,
+                                                        rng))
+                for path in paths:
+                    os.remove(path)
+                paths = [merged_path]
+            merged_paths += paths
+            merged_counts.append(sum(group_counts))
+        run_paths, counts = merged_paths, merged_counts
+    return run_paths, counts
+
+
+def iter_shuffled(records, rng=None, buffer_size=SHUFFLE_BUFFER_SIZE,
+                  temp_dir=None, fan_in=MERGE_FAN_IN):
+    """
+    Summary
+    ----------
+    Shuffling records with at most buffer_size of them in memory: records are
+    gathered by runs of buffer_size, each run is shuffled and spilled to a
+    temporary file, then the runs are merged by drawing the next record from
+    a run chosen with probability proportional to its remaining records,
+    which makes every permutation equally likely. Beyond fan_in runs, runs
+    are first merged into larger ones (see _merge_runs), so that at most
+    fan_in files are open at once
+
+    Parameters
+    ----------
+    records:
+        iterable of sentences, annotated examples or stories (JSON
+        serializable), consumed once
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+    buffer_size:
+        number of records held in memory
+    temp_dir:
+        folder where run files are written. If None, uses the default
+        temporary folder
+    fan_in:
+        maximum number of run files open at once, at least 2
+
+    Returns
+    -------
+    Generator
+        yields the records in random order. Run files are removed once the
+        generator is exhausted or closed
+
+    """
+
+    if rng is None:
+        rng = random
+
+    buffer = list()
+    run_dir = None
+    run_paths = list()
+    counts = list()
+    try:
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= buffer_size:
+                if run_dir is None:
+                    run_dir = tempfile.mkdtemp(prefix="xwords_shuffle_",
+                                               dir=temp_dir)
+                run_paths.append(_spill(buffer, run_dir, rng))
+                counts.append(len(buffer))
+                buffer.clear()
+
+        if not run_paths:
+            # small outputs are shuffled in memory
+            rng.shuffle(buffer)
+            yield from buffer
+            return
+        if buffer:
+            run_paths.append(_spill(buffer, run_dir, rng))
+            counts.append(len(buffer))
+            buffer.clear()
+
+        run_paths, counts = _merge_runs(run_paths, counts, run_dir, rng,
+                                        fan_in)
+        for line in _iter_merged(run_paths, counts, rng):
+            yield json.loads(line)
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir, ignore_errors=True)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_skeletons.py
+    Description: every distinct story of an intent, as one indexable space:
+                 skeletons (which entities the first user input gives, and
+                 in which order) times entity value tuples
+    Python Version: 3.6
+"""
+
+import math
+import functools
+import itertools
+from collections.abc import Sequence
+from .utils import unrank, sample_indices
+from .core_grammar import get_grammar
+from .core_template import format_values
+from .core_batch import StoryFormatter
+
+# skeleton lists up to this size are built once and kept in memory, larger
+# ones are decoded from their index on each access
+SKELETON_CACHE_SIZE = 100000
+
+
+class StorySkeletons(Sequence):
+    """
+    Summary
+    ----------
+    Distinct story skeletons for a number of entities: the entities given in
+    the first user input, in order, the bot asking for the others in config
+    order, as in core_process.generate_empty_story and
+    core_batch.iter_batch_stories. Skeletons are numbered by number of
+    entities given, then in itertools.permutations order
+
+    Parameters
+    ----------
+    nb_entities:
+        number of entities of the stories
+
+    """
+
+    def __init__(self, nb_entities):
+        self.nb_entities = nb_entities
+        # number of skeletons whose first user input gives n entities
+        self.blocks = [math.factorial(nb_entities)
+                       // math.factorial(nb_entities - n)
+                       for n in range(nb_entities + 1)]
+        self.count = sum(self.blocks)
+        self._skeletons = None
+        if self.count <= SKELETON_CACHE_SIZE:
+            self._skeletons = list(self._iter_skeletons())
+
+    def _iter_skeletons(self):
+        entities = range(self.nb_entities)
+        for n in range(self.nb_entities + 1):
+            for inputs in itertools.permutations(entities, n):
+                yield inputs, tuple(e for e in entities if e not in inputs)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self._skeletons is not None:
+            return iter(self._skeletons)
+        return self._iter_skeletons()
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("skeleton index out of range")
+        if self._skeletons is not None:
+            return self._skeletons[index]
+        return self.unrank(index)
+
+    def unrank(self, index):
+        """
+        Summary
+        ----------
+        Decoding a skeleton index, in O(nb_entities^2) operations
+
+        Parameters
+        ----------
+        index:
+            integer in range(len(self))
+
+        Returns
+        -------
+        Tuple
+            (inputs, asked): tuple of the entity positions given in the first
+            user input, in order, and tuple of the positions the bot asks
+            for, in increasing order
+
+        """
+
+        n = 0
+        while index >= self.blocks[n]:
+            index -= self.blocks[n]
+            n += 1
+
+        # Lehmer code of the n entities given, lexicographic order: each
+        # choice of the j-th entity is followed by the arrangements of the
+        # n - j - 1 next ones among the nb_entities - j - 1 left
+        rest = list(range(self.nb_entities))
+        inputs = list()
+        for j in range(n):
+            count = math.factorial(self.nb_entities - j - 1) // \
+                math.factorial(self.nb_entities - n)
+            choice, index = divmod(index, count)
+            inputs.append(rest.pop(choice))
+
+        return tuple(inputs), tuple(rest)
+
+
+@functools.lru_cache(maxsize=16)
+def story_skeletons(nb_entities):
+    """
+    Summary
+    ----------
+    Getting the skeletons for a number of entities, built once per process
+
+    Parameters
+    ----------
+    nb_entities:
+        number of entities of the stories
+
+    Returns
+    -------
+        StorySkeletons
+
+    """
+
+    return StorySkeletons(nb_entities)
+
+
+def count_stories(entities_dic):
+    """
+    Summary
+    ----------
+    Counting the distinct stories of an intent without building them
+
+    Parameters
+    ----------
+    entities_dic:
+        dictionary of all entities to generate combinations
+
+    Returns
+    -------
+    Integer
+        number of skeletons times number of entity value tuples, 0 without
+        entities
+
+    """
+
+    if not entities_dic:
+        return 0
+    count = len(story_skeletons(len(entities_dic)))
+    for values in entities_dic.values():
+        count *= len(values)
+    return count
+
+
+class StorySpace(Sequence):
+    """
+    Summary
+    ----------
+    Every distinct story of an intent, numbered skeleton after skeleton, value
+    tuples in itertools.product order within each skeleton. Any story is
+    built from its index, so stories can be enumerated, or sampled without
+    duplicates, without building the others
+
+    Parameters
+    ----------
+    intent_string:
+        intent of the stories to be generated
+    entities_dic:
+        dictionary of all entities to generate combinations
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    """
+
+    def __init__(self, intent_string, entities_dic, grammar=None):
+        grammar = get_grammar(grammar)
+        keys = list(entities_dic)
+        self.skeletons = story_skeletons(len(keys))
+        self.values = [format_values(entities_dic[key], key, True, grammar)
+                       for key in keys]
+        self.cardinalities = [len(values) for values in self.values]
+        self.nb_values = 1
+        for cardinality in self.cardinalities:
+            self.nb_values *= cardinality
+        self.formatter = StoryFormatter(intent_string, keys, grammar)
+        self.count = count_stories(entities_dic)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("story index out of range")
+        skeleton, value_index = divmod(index, self.nb_values)
+        inputs, asked = self.skeletons[skeleton]
+        combi = [values[k] for values, k in
+                 zip(self.values, unrank(value_index, self.cardinalities))]
+        # the index makes a unique story title
+        return self.formatter.join(index, inputs, asked, combi)
+
+    def iter_range(self, start=0, stop=None):
+        """
+        Summary
+        ----------
+        Building the stories of index start (included) to stop (excluded)
+
+        Returns
+        -------
+        Generator
+            yields stories, in index order
+
+        """
+
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(start, stop):
+            yield self[index]
+
+    def sample(self, n_sub, rng=None, start=0, stop=None):
+        """
+        Summary
+        ----------
+        Drawing distinct stories uniformly
+
+        Parameters
+        ----------
+        n_sub:
+            number of stories to draw. If higher than len(self), every story
+            is built
+        rng:
+            random.Random instance to draw with. If None, uses the random
+            module
+        start, stop:
+            only the drawn stories of rank start (included) to stop
+            (excluded) are built, e.g. one shard of the sample
+
+        Returns
+        -------
+        Generator
+            yields the drawn stories, in index order
+
+        """
+
+        if n_sub >= self.count:
+            yield from self.iter_range(start, stop)
+            return
+        for index in sample_indices(self.count, n_sub, rng)[start:stop]:
+            yield self[index]
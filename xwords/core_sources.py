@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_sources.py
+    Description: entity and alias values read on demand from outside the
+                 config file or generated on demand, e.g.
+                 @[city] <file:cities.txt>
+                 @[party_size] <range:1..500>
+                 @[day] <date:2018-01-01..2018-12-31>
+                 @[booking_id] <pattern:ID-[0-9]{4}[A-Z]>
+    Python Version: 3.6
+"""
+
+import os
+import re
+import datetime
+import mmap
+import array
+import hashlib
+from collections.abc import Sequence
+from .utils import unique, unrank
+
+# "<kind:argument>" following the name of an entity or alias
+SOURCE_PATTERN = re.compile(r"<(\w+):(.*)>$")
+# character class, escaped character or literal character of a pattern,
+# optionally repeated {n} times
+PATTERN_TOKEN = re.compile(r"(?:\[(?P<cls>[^\]]+)\]|\\(?P<escaped>.)"
+                           r"|(?P<char>[^\[\\]))(?:\{(?P<repeat>\d+)\})?")
+
+
+class FileValues(Sequence):
+    """
+    Summary
+    ----------
+    Values listed one per line in an external file. The file is memory-mapped
+    and indexed by line offsets, values are decoded when accessed.
+
+    Parameters
+    ----------
+    path:
+        path to the values file (UTF-8, one value per line, blank lines being
+        ignored)
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._digest = None
+        with open(path, mode='rb') as values_file:
+            if os.fstat(values_file.fileno()).st_size == 0:
+                self.buffer = b""
+            else:
+                self.buffer = mmap.mmap(values_file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+
+        # offsets[k] and ends[k] delimit the k-th non blank line
+        self.offsets = array.array("Q")
+        self.ends = array.array("Q")
+        size = len(self.buffer)
+        start = 0
+        while start < size:
+            end = self.buffer.find(b"\n", start)
+            if end == -1:
+                end = size
+            stop = end
+            if stop > start and self.buffer[stop - 1:stop] == b"\r":
+                stop -= 1
+            if self.buffer[start:stop].strip():
+                self.offsets.append(start)
+                self.ends.append(stop)
+            start = end + 1
+
+    def __reduce__(self):
+        # mmaps cannot be pickled: worker processes map the file again
+        return FileValues, (self.path,)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        return self.buffer[self.offsets[index]:self.ends[index]].decode(
+            "utf-8").strip()
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self):
+        return "FileValues(" + repr(self.path) + ")"
+
+    @property
+    def directive(self):
+        return "<file:" + os.path.abspath(self.path) + ">"
+
+    def digest(self):
+        """
+        Summary
+        ----------
+        Hashing the values without decoding them
+
+        Returns
+        -------
+        String
+            hexadecimal sha256 digest of the file content
+
+        """
+
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.buffer).hexdigest()
+        return self._digest
+
+
+class GeneratedValues(Sequence):
+    """
+    Summary
+    ----------
+    Base class of values computed from their index, never stored. Subclasses
+    implement __len__ and value(index).
+
+    Parameters
+    ----------
+    argument:
+        argument of the directive, e.g. "1..500" for <range:1..500>
+
+    """
+
+    kind = None
+
+    def __init__(self, argument):
+        self.argument = argument
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.value(k) for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(self.kind + " value index out of range")
+        return self.value(index)
+
+    def __eq__(self, other):
+        return isinstance(other, GeneratedValues) and \
+            self.directive == other.directive
+
+    def __hash__(self):
+        return hash(self.directive)
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + repr(self.argument) + ")"
+
+    @property
+    def directive(self):
+        return "<" + self.kind + ":" + self.argument + ">"
+
+    def digest(self):
+        # values only depend on the directive
+        return self.directive
+
+    def value(self, index):
+        raise NotImplementedError
+
+
+class RangeValues(GeneratedValues):
+    """
+    Summary
+    ----------
+    Integers from START to STOP included, every STEP (1 by default):
+    <range:START..STOP> or <range:START..STOP:STEP>
+
+    """
+
+    kind = "range"
+
+    def __init__(self, argument):
+        super(RangeValues, self).__init__(argument)
+        match = re.match(r"(-?\d+)\.\.(-?\d+)(?::(-?\d+))?$",
+                         argument.replace(" ", ""))
+        if match is None:
+            raise ValueError("malformed range " + repr(argument)
+                             + ", expected START..STOP or START..STOP:STEP")
+        start, stop = int(match.group(1)), int(match.group(2))
+        step = int(match.group(3) or 1)
+        if step == 0:
+            raise ValueError("range step cannot be 0")
+        self.range = range(start, stop + (1 if step > 0 else -1), step)
+
+    def __len__(self):
+        return len(self.range)
+
+    def value(self, index):
+        return str(self.range[index])
+
+
+class DateValues(GeneratedValues):
+    """
+    Summary
+    ----------
+    Every day from START to STOP included, both written YYYY-MM-DD, output
+    with an optional strftime FORMAT (YYYY-MM-DD by default):
+    <date:START..STOP> or <date:START..STOP:FORMAT>
+
+    """
+
+    kind = "date"
+
+    def __init__(self, argument):
+        super(DateValues, self).__init__(argument)
+        match = re.match(r"\s*(\d{4}-\d{2}-\d{2})\s*\.\.\s*"
+                         r"(\d{4}-\d{2}-\d{2})\s*(?::(.+))?$", argument)
+        if match is None:
+            raise ValueError("malformed date range " + repr(argument)
+                             + ", expected YYYY-MM-DD..YYYY-MM-DD")
+        self.start = datetime.date(*map(int, match.group(1).split("-")))
+        stop = datetime.date(*map(int, match.group(2).split("-")))
+        self.days = max(0, (stop - self.start).days + 1)
+        self.format = match.group(3) or "%Y-%m-%d"
+
+    def __len__(self):
+        return self.days
+
+    def value(self, index):
+        return (self.start + datetime.timedelta(days=index)).strftime(
+            self.format)
+
+
+class PatternValues(GeneratedValues):
+    """
+    Summary
+    ----------
+    Every string matching a simple pattern made of literal characters and
+    character classes such as [0-9] or [A-Z], optionally repeated {n} times:
+    <pattern:ID-[0-9]{4}>
+
+    """
+
+    kind = "pattern"
+
+    def __init__(self, argument):
+        super(PatternValues, self).__init__(argument)
+        # one list of possible characters for each position
+        self.positions = list()
+        for match in PATTERN_TOKEN.finditer(argument):
+            if match.group("cls") is not None:
+                characters = _expand_class(match.group("cls"))
+            else:
+                characters = [match.group("escaped") or match.group("char")]
+            self.positions.extend([characters] * int(match.group("repeat")
+                                                     or 1))
+        self.cardinalities = [len(characters)
+                              for characters in self.positions]
+
+    def __len__(self):
+        count = 1
+        for cardinality in self.cardinalities:
+            count *= cardinality
+        return count
+
+    def value(self, index):
+        return "".join(characters[k] for characters, k
+                       in zip(self.positions, unrank(index,
+                                                     self.cardinalities)))
+
+
+def _expand_class(character_class):
+    # "0-9A-F_" -> ["0", ..., "9", "A", ..., "F", "_"]
+    characters = list()
+    for match in re.finditer(r"(.)-(.)|(.)", character_class):
+        if match.group(3) is not None:
+            characters.append(match.group(3))
+        else:
+            characters.extend(chr(code) for code in
+                              range(ord(match.group(1)),
+                                    ord(match.group(2)) + 1))
+    return unique(characters)
+
+
+# values source for each kind of directive
+SOURCES = {"file": FileValues,
+           "range": RangeValues,
+           "date": DateValues,
+           "pattern": PatternValues}
+
+
+def parse_source(directive, base_path=None):
+    """
+    Summary
+    ----------
+    Building the values of an entity or alias from its source directive
+
+    Parameters
+    ----------
+    directive:
+        string of the form "<kind:argument>", e.g. "<file:cities.txt>"
+    base_path:
+        folder relative file paths are resolved from, usually the folder of
+        the config file
+
+    Returns
+    -------
+    Sequence
+        values of the entity or alias, supporting len and indexing.
+        Raises ValueError on an unknown or malformed directive
+
+    """
+
+    match = SOURCE_PATTERN.match(directive.strip())
+    if match is None or match.group(1) not in SOURCES:
+        raise ValueError("unknown values source " + repr(directive)
+                         + ", expected one of "
+                         + ", ".join("<" + kind + ":...>" for kind in SOURCES))
+
+    kind, argument = match.group(1), match.group(2).strip()
+    if kind == "file" and base_path is not None:
+        argument = os.path.join(base_path, argument)
+    return SOURCES[kind](argument)
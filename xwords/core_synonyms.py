@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_synonyms.py
+    Description: helper functions to keep the hierarchy of indented entity
+                 and alias values, e.g.
+                 @[geo_filter]
+                     US
+                         United States
+                         America
+    Python Version: 3.6
+"""
+
+import sys
+import array
+import bisect
+from .core_weights import WeightedValues
+
+# parent of the canonical (top level) values
+ROOT = -1
+SYNONYM_MODES = ("annotate", "canonical")
+
+
+class SynonymTree(object):
+    """
+    Summary
+    ----------
+    Hierarchy of the values of an entity or alias, in file order: each value
+    is followed by all its synonyms, so the synonyms of a canonical value are
+    the values up to the next canonical value
+
+    Parameters
+    ----------
+    parents:
+        position of the parent of each value, ROOT for canonical values
+
+    """
+
+    def __init__(self, parents):
+        if not isinstance(parents, (array.array, memoryview)):
+            parents = array.array("i", parents)
+        self.parents = parents
+        # position of each canonical value, then the number of values
+        self.offsets = array.array("L", (k for k, parent in enumerate(parents)
+                                         if parent == ROOT))
+        if len(parents) and (not self.offsets or self.offsets[0] != 0):
+            raise ValueError("the first value cannot be a synonym")
+        self.offsets.append(len(parents))
+
+    def __len__(self):
+        return len(self.parents)
+
+    def canonical(self, position):
+        """
+        Summary
+        ----------
+        Finding the canonical value a value is a synonym of
+
+        Parameters
+        ----------
+        position:
+            position of the value
+
+        Returns
+        -------
+            position of its canonical value (itself for canonical values)
+
+        """
+
+        return self.offsets[bisect.bisect_right(self.offsets, position) - 1]
+
+    def canonical_positions(self):
+        """
+        Summary
+        ----------
+        Listing the positions of canonical values
+
+        """
+
+        return self.offsets[:-1]
+
+
+def indent_parents(indents):
+    """
+    Summary
+    ----------
+    Building the hierarchy of values from their indentation: a value is a
+    synonym of the closest previous value less indented than itself
+
+    Parameters
+    ----------
+    indents:
+        indentation width of each value line
+
+    Returns
+    -------
+    List
+        position of the parent of each value, ROOT for the least indented ones
+
+    """
+
+    parents = list()
+    stack = list()
+    for position, indent in enumerate(indents):
+        while stack and indents[stack[-1]] >= indent:
+            stack.pop()
+        parents.append(stack[-1] if stack else ROOT)
+        stack.append(position)
+    return parents
+
+
+class SynonymValues(WeightedValues):
+    """
+    Summary
+    ----------
+    List of values (weighted or not) with their hierarchy, which compares
+    equal to the plain list of its values
+
+    Parameters
+    ----------
+    values:
+        list of values, in file order
+    parents:
+        SynonymTree, or position of the parent of each value
+    weights:
+        weight of each value, None if the values are not weighted
+    annotate_synonyms:
+        if True, entity synonyms are formatted with their canonical value,
+        e.g. [America](geo_filter:US)
+
+    """
+
+    def __init__(self, values, parents, weights=None,
+                 annotate_synonyms=False):
+        list.__init__(self, values)
+        self.weights = None if weights is None else list(weights)
+        if self.weights is not None and len(self.weights) != len(self):
+            raise ValueError("one weight is expected for each value")
+        self._table = None
+        if not isinstance(parents, SynonymTree):
+            parents = SynonymTree(parents)
+        if len(parents) != len(self):
+            raise ValueError("one parent is expected for each value")
+        self.synonyms = parents
+        self.annotate_synonyms = annotate_synonyms
+
+    def __reduce__(self):
+        return SynonymValues, (list(self), list(self.synonyms.parents),
+                               self.weights, self.annotate_synonyms)
+
+
+def get_canonical_values(values):
+    """
+    Summary
+    ----------
+    Getting the canonical value of each value, when its synonyms are to be
+    annotated
+
+    Parameters
+    ----------
+    values:
+        values of an entity or alias
+
+    Returns
+    -------
+        list of the (interned) canonical value of each value, or None if
+        synonyms are not annotated
+
+    """
+
+    if not getattr(values, "annotate_synonyms", False):
+        return None
+    canonicals = dict()
+    tree = values.synonyms
+    result = list()
+    for position, value in enumerate(values):
+        canonical = tree.canonical(position)
+        if canonical not in canonicals:
+            canonicals[canonical] = sys.intern(values[canonical])
+        result.append(canonicals[canonical])
+    return result
+
+
+def apply_synonyms(entities_dic, aliases_dic, synonyms=None):
+    """
+    Summary
+    ----------
+    Choosing how the synonyms of hierarchical values are generated
+
+    Parameters
+    ----------
+    entities_dic:
+        dictionary of all entities in source config file
+    aliases_dic:
+        dictionary of all aliases in source config file
+    synonyms:
+        - None: every value is generated as an independent value
+        - "annotate": entity synonyms are annotated with their canonical
+          value, e.g. [America](geo_filter:US), and the "value" of JSON
+          examples is the canonical value
+        - "canonical": only canonical values of entities and aliases are
+          generated, e.g. US and not America
+
+    Returns
+    -------
+    Tuple
+        (entities_dic, aliases_dic), values without hierarchy being kept as
+        they are
+
+    """
+
+    if synonyms is None:
+        return entities_dic, aliases_dic
+    if synonyms not in SYNONYM_MODES:
+        raise ValueError("unknown synonyms mode: " + str(synonyms))
+
+    def canonical_only(values):
+        positions = values.synonyms.canonical_positions()
+        canonicals = [values[position] for position in positions]
+        weights = getattr(values, "weights", None)
+        if weights is None:
+            return canonicals
+        return WeightedValues(canonicals,
+                              [weights[position] for position in positions])
+
+    def annotated(values):
+        return SynonymValues(list(values), values.synonyms,
+                             getattr(values, "weights", None), True)
+
+    dics = list()
+    for dic, transform in ((entities_dic, annotated),
+                           (aliases_dic, None)):
+        if synonyms == "canonical":
+            transform = canonical_only
+        dics.append({key: transform(values)
+                     if transform is not None
+                     and getattr(values, "synonyms", None) is not None
+                     else values
+                     for key, values in dic.items()})
+    return tuple(dics)
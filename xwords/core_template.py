@@ -0,0 +1,646 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_template.py
+    Description: intent sentences compiled once into templates, so that each
+                 combination is built with a single join
+    Python Version: 3.6
+"""
+
+import re
+import random
+import itertools
+from collections.abc import Sequence
+from .utils import unique, unrank, rank
+from .core_grammar import get_grammar
+from .core_constraints import ConstrainedSpace
+from .core_coverage import coverage_strength, covering_array
+from .core_weights import AliasTable, get_alias_table
+from .core_synonyms import get_canonical_values
+
+
+def get_placeholders(sentence, replacement_dic, grammar=None):
+    """
+    Summary
+    ----------
+    Listing the placeholders of a sentence that can be replaced
+
+    Parameters
+    ----------
+    sentence:
+        string to look for placeholders into
+    replacement_dic:
+        base dictionary to generate combinations from
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    List
+        placeholders found in replacement_dic, without duplicates and in order
+        of appearance in the sentence
+
+    """
+
+    # getting placeholders in sentence while keeping order
+    placeholder_list = [pos for pos
+                        in get_grammar(grammar).placeholders(sentence)
+                        if pos in replacement_dic]
+
+    return unique(placeholder_list)
+
+
+def format_value(key, value, for_story=False, grammar=None, canonical=None):
+    """
+    Summary
+    ----------
+    Formatting a placeholder value to comply with Rasa NLU/Core training
+    structure
+
+    Parameters
+    ----------
+    key:
+        placeholder the value replaces
+    value:
+        string to use as value in the replacing scheme
+    for_story:
+        bool to indicate whether the formatting should be done according to
+        Rasa Core scheme
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    String
+        either:
+        - "key": "value" (Rasa Core training format)
+        - [value](key) (Rasa NLU training format for entities)
+        - value (Rasa NLU training format for aliases and intents)
+        - [value](key:canonical) (Rasa NLU training format for entity
+          synonyms)
+
+    """
+
+    grammar = get_grammar(grammar)
+    if for_story:  # true if replacing for Rasa Core format
+        return "\"" + grammar.strip(key) + \
+            "\": \"" + grammar.strip(value) + "\""
+    if grammar.is_entity(key):  # identifying an entity
+        if canonical is not None and canonical != value:
+            return "[" + value + "](" + grammar.strip(key) + ":" + \
+                canonical + ")"
+        return "[" + value + "](" + grammar.strip(key) + ")"
+    return value
+
+
+class FormattedValues(Sequence):
+    """
+    Summary
+    ----------
+    Values of a placeholder formatted on access, for value sources too large
+    to be formatted ahead of time (see core_sources)
+
+    Parameters
+    ----------
+    values:
+        sequence of raw values
+    key:
+        placeholder the values replace
+    for_story:
+        bool to indicate whether the values should be formatted according to
+        Rasa Core scheme
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    """
+
+    def __init__(self, values, key, for_story=False, grammar=None):
+        self.raw_values = values
+        self.key = key
+        self.for_story = for_story
+        self.grammar = get_grammar(grammar)
+
+    def __len__(self):
+        return len(self.raw_values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        return format_value(self.key, self.raw_values[index], self.for_story,
+                            self.grammar)
+
+
+def format_values(values, key, for_story=False, grammar=None):
+    """
+    Summary
+    ----------
+    Formatting all values of a placeholder, ahead of time for value lists
+    (parsed or compiled) and on access for value sources (see core_sources
+    and core_expand), which may be too large to be formatted at once
+
+    Parameters
+    ----------
+    values:
+        sequence of raw values
+    key:
+        placeholder the values replace
+    for_story:
+        bool to indicate whether the values should be formatted according to
+        Rasa Core scheme
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+
+    Returns
+    -------
+    Sequence
+        list, or FormattedValues for value sources
+
+    """
+
+    canonicals = None if for_story else get_canonical_values(values)
+    if canonicals is not None:
+        return [format_value(key, value, for_story, grammar, canonical)
+                for value, canonical in zip(values, canonicals)]
+    # value sources are told apart from value lists by their digest
+    if isinstance(values, list) or not hasattr(values, "digest"):
+        return [format_value(key, value, for_story, grammar)
+                for value in values]
+    return FormattedValues(values, key, for_story, grammar)
+
+
+def _value_range(values, start, stop):
+    # slicing lists is fastest, lazy sequences are only read where needed
+    if isinstance(values, list):
+        return values[start:stop]
+    return map(values.__getitem__, range(start, stop))
+
+
+class SentenceTemplate(object):
+    """
+    Summary
+    ----------
+    Intent sentence compiled once into literal segments and slot references,
+    with every placeholder value formatted ahead of time. Combinations are
+    indexed in itertools.product order over the placeholders. Combinations
+    can also be built as annotated examples, the character offsets of every
+    entity being computed while the sentence is assembled.
+
+    Parameters
+    ----------
+    sentence:
+        string to place combinations into
+    replacement_dic:
+        base dictionary to generate combinations from
+    for_story:
+        bool to indicate whether the values should be formatted according to
+        Rasa Core scheme
+    grammar:
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
+    constraints:
+        forbidden combinations of values, as returned by
+        core_constraints.parse_constraints. Combinations meeting one of them
+        are neither counted, indexed nor built
+    coverage:
+        None for all combinations, "pairwise" or "<t>-wise" to only keep the
+        combinations of a covering array (see core_coverage)
+
+    """
+
+    def __init__(self, sentence, replacement_dic, for_story=False,
+                 grammar=None, constraints=None, coverage=None):
+        grammar = get_grammar(grammar)
+        self.sentence = sentence
+        self.placeholders = get_placeholders(sentence, replacement_dic,
+                                             grammar)
+        self.values = [format_values(replacement_dic[key], key, for_story,
+                                     grammar)
+                       for key in self.placeholders]
+        self.raw_values = [replacement_dic[key] for key in self.placeholders]
+        self.cardinalities = [len(values) for values in self.values]
+        # alias table of each weighted placeholder, None for the others
+        self.alias_tables = [get_alias_table(values)
+                             for values in self.raw_values]
+        self.weighted = any(table is not None for table in self.alias_tables)
+        self._rows_table = None
+        # entity name of each placeholder, None for aliases
+        self.entities = [grammar.strip(key)
+                         if grammar.is_entity(key) else None
+                         for key in self.placeholders]
+        # canonical value of each annotated synonym, e.g. "America": "US"
+        self.canonical_maps = list()
+        for values in self.raw_values:
+            canonicals = get_canonical_values(values)
+            self.canonical_maps.append(None if canonicals is None else {
+                value: canonical for value, canonical
+                in zip(values, canonicals) if value != canonical})
+
+        # splitting the sentence around every occurrence of a placeholder:
+        # literal segments stay in self.parts, slots record which part is
+        # filled by which placeholder
+        position = {key: i for i, key in enumerate(self.placeholders)}
+        pattern = "|".join(re.escape(key) for key in self.placeholders)
+        self.parts = list()
+        self.slots = list()
+        start = 0
+        for match in (re.finditer(pattern, sentence) if pattern else ()):
+            self.parts.append(sentence[start:match.start()])
+            self.slots.append((len(self.parts), position[match.group()]))
+            self.parts.append(None)
+            start = match.end()
+        self.parts.append(sentence[start:])
+        # parts alternate between literals and slots, so the literal
+        # preceding the j-th slot is parts[2 * j]
+        self.literal_lengths = [len(part) for part in self.parts[::2]]
+
+        self.space = None
+        if constraints:
+            space = ConstrainedSpace(self, constraints)
+            if space:
+                self.space = space
+
+        # value positions of the selected combinations, None for all of them
+        self.rows = None
+        strength = coverage_strength(coverage)
+        if strength is not None:
+            self.rows = covering_array(
+                self.cardinalities, strength,
+                self.space.complete if self.space is not None else None)
+
+    def __len__(self):
+        if self.rows is not None:
+            return len(self.rows)
+        if self.space is not None:
+            return len(self.space)
+        count = 1
+        for cardinality in self.cardinalities:
+            count *= cardinality
+        return count
+
+    def __iter__(self):
+        if self.rows is not None:
+            return map(self.render, self.rows)
+        if self.space is not None:
+            return map(self.render, self.space.iter_positions())
+        if all(isinstance(values, list) for values in self.values):
+            return map(self.join, itertools.product(*self.values))
+        # itertools.product would load lazy value sources entirely
+        return self.iter_range()
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("combination index out of range")
+        return self.combination(index)
+
+    def combination(self, index, annotated=False):
+        """
+        Summary
+        ----------
+        Building the combination of a given index
+
+        Parameters
+        ----------
+        index:
+            position of the combination in itertools.product order
+        annotated:
+            if True, builds an annotated example instead of a sentence
+
+        Returns
+        -------
+        String or Dictionary
+            sentence, or example as returned by annotate
+
+        """
+
+        return self.render(self.positions(index), annotated)
+
+    def positions(self, index):
+        """
+        Summary
+        ----------
+        Decoding the index of a combination into value positions
+
+        Parameters
+        ----------
+        index:
+            position of the combination in itertools.product order
+
+        Returns
+        -------
+        List
+            index of the value of each placeholder, in order
+
+        """
+
+        if self.rows is not None:
+            return self.rows[index]
+        if self.space is not None:
+            return self.space.unrank(index)
+        return unrank(index, self.cardinalities)
+
+    def iter_range(self, start=0, stop=None, annotated=False):
+        """
+        Summary
+        ----------
+        Building the combinations of index start (included) to stop
+        (excluded), without building the ones before start
+
+        Parameters
+        ----------
+        start:
+            index of the first combination
+        stop:
+            index following the last combination. If None, goes to the end
+        annotated:
+            if True, builds annotated examples instead of sentences
+
+        Returns
+        -------
+        Generator
+            yields sentences (or examples) in itertools.product order
+
+        """
+
+        count = len(self)
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return
+        if self.rows is not None:
+            for positions in self.rows[start:stop]:
+                yield self.render(positions, annotated)
+            return
+        if self.space is not None:
+            positions = self.space.iter_positions(start)
+            for positions in itertools.islice(positions, stop - start):
+                yield self.render(positions, annotated)
+            return
+        join = self.annotate if annotated else self.join
+        if not self.values:
+            yield join(())
+            return
+
+        values = self.raw_values if annotated else self.values
+        last = len(values) - 1
+        positions = unrank(start, self.cardinalities)
+        combi = [values[i][k] for i, k in enumerate(positions)]
+        remaining = stop - start
+        while remaining > 0:
+            # running through the last placeholder, then carrying over
+            # like an odometer
+            for value in _value_range(values[last], positions[last],
+                                      min(positions[last] + remaining,
+                                          self.cardinalities[last])):
+                combi[last] = value
+                yield join(combi)
+                remaining -= 1
+            i = last
+            positions[i] = 0
+            combi[i] = values[i][0]
+            i -= 1
+            while i >= 0:
+                positions[i] += 1
+                if positions[i] < self.cardinalities[i]:
+                    combi[i] = values[i][positions[i]]
+                    break
+                positions[i] = 0
+                combi[i] = values[i][0]
+                i -= 1
+
+    def byte_size(self):
+        """
+        Summary
+        ----------
+        Computing the UTF-8 size of all combinations together, without
+        building any of them
+
+        Returns
+        -------
+        Integer
+            sum of the encoded lengths of every sentence of the template.
+            With constraints, the size of all combinations prorated to the
+            valid ones
+
+        """
+
+        if self.rows is not None:
+            return sum(len(self.render(positions).encode("utf-8"))
+                       for positions in self.rows)
+
+        count = 1
+        for cardinality in self.cardinalities:
+            count *= cardinality
+        size = count * sum(len(part.encode("utf-8")) for part in self.parts
+                           if part is not None)
+        for _, i in self.slots:
+            # each value of a placeholder appears in count / cardinality
+            # sentences
+            size += sum(len(value.encode("utf-8")) for value in self.values[i]) \
+                * (count // self.cardinalities[i])
+        if self.space is not None and count:
+            size = size * len(self.space) // count
+        return size
+
+    def join(self, combi):
+        """
+        Summary
+        ----------
+        Building the sentence for a tuple of formatted values
+
+        Parameters
+        ----------
+        combi:
+            one formatted value for each placeholder, in order
+
+        Returns
+        -------
+        String
+            sentence with every slot filled
+
+        """
+
+        parts = self.parts[:]
+        for part, i in self.slots:
+            parts[part] = combi[i]
+        return "".join(parts)
+
+    def annotate(self, combi):
+        """
+        Summary
+        ----------
+        Building an annotated example for a tuple of raw values
+
+        Parameters
+        ----------
+        combi:
+            one raw value for each placeholder, in order
+
+        Returns
+        -------
+        Dictionary
+            {"text": sentence with raw values, "entities": list of
+            {"start", "end", "value", "entity"} for each entity slot}, in the
+            Rasa NLU JSON training format
+
+        """
+
+        entities = list()
+        offset = 0
+        for j, (_, i) in enumerate(self.slots):
+            offset += self.literal_lengths[j]
+            end = offset + len(combi[i])
+            if self.entities[i] is not None:
+                value = combi[i]
+                if self.canonical_maps[i]:
+                    value = self.canonical_maps[i].get(value, value)
+                entities.append({"start": offset, "end": end,
+                                 "value": value,
+                                 "entity": self.entities[i]})
+            offset = end
+        return {"text": self.join(combi), "entities": entities}
+
+    def render(self, positions, annotated=False):
+        """
+        Summary
+        ----------
+        Building the sentence for a tuple of value positions
+
+        Parameters
+        ----------
+        positions:
+            index of the value to use for each placeholder, in order
+        annotated:
+            if True, builds an annotated example instead of a sentence
+
+        Returns
+        -------
+        String or Dictionary
+            sentence with every slot filled, or example as returned by
+            annotate
+
+        """
+
+        if annotated:
+            return self.annotate([values[k] for values, k
+                                  in zip(self.raw_values, positions)])
+        return self.join([values[k] for values, k
+                          in zip(self.values, positions)])
+
+    def weight(self, positions):
+        """
+        Summary
+        ----------
+        Computing the weight of a combination, the product of the weights of
+        its values (1 for values without weight)
+
+        Parameters
+        ----------
+        positions:
+            index of the value of each placeholder, in order
+
+        Returns
+        -------
+        Float
+            weight of the combination
+
+        """
+
+        weight = 1.0
+        for values, k in zip(self.raw_values, positions):
+            weights = getattr(values, "weights", None)
+            if weights is not None:
+                weight *= weights[k]
+        return weight
+
+    def total_weight(self):
+        """
+        Summary
+        ----------
+        Summing the weights of all combinations, without enumerating them.
+        With constraints, forbidden combinations are included: they are
+        rejected when drawn
+
+        Returns
+        -------
+        Float
+            sum of the weights of the combinations
+
+        """
+
+        if self.rows is not None:
+            return sum(self.weight(positions) for positions in self.rows)
+        total = 1.0
+        for table, cardinality in zip(self.alias_tables, self.cardinalities):
+            total *= cardinality if table is None else table.total
+        return total
+
+    def draw(self, rng=None):
+        """
+        Summary
+        ----------
+        Drawing a combination with probability proportional to its weight,
+        each weighted value being drawn in O(1) from its alias table
+
+        Parameters
+        ----------
+        rng:
+            random.Random instance to draw with. If None, uses the random
+            module
+
+        Returns
+        -------
+            index of the drawn combination, or None if it is forbidden by a
+            constraint (the draw is to be made again)
+
+        """
+
+        if rng is None:
+            rng = random
+        if self.rows is not None:
+            if self._rows_table is None:
+                self._rows_table = AliasTable([self.weight(positions)
+                                               for positions in self.rows])
+            return self._rows_table.draw(rng)
+        positions = [rng.randrange(cardinality) if table is None
+                     else table.draw(rng) for table, cardinality
+                     in zip(self.alias_tables, self.cardinalities)]
+        if self.space is not None:
+            return self.space.rank(positions)
+        return rank(positions, self.cardinalities)
+
+    def choice(self, rng=None):
+        """
+        Summary
+        ----------
+        Building the sentence for one random value of each placeholder,
+        drawn according to the weights of the values if any
+
+        Parameters
+        ----------
+        rng:
+            random.Random instance to draw with. If None, uses the random
+            module
+
+        Returns
+        -------
+        String
+            sentence with every slot filled
+
+        """
+
+        if rng is None:
+            rng = random
+        if self.weighted:
+            index = self.draw(rng)
+            while index is None:
+                index = self.draw(rng)
+            return self.combination(index)
+        if self.space is not None or self.rows is not None:
+            return self.combination(rng.randrange(len(self)))
+        return self.join([rng.choice(values) for values in self.values])
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_weights.py
+    Description: entity and alias values weighted in the config file, e.g.
+                 @[time_filter]
+                     this month  ^5
+                     since beginning of fiscal year
+                 and drawn in O(1) with Walker/Vose alias tables
+    Python Version: 3.6
+"""
+
+import re
+import math
+import array
+import heapq
+import random
+
+# weight written after a value, separated by at least one space
+WEIGHT_PATTERN = re.compile(r"(.*?)\s+\^(\d+(?:\.\d*)?|\.\d+)$")
+# rejected draws allowed per combination to draw before sampling switches to
+# weighted keys over the remaining combinations
+MAX_REJECTIONS = 4
+# largest number of combinations enumerated to compute weighted keys
+KEYS_ENUMERATION_LIMIT = 10 ** 7
+
+
+def split_weight(line):
+    """
+    Summary
+    ----------
+    Separating a value line from its optional weight
+
+    Parameters
+    ----------
+    line:
+        value line of an entity or alias paragraph, e.g. "this month  ^5"
+
+    Returns
+    -------
+    Tuple
+        (value, weight), weight being None when the line has none
+
+    """
+
+    match = WEIGHT_PATTERN.match(line)
+    if match is None:
+        return line, None
+    return match.group(1), float(match.group(2))
+
+
+class AliasTable(object):
+    """
+    Summary
+    ----------
+    Walker/Vose alias table: built in O(n) once, then each weighted draw of
+    an index costs two random numbers, whatever the number of weights
+
+    Parameters
+    ----------
+    weights:
+        non-negative weights, with a positive sum
+
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if not n or total <= 0:
+            raise ValueError("weights must have a positive sum")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("weights must be non-negative")
+
+        self.total = total
+        self.prob = array.array("d", [1.0] * n)
+        self.alias = array.array("L", range(n))
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            # the large weight gives what the small one lacks
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # leftovers are 1 up to rounding errors
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def draw(self, rng=None):
+        """
+        Summary
+        ----------
+        Drawing an index with probability proportional to its weight
+
+        Parameters
+        ----------
+        rng:
+            random.Random instance to draw with. If None, uses the random
+            module
+
+        Returns
+        -------
+        Integer
+            index in range(len(self))
+
+        """
+
+        if rng is None:
+            rng = random
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class WeightedValues(list):
+    """
+    Summary
+    ----------
+    List of values of an entity or alias, with the weight of each value. It
+    compares equal to the plain list of its values
+
+    Parameters
+    ----------
+    values:
+        list of values
+    weights:
+        weight of each value, 1 when not written in the config file
+
+    """
+
+    def __init__(self, values, weights):
+        super(WeightedValues, self).__init__(values)
+        self.weights = list(weights)
+        if len(self.weights) != len(self):
+            raise ValueError("one weight is expected for each value")
+        self._table = None
+
+    def __reduce__(self):
+        return WeightedValues, (list(self), self.weights)
+
+    @property
+    def alias_table(self):
+        # built on first use, then shared by every template using the values
+        if self._table is None:
+            self._table = AliasTable(self.weights)
+        return self._table
+
+
+def sample_weighted_indices(templates, n_sub, rng=None):
+    """
+    Summary
+    ----------
+    Drawing distinct combinations of several templates, each draw picking a
+    combination with probability proportional to its weight among the ones
+    not drawn yet. Draws cost O(1) per placeholder: a template is drawn from
+    the alias table of the template total weights, then its values from their
+    own alias tables. Draws of combinations already selected are rejected:
+    when n_sub gets close to the number of combinations, or a few heavy
+    combinations take most of the weight, most draws are rejected. After
+    MAX_REJECTIONS * n_sub rejections, the remaining combinations are
+    enumerated (if there are at most KEYS_ENUMERATION_LIMIT of them) and the
+    missing ones are drawn at once with Efraimidis-Spirakis keys, in
+    O(nb_combinations * log(n_sub)). Above that limit, rejections go on
+
+    Parameters
+    ----------
+    templates:
+        list of SentenceTemplate, their combinations being numbered one
+        template after the other
+    n_sub:
+        number of combinations to draw, lower than the overall number of
+        combinations
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+
+    Returns
+    -------
+        sorted list of n_sub distinct global combination indices
+
+    """
+
+    if rng is None:
+        rng = random
+    starts = list()
+    start = 0
+    for template in templates:
+        starts.append(start)
+        start += len(template)
+    table = AliasTable([template.total_weight() if len(template) else 0.0
+                        for template in templates])
+
+    selected = set()
+    rejections = 0
+    while len(selected) < n_sub:
+        if rejections > MAX_REJECTIONS * n_sub \
+                and start <= KEYS_ENUMERATION_LIMIT:
+            selected.update(_sample_keys(templates, starts, selected,
+                                         n_sub - len(selected), rng))
+            break
+        i = table.draw(rng)
+        index = templates[i].draw(rng)
+        if index is None or starts[i] + index in selected:
+            rejections += 1
+        else:
+            selected.add(starts[i] + index)
+    return sorted(selected)
+
+
+def _sample_keys(templates, starts, selected, k, rng):
+    # Efraimidis-Spirakis: keeping the k largest keys u^(1/weight), compared
+    # through their logarithms, draws k combinations without replacement
+    # exactly as k successive weighted draws would
+    keys = ((math.log(1.0 - rng.random()) / template.weight(
+        template.positions(index)), start + index)
+        for template, start in zip(templates, starts)
+        for index in range(len(template))
+        if start + index not in selected)
+    return [index for _, index in heapq.nlargest(k, keys)]
+
+
+def get_alias_table(values):
+    """
+    Summary
+    ----------
+    Getting the alias table of weighted values
+
+    Parameters
+    ----------
+    values:
+        values of an entity or alias
+
+    Returns
+    -------
+        AliasTable, or None if the values are not weighted
+
+    """
+
+    if getattr(values, "weights", None) is None:
+        return None
+    return values.alias_table
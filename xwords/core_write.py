@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name: core_write.py
+    Description: buffered writers streaming generated sentences into plain or
+                 compressed output files, in several formats
+    Python Version: 3.6
+"""
+
+import os
+import bz2
+import gzip
+import json
+import lzma
+
+# opening function and file name suffix for each compression
+COMPRESSIONS = {None: (open, ""),
+                "gzip": (gzip.open, ".gz"),
+                "bz2": (bz2.open, ".bz2"),
+                "lzma": (lzma.open, ".xz")}
+
+# file extension for each output format
+FORMAT_EXTENSIONS = {"md": ".md",
+                     "jsonl": ".jsonl",
+                     "rasa_json": ".json"}
+
+# formats expecting annotated examples rather than markdown sentences
+ANNOTATED_FORMATS = {"rasa_json"}
+
+# number of lines gathered before each call to writelines
+BUFFER_LINES = 8192
+
+
+def format_line(sentence, for_story=False):
+    """
+    Summary
+    ----------
+    Formats a single sentence or story into a line of the output file
+
+    Parameters
+    ----------
+    sentence:
+        generated sentence or story
+    for_story:
+        if True, formats using Rasa Core's training format
+        if False, formats using Rasa NLU's training format
+
+    Returns
+    -------
+    String
+        line to be written, including its trailing new line
+
+    """
+
+    # using Rasa Core (conversations) or Rasa NLU (only sentences)
+    # training format
+    if for_story:
+        return sentence + "\n"
+    return "- " + sentence + "\n"
+
+
+def format_json_line(sentence, intent_string=None, for_story=False):
+    """
+    Summary
+    ----------
+    Formats a single sentence or story into a JSON Lines document
+
+    Parameters
+    ----------
+    sentence:
+        generated sentence or story, or annotated example
+    intent_string:
+        string specifying the intent of sentences, added to each document
+        when given
+    for_story:
+        if True, the document holds a "story", otherwise a "text"
+
+    Returns
+    -------
+    String
+        JSON document on a single line, including its trailing new line
+
+    """
+
+    return json.dumps(json_document(sentence, intent_string, for_story),
+                      ensure_ascii=False) + "\n"
+
+
+def json_document(sentence, intent_string=None, for_story=False):
+    """
+    Summary
+    ----------
+    Builds the JSON document of a single sentence, story or example
+
+    Parameters
+    ----------
+    sentence:
+        generated sentence or story, or annotated example
+    intent_string:
+        string specifying the intent of sentences, added to each document
+        when given
+    for_story:
+        if True, the document holds a "story", otherwise a "text"
+
+    Returns
+    -------
+    Dictionary
+        document ready to be serialized
+
+    """
+
+    if for_story:
+        return {"story": sentence}
+    if isinstance(sentence, dict):
+        document = dict(sentence)
+    else:
+        document = {"text": sentence}
+    if intent_string is not None:
+        document["intent"] = intent_string
+    return document
+
+
+class SentenceWriter(object):
+    """
+    Summary
+    ----------
+    Writes sentences into an output file, gathering lines into large buffers
+    written with a single writelines call
+
+    Parameters
+    ----------
+    full_path:
+        path (string) of the file to be written, without compression suffix
+    intent_string:
+        string specifying the intent of sentences in the case of
+        Rasa NLU training file
+    for_story:
+        if True, writes output using Rasa Core's training format
+        if False, writes output using Rasa NLU's training format
+    output_format:
+        "md" for Rasa markdown, "jsonl" for one JSON document per line or
+        "rasa_json" for Rasa NLU JSON training data, written from annotated
+        examples one at a time
+    compression:
+        None, "gzip", "bz2" or "lzma", the matching suffix being appended to
+        full_path
+    buffer_lines:
+        number of lines gathered before being written
+    header:
+        if False, the "## intent" line of markdown files is not written, e.g.
+        for a shard appended to the file of the previous shard
+
+    """
+
+    def __init__(self, full_path, intent_string=None, for_story=False,
+                 output_format="md", compression=None,
+                 buffer_lines=BUFFER_LINES, header=True):
+        if output_format not in FORMAT_EXTENSIONS:
+            raise ValueError("unknown output format: " + str(output_format))
+        if compression not in COMPRESSIONS:
+            raise ValueError("unknown compression: " + str(compression))
+        opener, suffix = COMPRESSIONS[compression]
+
+        self.name = full_path + suffix
+        self.intent_string = intent_string
+        self.for_story = for_story
+        self.output_format = output_format
+        self.buffer_lines = buffer_lines
+        self.count = 0
+        self._buffer = list()
+
+        os.makedirs(os.path.dirname(self.name) or ".", exist_ok=True)
+        self._file = opener(self.name, mode='wt', encoding="utf-8")
+        if output_format == "md" and not for_story \
+                and intent_string is not None and header:
+            self._buffer.append("## intent:" + intent_string + "\n")
+        if output_format == "rasa_json":
+            self._buffer.append('{"rasa_nlu_data": {"common_examples": [')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, sentence):
+        """
+        Summary
+        ----------
+        Adds a sentence to the buffer, writing the buffer once full
+
+        Parameters
+        ----------
+        sentence:
+            generated sentence or story
+
+        Returns
+        -------
+            None
+
+        """
+
+        if self.output_format == "jsonl":
+            self._buffer.append(format_json_line(sentence, self.intent_string,
+                                                 self.for_story))
+        elif self.output_format == "rasa_json":
+            # examples are streamed as items of the common_examples array
+            self._buffer.append(("\n    " if self.count == 0 else ",\n    ")
+                                + json.dumps(json_document(
+                                    sentence, self.intent_string),
+                                    ensure_ascii=False))
+        else:
+            self._buffer.append(format_line(sentence, self.for_story))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        """
+        Summary
+        ----------
+        Writes buffered lines into the file
+
+        Returns
+        -------
+            None
+
+        """
+
+        self._file.writelines(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        """
+        Summary
+        ----------
+        Writes remaining lines and closes the file
+
+        Returns
+        -------
+            None
+
+        """
+
+        if not self._file.closed:
+            if self.output_format == "rasa_json":
+                self._buffer.append("\n]}}\n")
+            self.flush()
+            self._file.close()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_batch.py
+    Description : checking stories generated by batches
+    Python Version : 3.6
+"""
+
+import re
+import pytest
+from xwords import core_batch
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_weights import WeightedValues
+from xwords.core_batch import iter_batch_stories
+
+intents, entities, aliases = populate_entry_dicts(
+    parse_input("./xwords/tests/input_test.txt"))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(core_batch, "np", None)
+    return request.param
+
+
+def check_story(story):
+    lines = story.splitlines()
+    assert re.match(r"## Generated Story \d+$", lines[0])
+    assert lines[-1] == "    - action_acquisition"
+    # every entity is filled exactly once with a value of the config
+    slots = re.findall(r"slot\{\"(\w+)\": \"([^\"]*)\"\}", story)
+    assert sorted(name for name, _ in slots) == \
+        sorted(key[2:-1] for key in entities)
+    for name, value in slots:
+        assert value in entities["@[" + name + "]"]
+        assert story.count("\"" + name + "\": \"" + value + "\"") in (2, 3)
+
+
+def test_batch_stories(backend):
+    stories = list(iter_batch_stories("acquisition", entities, 250, seed=3,
+                                      batch_size=100))
+    assert len(stories) == 250
+    for story in stories:
+        check_story(story)
+    # all numbers of entities given in the first user input are drawn
+    assert {story.count("utter_ask_") for story in stories} == {0, 1, 2, 3}
+
+
+def test_batch_stories_reproducible(backend):
+    assert list(iter_batch_stories("acquisition", entities, 50, seed=3)) == \
+        list(iter_batch_stories("acquisition", entities, 50, seed=3))
+    assert list(iter_batch_stories("acquisition", {}, 50, seed=3)) == []
+
+
+def test_batch_stories_intent():
+    with pytest.raises(ValueError):
+        list(iter_batch_stories(None, entities, 10, seed=3))
+
+
+def test_batch_stories_weighted(backend):
+    weighted = dict(entities)
+    weighted["@[geo_filter]"] = WeightedValues(
+        entities["@[geo_filter]"],
+        [97.0] + [1.0] * (len(entities["@[geo_filter]"]) - 1))
+    favourite = "\"geo_filter\": \"" + weighted["@[geo_filter]"][0] + "\""
+    stories = list(iter_batch_stories("acquisition", weighted, 1000, seed=0))
+    assert sum(favourite in story for story in stories) > 900
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_cache.py
+    Description : checking incremental generation from cached intents
+    Python Version : 3.6
+"""
+
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_process import iter_sentences
+from xwords.core_cache import iter_cached_sentences
+
+lines_cleaned = parse_input("./xwords/tests/input_test.txt")
+intents, entities, aliases = populate_entry_dicts(lines_cleaned)
+
+
+def test_cache_same_output(tmpdir):
+    expected = list(iter_sentences(intents, entities, aliases))
+    cache_dir = str(tmpdir)
+    assert list(iter_cached_sentences(intents, entities, aliases,
+                                      cache_dir)) == expected
+    assert len(tmpdir.listdir()) == 2
+    # second run only reads the cache
+    assert list(iter_cached_sentences(intents, entities, aliases,
+                                      cache_dir)) == expected
+
+
+def test_cache_invalidation(tmpdir):
+    cache_dir = str(tmpdir)
+    list(iter_cached_sentences(intents, entities, aliases, cache_dir))
+    changed = dict(aliases)
+    changed["~[owners]"] = ["owners", "keepers"]
+    sentences = list(iter_cached_sentences(intents, entities, changed,
+                                           cache_dir))
+    assert sentences == list(iter_sentences(intents, entities, changed))
+    # both intents reference ~[owners], so both were regenerated
+    assert len(tmpdir.listdir()) == 4
+
+
+def test_cache_unchanged_intent(tmpdir, capsys):
+    cache_dir = str(tmpdir)
+    list(iter_cached_sentences(intents, entities, aliases, cache_dir))
+    changed = dict(entities)
+    changed["@[geo_filter]"] = ["France"]
+    list(iter_cached_sentences(intents, changed, aliases, cache_dir))
+    assert "1 intents read from cache, 1 regenerated" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_compile.py
+    Description : checking compiled config files
+    Python Version : 3.6
+"""
+
+import shutil
+import pytest
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_compile import (compile_config, load_compiled, load_config,
+                                 MappedStrings)
+from xwords.core_process import iter_sentences
+from xwords.core_template import SentenceTemplate
+from xwords.core_output import generate
+from xwords.cli import main
+
+input_path = "./xwords/tests/input_test.txt"
+parsed = populate_entry_dicts(parse_input(input_path))
+
+
+@pytest.fixture
+def config_path(tmpdir):
+    path = str(tmpdir.join("input.txt"))
+    shutil.copy(input_path, path)
+    return path
+
+
+def test_load_compiled(config_path):
+    intents, entities, aliases = load_compiled(compile_config(config_path))
+    assert (intents, entities, aliases) == parsed
+    assert isinstance(entities["@[geo_filter]"], MappedStrings)
+    assert entities["@[geo_filter]"][3] == "United States"
+    assert entities["@[geo_filter]"][-1] == "Italy"
+
+
+def test_compiled_sentences(config_path):
+    intents, entities, aliases = load_compiled(compile_config(config_path))
+    # compiled value lists are formatted ahead of time, as parsed ones
+    for intent in intents:
+        template = SentenceTemplate(intent, {**entities, **aliases})
+        assert all(isinstance(values, list) for values in template.values)
+    assert list(iter_sentences(intents, entities, aliases)) == \
+        list(iter_sentences(*parsed))
+    assert list(iter_sentences(intents, entities, aliases,
+                               annotated=True)) == \
+        list(iter_sentences(*parsed, annotated=True))
+
+
+def test_generate_compiled(config_path, tmpdir_factory):
+    outputs = list()
+    for compiled in (False, True):
+        if compiled:
+            compile_config(config_path)
+        for options in ({"intent_string": "acquisition"},
+                        {"n_sub": 50, "seed": 3, "training_ratio": .7},
+                        {"output_format": "rasa_json"}):
+            fn = str(tmpdir_factory.mktemp('output'))
+            generate(config_path, output_path=fn, **options)
+            with open(fn + 'training' + (".json" if "output_format" in options
+                                         else ".md")) as training_file:
+                outputs.append(training_file.read())
+    assert outputs[:3] == outputs[3:]
+
+
+def test_load_config_up_to_date(config_path):
+    compile_config(config_path)
+    entities = load_config(config_path)[1]
+    assert isinstance(entities["@[time_filter]"], MappedStrings)
+
+
+def test_load_config_stale(config_path):
+    compile_config(config_path)
+    with open(config_path, mode='a') as config_file:
+        config_file.write("\n\n~[more]\n    one\n")
+    aliases = load_config(config_path)[2]
+    assert aliases["~[more]"] == ["one"]
+    assert isinstance(aliases["~[owners]"], list)
+
+
+def test_load_compiled_empty(tmpdir):
+    intents, entities, aliases = load_compiled(compile_config(
+        "./xwords/tests/input_empty.txt", str(tmpdir.join("empty.xwc"))))
+    assert (intents, entities, aliases) == ([], {}, {})
+
+
+def test_cli_compile(config_path):
+    main(["compile", config_path])
+    assert load_config(config_path)[0] == parsed[0]
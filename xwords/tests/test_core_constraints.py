@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_constraints.py
+    Description : checking that forbidden combinations are never generated
+    Python Version : 3.6
+"""
+
+import random
+import itertools
+import pytest
+from xwords.core_parse import parse_config, ConfigError
+from xwords.core_output import generate
+from xwords.core_compile import compile_config, load_compiled
+from xwords.core_process import count_sentences, iter_sentences
+from xwords.core_template import SentenceTemplate
+from xwords.core_constraints import parse_constraints
+
+CONFIG = ("price in ~[country] paid in @[currency] ~[please]\n\n"
+          "~[country]\n    US\n    France\n    Japan\n\n"
+          "@[currency]\n    USD\n    EUR\n    JPY\n\n"
+          "~[please]\n    please\n    now\n\n"
+          "![never]\n"
+          "    ~[country] = US, @[currency] = EUR\n"
+          "    ~[country] = US, @[currency] = JPY\n"
+          "    ~[country] = Japan, @[currency] = EUR, ~[please] = now\n")
+
+
+@pytest.fixture
+def config_path(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write(CONFIG)
+    return str(config)
+
+
+def brute_force(values, constraints):
+    # every combination of values, minus the forbidden ones
+    keys = list(values)
+    valid = list()
+    for combi in itertools.product(*values.values()):
+        assigned = dict(zip(keys, combi))
+        if not any(all(assigned[key] == value for key, value in pairs)
+                   for pairs in constraints):
+            valid.append(combi)
+    return valid
+
+
+def test_parse_config_constraints(config_path):
+    constraints_dic = dict()
+    parse_config(config_path, constraints_dic=constraints_dic)
+    assert parse_constraints(constraints_dic)[2] == \
+        [("~[country]", "Japan"), ("@[currency]", "EUR"), ("~[please]", "now")]
+
+
+def test_parse_config_constraints_refused(config_path):
+    with pytest.raises(ConfigError, match="line 17"):
+        parse_config(config_path)
+
+
+def test_parse_config_constraints_malformed(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("hi @[city]\n\n@[city]\n    paris\n\n"
+                 "![never]\n    @[city] paris\n")
+    with pytest.raises(ConfigError, match="line 6"):
+        parse_config(str(config), constraints_dic=dict())
+
+
+def test_constrained_sentences(config_path):
+    constraints_dic = dict()
+    intents, entities, aliases = parse_config(config_path,
+                                              constraints_dic=constraints_dic)
+    constraints = parse_constraints(constraints_dic)
+    assert count_sentences(intents, entities, aliases) == [18]
+    assert count_sentences(intents, entities, aliases,
+                           constraints=constraints) == [13]
+
+    sentences = list(iter_sentences(intents, entities, aliases,
+                                    constraints=constraints))
+    assert len(sentences) == 13
+    assert "price in US paid in [USD](currency) now" in sentences
+    assert not any("US paid in [EUR]" in sentence for sentence in sentences)
+    assert "price in Japan paid in [EUR](currency) please" in sentences
+    assert "price in Japan paid in [EUR](currency) now" not in sentences
+
+    sample = list(iter_sentences(intents, entities, aliases, n_sub=5,
+                                 rng=random.Random(0),
+                                 constraints=constraints))
+    assert len(sample) == 5
+    assert set(sample) <= set(sentences)
+
+
+def test_constrained_template_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(100):
+        values = {"@[e%d]" % k: [str(rng.randint(0, 3))
+                                 for _ in range(rng.randint(1, 5))]
+                  for k in range(rng.randint(1, 4))}
+        constraints = [[(key, rng.choice(values[key])) for key
+                        in rng.sample(list(values), rng.randint(1, len(values)))]
+                       for _ in range(rng.randint(1, 4))]
+        template = SentenceTemplate(" ".join(values), values,
+                                    constraints=constraints)
+        expected = [" ".join("[" + value + "](" + key[2:-1] + ")"
+                             for key, value in zip(values, combi))
+                    for combi in brute_force(values, constraints)]
+        assert len(template) == len(expected)
+        assert list(template) == expected
+        assert [template[k] for k in range(len(template))] == expected
+        start = rng.randint(0, len(expected))
+        assert list(template.iter_range(start, start + 3)) == \
+            expected[start:start + 3]
+
+
+def test_compiled_constraints(config_path):
+    compiled_path = compile_config(config_path)
+    constraints_dic = dict()
+    load_compiled(compiled_path, constraints_dic)
+    expected = dict()
+    parse_config(config_path, constraints_dic=expected)
+    assert constraints_dic == expected
+
+
+def test_generate_constraints(config_path, tmpdir):
+    report = generate(config_path, str(tmpdir) + "/", dry_run=True)
+    assert report["total"] == 13
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_corpus.py
+    Description : checking corpora of integer-encoded sentences
+    Python Version : 3.6
+"""
+
+import random
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_process import iter_sentences
+from xwords.core_corpus import Corpus, generate_corpus
+
+intents, entities, aliases = populate_entry_dicts(
+    parse_input("./xwords/tests/input_test.txt"))
+sentences = list(iter_sentences(intents, entities, aliases))
+
+
+def test_corpus():
+    corpus = generate_corpus(intents, entities, aliases)
+    assert len(corpus) == len(sentences) == 684
+    assert list(corpus) == sentences
+    assert corpus[100] == sentences[100]
+    assert corpus[-1] == sentences[-1]
+    # one byte template id and 8 bytes combination index per sentence
+    assert corpus.nbytes() == 9 * 684
+
+
+def test_corpus_slice():
+    corpus = generate_corpus(intents, entities, aliases)
+    part = corpus[10:400:3]
+    assert isinstance(part, Corpus)
+    assert part == sentences[10:400:3]
+
+
+def test_corpus_sample():
+    corpus = generate_corpus(intents, entities, aliases, n_sub=25,
+                             rng=random.Random(3))
+    assert list(corpus) == list(iter_sentences(
+        intents, entities, aliases, n_sub=25, rng=random.Random(3)))
+
+
+def test_corpus_split():
+    corpus = generate_corpus(intents, entities, aliases)
+    training, testing = corpus.split(.7, rng=random.Random(0))
+    assert len(training) == int(684 * .7)
+    assert training.nbytes() == 9 * len(training)
+    assert testing.nbytes() == 9 * len(testing)
+    assert sorted(list(training) + list(testing)) == sorted(sentences)
+    training, testing = corpus.split(.5, split="hash")
+    assert not set(training) & set(testing)
+
+
+def test_corpus_write(tmpdir):
+    corpus = generate_corpus(intents, entities, aliases, annotated=True)
+    assert corpus[0]["entities"]
+    corpus.write(str(tmpdir) + "/", "intent", output_format="md")
+    with open(str(tmpdir) + "/training.md") as training_file:
+        assert training_file.read().splitlines()[1:] == \
+            ["- " + sentence for sentence in sentences]
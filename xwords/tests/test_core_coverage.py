@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_coverage.py
+    Description : checking pairwise and t-wise covering arrays
+    Python Version : 3.6
+"""
+
+import itertools
+import pytest
+from xwords import core_template
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_process import generate_sentences, count_sentences
+from xwords.core_template import SentenceTemplate
+from xwords.core_output import generate
+from xwords.core_coverage import coverage_strength, covering_array
+
+intents, entities, aliases = populate_entry_dicts(
+    parse_input("./xwords/tests/input_test.txt"))
+
+
+def covered(rows, columns):
+    return {tuple(row[c] for c in columns) for row in rows}
+
+
+def test_coverage_strength():
+    assert coverage_strength(None) is None
+    assert coverage_strength("full") is None
+    assert coverage_strength("pairwise") == 2
+    assert coverage_strength("3-wise") == 3
+    with pytest.raises(ValueError):
+        coverage_strength("triplewise")
+
+
+@pytest.mark.parametrize("cardinalities,strength", [
+    ([3, 3, 3, 3], 2), ([2, 5, 1, 4, 3], 2), ([10] * 6, 2),
+    ([3, 2, 4, 2, 3], 3), ([4, 4], 3)])
+def test_covering_array(cardinalities, strength):
+    rows = covering_array(cardinalities, strength)
+    for columns in itertools.combinations(range(len(cardinalities)),
+                                          min(strength,
+                                              len(cardinalities))):
+        assert covered(rows, columns) == set(itertools.product(
+            *(range(cardinalities[c]) for c in columns)))
+
+
+@pytest.mark.parametrize("cardinalities,strength", [
+    ([1, 3, 2, 4, 5], 3), ([3, 2, 4, 2, 3], 3), ([10] * 6, 2)])
+def test_covering_array_unique_rows(cardinalities, strength):
+    rows = covering_array(cardinalities, strength)
+    assert len({tuple(row) for row in rows}) == len(rows)
+
+
+def test_covering_array_smaller_than_product():
+    assert len(covering_array([10] * 6, 2)) < 200 < 10 ** 6
+    # unassigned cells of earlier rows are filled by later placeholders
+    assert len(covering_array([2] * 20, 2)) <= 12
+    assert len(covering_array([3] * 4, 2)) <= 10
+    # a pair of each value of the largest placeholder with each value of
+    # the others is the minimum
+    assert len(covering_array([20, 20, 200], 2)) == 4000
+
+
+def test_covering_array_constraints():
+    values = {"@[a]": ["0", "1", "2"], "@[b]": ["0", "1", "2"],
+              "@[c]": ["0", "1"], "@[d]": ["0", "1", "2"]}
+    constraints = [[("@[a]", "0"), ("@[b]", "1")], [("@[c]", "1")],
+                   [("@[b]", "2"), ("@[d]", "0")]]
+    template = SentenceTemplate(" ".join(values), values,
+                                constraints=constraints, coverage="pairwise")
+    valid = [template.space.unrank(k) for k in range(len(template.space))]
+    assert all(row in valid for row in template.rows)
+    for columns in itertools.combinations(range(4), 2):
+        assert covered(template.rows, columns) == covered(valid, columns)
+
+
+def test_generate_sentences_pairwise():
+    full = generate_sentences(intents, entities, aliases)
+    pairwise = generate_sentences(intents, entities, aliases,
+                                  coverage="pairwise")
+    assert sum(count_sentences(intents, entities, aliases,
+                               coverage="pairwise")) == len(pairwise)
+    assert len(pairwise) < len(full)
+    assert set(pairwise) <= set(full)
+    assert len(generate_sentences(intents, entities, aliases, n_sub=10,
+                                  coverage="pairwise")) == 10
+
+
+@pytest.mark.parametrize("options", [{}, {"n_sub": 10, "seed": 0},
+                                     {"workers": 2}])
+def test_generate_pairwise_arrays_built_once(tmpdir, monkeypatch, options):
+    built = list()
+
+    def counted_covering_array(*args):
+        built.append(args[0])
+        return covering_array(*args)
+
+    monkeypatch.setattr(core_template, "covering_array",
+                        counted_covering_array)
+    generate("./xwords/tests/input_test.txt", output_path=str(tmpdir) + "/",
+             coverage="pairwise", **options)
+    assert len(built) == len(intents)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_dedup.py
+    Description : checking the deduplication of generated sentences
+    Python Version : 3.6
+"""
+
+import random
+import pytest
+from xwords.core_output import write_sentences, generate
+from xwords.core_dedup import (HashSet64, BloomFilter, Deduplicator,
+                               record_hash)
+
+
+def test_hash_set():
+    hashes = HashSet64(capacity=4)
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(1000)] + [0]
+    assert all(hashes.add(value) for value in values)
+    assert not any(hashes.add(value) for value in values)
+    assert len(hashes) == 1001
+    assert len(hashes.slots) >= 2 * len(hashes)
+    # 16 to 32 bytes per hash past capacity, whatever the number of hashes
+    hashes = HashSet64(capacity=4)
+    for count, value in enumerate(values, 1):
+        hashes.add(value)
+        if count > 4:
+            assert 16 * count <= hashes.slots.itemsize * len(hashes.slots) \
+                <= 32 * count
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=1e-4)
+    values = [record_hash(str(k), 16) for k in range(1000)]
+    new = sum(bloom.add(value) for value in values)
+    assert new >= 999
+    # no false negative
+    assert not any(bloom.add(value) for value in values)
+
+
+@pytest.mark.parametrize("mode", ["exact", "bloom"])
+def test_deduplicator(mode):
+    records = ["a", "b", "a", {"text": "c", "entities": []}, "b",
+               {"entities": [], "text": "c"}, "d"]
+    deduplicator = Deduplicator(mode, capacity=100)
+    assert list(deduplicator.filter(records)) == \
+        ["a", "b", {"text": "c", "entities": []}, "d"]
+    assert deduplicator.dropped == 3
+    with pytest.raises(ValueError):
+        Deduplicator("fuzzy")
+
+
+def test_deduplicator_stories():
+    # stories only differ by the random id of their title
+    bodies = ["\n* buy{}\n    - action_buy\n",
+              "\n* sell{}\n    - action_sell\n"]
+    stories = ["## Generated Story " + str(k) + bodies[k % 2]
+               for k in range(10)]
+    deduplicator = Deduplicator("exact", capacity=100, for_story=True)
+    assert list(deduplicator.filter(stories)) == stories[:2]
+    assert deduplicator.dropped == 8
+    assert len(list(Deduplicator("exact").filter(stories))) == 10
+
+
+def test_generate_stories_dedup(tmpdir, capsys):
+    config = tmpdir.join("config.txt")
+    config.write("buy @[item]\n\n@[item]\n    tea\n    coffee\n")
+    generate(str(config), output_path=str(tmpdir) + "/", for_story=True,
+             n_sub=200, seed=1, training_ratio=.5, dedup="exact")
+    stories = list()
+    for name in ("training.md", "testing.md"):
+        with open(str(tmpdir) + "/" + name) as story_file:
+            stories += [story.partition("\n")[2] for story in
+                        story_file.read().split("\n\n") if story.strip()]
+    # 2 first user inputs (with or without the item) times 2 items
+    assert len(stories) == len(set(stories)) == 4
+    assert "196 duplicates dropped" in capsys.readouterr().out
+
+
+def test_write_sentences_dedup(tmpdir, capsys):
+    sentences = ["sentence %d" % (k % 50) for k in range(200)]
+    write_sentences(iter(sentences), str(tmpdir) + "/", "intent",
+                    training_ratio=.5, nb_sentences=200,
+                    rng=random.Random(0), split="bernoulli", dedup="exact")
+    assert "150 duplicates dropped" in capsys.readouterr().out
+    with open(str(tmpdir) + "/training.md") as training_file:
+        training = set(training_file.read().splitlines()[1:])
+    with open(str(tmpdir) + "/testing.md") as testing_file:
+        testing = set(testing_file.read().splitlines()[1:])
+    assert not training & testing
+    assert len(training | testing) == 50
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_expand.py
+    Description : checking placeholders nested into entity and alias values
+    Python Version : 3.6
+"""
+
+import pytest
+from xwords.core_parse import populate_entry_dicts, ConfigError
+from xwords.core_process import iter_sentences
+from xwords.core_compile import compile_config, load_compiled
+from xwords.core_weights import WeightedValues
+from xwords.core_expand import ExpandedValues, expand_values
+
+paragraphs = [["~[please]", "please", "kindly"],
+              ["~[give]", "~[please] give me", "I want"],
+              ["@[item]", "a ~[size] coffee", "tea"],
+              ["~[size]", "small", "large"],
+              ["Could you ~[give] @[item]"]]
+
+
+def test_expand_entry_dicts():
+    intents, entities, aliases = populate_entry_dicts(paragraphs)
+    assert aliases["~[give]"] == ["please give me", "kindly give me",
+                                  "I want"]
+    assert entities["@[item]"] == ["a small coffee", "a large coffee", "tea"]
+    assert len(list(iter_sentences(intents, entities, aliases))) == 9
+    assert "Could you kindly give me [a large coffee](item)" in \
+        iter_sentences(intents, entities, aliases)
+
+
+def test_expand_lazy():
+    replacement_dic = {"~[digit]": [str(k) for k in range(10)],
+                       "~[unit]": [str(k) for k in range(10)],
+                       "~[pair]": ["~[digit]~[unit]"],
+                       "~[code]": ["#~[pair]-~[area]", "none"],
+                       "~[area]": ["~[digit]~[unit]"]}
+    expanded = expand_values(replacement_dic, cache_size=100)
+    assert expanded["~[digit]"] is replacement_dic["~[digit]"]
+    assert expanded["~[pair]"] == ["%02d" % k for k in range(100)]
+    code = expanded["~[code]"]
+    assert isinstance(code, ExpandedValues)
+    # the expansion of ~[pair] is built once and shared
+    assert code.slots[0][0] is expanded["~[pair]"]
+    assert len(code) == 10001
+    assert code[0] == "#00-00"
+    assert code[1234] == "#12-34"
+    assert code[-1] == "none"
+    assert code[9998:] == ["#99-98", "#99-99", "none"]
+    assert code.digest() == expand_values(replacement_dic,
+                                          cache_size=100)["~[code]"].digest()
+
+
+def test_expand_repeated():
+    # a placeholder written twice in a value takes the same value twice
+    digits = [str(k) for k in range(10)]
+    replacement_dic = {"~[digit]": digits,
+                       "~[twice]": ["~[digit]~[digit]", "~[digit]-~[digit]"],
+                       "~[code]": ["~[twice]/~[digit]/~[twice]"]}
+    expanded = expand_values(replacement_dic, cache_size=1)
+    twice = expanded["~[twice]"]
+    assert isinstance(twice, ExpandedValues)
+    assert twice == [k + k for k in digits] + [k + "-" + k for k in digits]
+    code = expanded["~[code]"]
+    assert len(code) == 200
+    assert code[13] == "11/3/11"
+    assert code[-1] == "9-9/9/9-9"
+    intents, entities, aliases = populate_entry_dicts(
+        [["~[again]", "~[word] and ~[word]"], ["~[word]", "yes", "no"],
+         ["Say ~[again]"]])
+    assert aliases["~[again]"] == ["yes and yes", "no and no"]
+    assert list(iter_sentences(intents, entities, aliases)) == \
+        ["Say yes and yes", "Say no and no"]
+
+
+def test_expand_cycle():
+    with pytest.raises(ConfigError) as error:
+        populate_entry_dicts([["~[a]", "x ~[b]"], ["~[b]", "~[c]", "y"],
+                              ["~[c]", "~[a]"], ["Say ~[a]"]])
+    assert "~[a] -> ~[b] -> ~[c] -> ~[a]" in str(error.value)
+
+
+def test_expand_weighted():
+    with pytest.raises(ValueError):
+        expand_values({"~[a]": WeightedValues(["x ~[b]", "y"], [1, 2]),
+                       "~[b]": ["z"]})
+
+
+def test_expand_compiled(tmpdir):
+    input_path = str(tmpdir.join("config.txt"))
+    with open(input_path, mode='w') as config_file:
+        config_file.write("\n\n".join("\n    ".join(paragraph)
+                                      for paragraph in paragraphs) + "\n")
+    compiled = load_compiled(compile_config(input_path))
+    assert compiled == populate_entry_dicts(paragraphs)
+    # only the values flagged as nested at compile time are scanned
+    intents, entities, aliases = compiled
+    assert not aliases["~[please]"].nested
+    assert not aliases["~[size]"].nested
+    assert isinstance(aliases["~[give]"], list)
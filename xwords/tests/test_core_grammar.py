@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_grammar.py
+    Description : checking grammars shared by parsing and generation
+    Python Version : 3.6
+"""
+
+import pickle
+import pytest
+from xwords.core_grammar import Grammar, get_grammar, DEFAULT_GRAMMAR
+from xwords.core_parse import populate_entry_dicts
+from xwords.core_constraints import parse_constraints
+from xwords.core_process import iter_sentences, generate_utter_actions
+from xwords.utils import remove_grammar
+
+
+def test_default_grammar():
+    assert get_grammar() is DEFAULT_GRAMMAR
+    assert get_grammar(["%", "@", "~", "&"]) == DEFAULT_GRAMMAR
+    assert Grammar.from_keywords(["@", "~", "&", "!"]) == DEFAULT_GRAMMAR
+    assert DEFAULT_GRAMMAR.strip("@[city]") == "city"
+    assert DEFAULT_GRAMMAR.placeholders("~[buy] @[city] in @[city]") == \
+        ["~[buy]", "@[city]", "@[city]"]
+    assert DEFAULT_GRAMMAR.is_entity("@[city]")
+    assert not DEFAULT_GRAMMAR.is_entity("~[buy]")
+
+
+def test_grammar_compiled_once():
+    assert get_grammar(["%", "$", "~", "&"]) is \
+        get_grammar(("%", "$", "~", "&"))
+    grammar = Grammar(["%", "$", "~"])
+    assert get_grammar(grammar) is grammar
+    assert pickle.loads(pickle.dumps(grammar)) == grammar
+    with pytest.raises(ValueError):
+        Grammar(["%", "$"])
+
+
+def test_custom_grammar():
+    grammar = Grammar.from_keywords(["$", "~", "&", "?"])
+    constraints_dic = dict()
+    intents, entities, aliases = populate_entry_dicts(
+        [["$[city]", "Paris", "Rome"], ["~[go]", "go", "travel"],
+         ["?[never]", "$[city] = Rome, ~[go] = travel"],
+         ["Please ~[go] to $[city]"]], grammar, constraints_dic=constraints_dic)
+    assert list(entities) == ["$[city]"]
+    constraints = parse_constraints(constraints_dic, grammar)
+    assert constraints == [[("$[city]", "Rome"), ("~[go]", "travel")]]
+    assert list(iter_sentences(intents, entities, aliases, grammar=grammar,
+                               constraints=constraints)) == \
+        ["Please go to [Paris](city)", "Please go to [Rome](city)",
+         "Please travel to [Paris](city)"]
+    assert generate_utter_actions(entities, grammar) == \
+        {"$[city]": "utter_ask_city"}
+    assert remove_grammar("$[city]", grammar) == "city"
@@ -9,8 +9,10 @@
     Python Version : 3.6
 """
 
+import os
+import random
 import pytest
-from xwords.core_output import generate
+from xwords.core_output import generate, training_selector
 
 input_path = "./xwords/tests/input_test.txt"
 input_path_empty = "./xwords/tests/input_empty.txt"
@@ -93,6 +95,14 @@ def test_generate_story(output_file_story):
         assert sum((1 for line in generated_file if line[0:2] == "##")) == 100
 
 
+# testing the default intent of stories, the name of the config file
+def test_generate_story_intent(output_file_story):
+    with open(output_file_story, 'r') as generated_file:
+        stories = generated_file.read()
+    assert "\n* input_test{" in stories
+    assert "    - action_input_test\n" in stories
+
+
 # testing number of lines returned
 def test_generate_testset(output_file_testset):
     with open(output_file_testset, 'r') as generated_file:
@@ -103,3 +113,34 @@ def test_generate_testset(output_file_testset):
 def test_generate_story_teset(output_file_story_testset):
     with open(output_file_story_testset, 'r') as generated_file:
         assert sum((1 for line in generated_file if line[0:2] == "##")) == 70
+
+
+# testing counts reported without writing files
+def test_generate_dry_run(tmpdir):
+    report = generate(input_path, output_path=str(tmpdir), dry_run=True)
+    assert report["total"] == 684
+    assert not os.path.exists(str(tmpdir) + "training.md")
+
+
+# testing explosion guard
+def test_generate_max_combinations(tmpdir):
+    with pytest.raises(ValueError):
+        generate(input_path, output_path=str(tmpdir), max_combinations=100)
+
+
+# testing single pass training/testing split
+def test_training_selector_exact():
+    is_training = training_selector(.7, "exact", 1000, random.Random(0))
+    assert sum(is_training(str(k)) for k in range(1000)) == 700
+
+
+def test_training_selector_hash():
+    is_training = training_selector(.5, "hash")
+    flags = [is_training(str(k)) for k in range(1000)]
+    assert flags == [is_training(str(k)) for k in range(1000)]
+    assert 400 < sum(flags) < 600
+
+
+def test_training_selector_bernoulli():
+    is_training = training_selector(.5, "bernoulli", rng=random.Random(0))
+    assert 400 < sum(is_training(str(k)) for k in range(1000)) < 600
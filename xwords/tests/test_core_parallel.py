@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_parallel.py
+    Description : checking generation spread across processes
+    Python Version : 3.6
+"""
+
+import random
+import pytest
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_process import iter_sentences
+from xwords.core_parallel import (iter_parallel_sentences, iter_parallel_stories,
+                                  shard_range)
+from xwords.core_output import generate
+
+input_path = "./xwords/tests/input_test.txt"
+lines_cleaned = parse_input(input_path)
+intents, entities, aliases = populate_entry_dicts(lines_cleaned)
+
+
+def test_parallel_sentences_full():
+    assert list(iter_parallel_sentences(intents, entities, aliases,
+                                        workers=2)) == \
+        list(iter_sentences(intents, entities, aliases))
+
+
+def test_parallel_sentences_n_sub():
+    assert list(iter_parallel_sentences(intents, entities, aliases, n_sub=50,
+                                        workers=2, seed=3)) == \
+        list(iter_sentences(intents, entities, aliases, n_sub=50,
+                            rng=random.Random(3)))
+
+
+def test_parallel_stories_reproducible():
+    stories = list(iter_parallel_stories("acquisition", entities, 1500,
+                                         workers=1, seed=7))
+    assert len(stories) == 1500
+    assert list(iter_parallel_stories("acquisition", entities, 1500,
+                                      workers=3, seed=7)) == stories
+
+
+def test_generate_workers(tmpdir_factory):
+    outputs = list()
+    for workers in (1, 2):
+        fn = str(tmpdir_factory.mktemp('output'))
+        generate(input_path, output_path=fn, training_ratio=.7, n_sub=100,
+                 workers=workers, seed=11)
+        with open(fn + 'training.md') as training_file, \
+                open(fn + 'testing.md') as testing_file:
+            outputs.append((training_file.read(), testing_file.read()))
+    assert outputs[0] == outputs[1]
+
+
+def test_shard_range():
+    ranges = [shard_range(10, shard, 3) for shard in range(3)]
+    assert ranges == [(0, 3), (3, 6), (6, 10)]
+    assert shard_range(10) == (0, 10)
+    with pytest.raises(ValueError):
+        shard_range(10, 3, 3)
+
+
+def test_parallel_sentences_shards():
+    for n_sub in (None, 50):
+        shards = [list(iter_parallel_sentences(intents, entities, aliases,
+                                               n_sub, seed=3, shard=shard,
+                                               num_shards=4))
+                  for shard in range(4)]
+        assert sum(shards, []) == list(iter_parallel_sentences(
+            intents, entities, aliases, n_sub, seed=3))
+
+
+def test_parallel_stories_shards():
+    shards = [list(iter_parallel_stories("acquisition", entities, 2500,
+                                         seed=7, shard=shard, num_shards=3))
+              for shard in range(3)]
+    assert sum(shards, []) == list(iter_parallel_stories(
+        "acquisition", entities, 2500, seed=7))
+
+
+def test_generate_shards(tmpdir_factory):
+    for options in ({"n_sub": 100, "intent_string": "acquisition"},
+                    {"for_story": True, "n_sub": 1200, "intent_string": "buy"},
+                    {"training_ratio": .7, "split": "hash"}):
+        fn = str(tmpdir_factory.mktemp('output'))
+        generate(input_path, output_path=fn, seed=11, **options)
+        with open(fn + 'training.md') as training_file:
+            expected = training_file.read()
+        shards = ""
+        for shard in range(3):
+            generate(input_path, output_path=fn, seed=11, shard=shard,
+                     num_shards=3, **options)
+            with open(fn + 'training-%05d-of-00003.md' % shard) as shard_file:
+                shards += shard_file.read()
+        assert shards == expected
+
+
+def test_generate_shards_exact_split(tmpdir):
+    with pytest.raises(ValueError):
+        generate(input_path, output_path=str(tmpdir), training_ratio=.7,
+                 shard=0, num_shards=2)
@@ -10,7 +10,8 @@
 """
 
 import pytest
-from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_parse import (parse_input, populate_entry_dicts, parse_config,
+                               iter_paragraphs, ConfigError)
 
 lines_cleaned = parse_input("./xwords/tests/input_test.txt")
 intents, entities, aliases = populate_entry_dicts(lines_cleaned)
@@ -73,3 +74,29 @@ def test_populate_entry_dicts_a3():
 
 def test_populate_entry_dicts_a4():
     assert list(aliases.values())[0][1] == "possessors"
+
+
+def test_parse_config():
+    assert parse_config("./xwords/tests/input_test.txt") == \
+        (intents, entities, aliases)
+
+
+def test_iter_paragraphs_line_numbers():
+    assert [line_number for line_number, _
+            in iter_paragraphs("./xwords/tests/input_test.txt")] == \
+        [1, 5, 15, 24, 33]
+
+
+def test_parse_config_malformed_header(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("hello @[city]\n\n@[city]\n    paris\n\n@[city\n    rome\n")
+    with pytest.raises(ConfigError) as error:
+        parse_config(str(config))
+    assert error.value.line_number == 6
+
+
+def test_parse_config_no_value(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("hello ~[hi]\n\n~[hi]\n")
+    with pytest.raises(ConfigError, match="line 3"):
+        parse_config(str(config))
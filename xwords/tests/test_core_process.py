@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_process.py
+    Description : testing functions generating combinations
+    Python Version : 3.6
+"""
+
+import re
+import types
+import random
+from xwords.core_parse import parse_input, populate_entry_dicts
+from xwords.core_process import (count_sentences, iter_sentences,
+                                 generate_sentences, get_combination,
+                                 place_combinations, combination_report,
+                                 iter_stories)
+from xwords.core_weights import WeightedValues
+from xwords.utils import sample_indices, unrank
+
+lines_cleaned = parse_input("./xwords/tests/input_test.txt")
+intents, entities, aliases = populate_entry_dicts(lines_cleaned)
+
+
+def test_count_sentences():
+    assert count_sentences(intents, entities, aliases) == [12, 672]
+
+
+def test_iter_sentences_lazy():
+    assert isinstance(iter_sentences(intents, entities, aliases),
+                      types.GeneratorType)
+
+
+def test_iter_sentences_full():
+    sentences = list(iter_sentences(intents, entities, aliases))
+    assert sentences == generate_sentences(intents, entities, aliases)
+    assert len(sentences) == 684
+
+
+def test_iter_sentences_first():
+    first = next(iter_sentences(intents, entities, aliases))
+    assert first == "Total number of [birds](subject_filter) owners"
+
+
+def test_iter_sentences_n_sub():
+    sentences = list(iter_sentences(intents, entities, aliases, n_sub=10))
+    assert len(sentences) == 10
+
+
+def test_get_combination_matches_product_order():
+    replacement_dic = {**entities, **aliases}
+    full = place_combinations(intents[1], replacement_dic)
+    assert [get_combination(intents[1], replacement_dic, k)
+            for k in (0, 1, 7, 100, len(full) - 1)] == \
+        [full[k] for k in (0, 1, 7, 100, len(full) - 1)]
+
+
+def test_iter_sentences_n_sub_subset():
+    full = list(iter_sentences(intents, entities, aliases))
+    sentences = list(iter_sentences(intents, entities, aliases, n_sub=50))
+    assert len(set(sentences)) == 50
+    assert set(sentences) <= set(full)
+    # sampled sentences keep the order of the full enumeration
+    assert sentences == sorted(sentences, key=full.index)
+
+
+def test_sample_indices_large_population():
+    indices = sample_indices(10**30, 5)
+    assert len(set(indices)) == 5
+    assert all(0 <= k < 10**30 for k in indices)
+
+
+def test_unrank():
+    assert unrank(0, [2, 3]) == [0, 0]
+    assert unrank(4, [2, 3]) == [1, 1]
+
+
+def test_combination_report():
+    report = combination_report(intents, entities, aliases)
+    sentences = generate_sentences(intents, entities, aliases)
+    assert [intent["count"] for intent in report["intents"]] == [12, 672]
+    assert report["total"] == 684
+    assert report["bytes"] == sum(len(("- " + s + "\n").encode("utf-8"))
+                                  for s in sentences)
+
+
+def test_combination_report_n_sub():
+    report = combination_report(intents, entities, aliases, n_sub=10)
+    assert report["selected"] == 10
+
+
+def test_iter_stories():
+    weighted = dict(entities)
+    weighted["@[geo_filter]"] = WeightedValues(
+        entities["@[geo_filter]"],
+        [97.0] + [1.0] * (len(entities["@[geo_filter]"]) - 1))
+    stories = list(iter_stories("acquisition", weighted, 500,
+                                rng=random.Random(0)))
+    assert len(stories) == 500
+    for story in stories:
+        # each entity takes one value of the config, wherever it appears
+        slots = dict(re.findall(r"slot\{\"(\w+)\": \"([^\"]*)\"\}",
+                                story))
+        assert sorted(slots) == sorted(key[2:-1] for key in entities)
+        for name, value in slots.items():
+            assert value in entities["@[" + name + "]"]
+            assert story.count("\"" + name + "\": \"") in (2, 3)
+    favourite = "\"geo_filter\": \"" + entities["@[geo_filter]"][0] + "\""
+    assert sum(favourite in story for story in stories) > 450
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_shuffle.py
+    Description : checking shuffling through temporary run files
+    Python Version : 3.6
+"""
+
+import os
+import random
+import pytest
+from collections import Counter
+from xwords.core_shuffle import iter_shuffled, RemainingCounts
+from xwords.core_output import generate
+
+input_path = "./xwords/tests/input_test.txt"
+
+
+def test_remaining_counts():
+    remaining = RemainingCounts([3, 0, 2, 5])
+    assert [remaining.find(r) for r in range(10)] == \
+        [0, 0, 0, 2, 2, 3, 3, 3, 3, 3]
+    remaining.add(0, -3)
+    assert [remaining.find(r) for r in range(7)] == [2, 2, 3, 3, 3, 3, 3]
+
+
+def test_iter_shuffled(tmpdir):
+    records = ["sentence %d" % k for k in range(1000)]
+    shuffled = list(iter_shuffled(records, random.Random(1), 64, str(tmpdir)))
+    assert shuffled != records
+    assert sorted(shuffled) == sorted(records)
+    assert shuffled == list(iter_shuffled(records, random.Random(1), 64))
+    # run files are removed once merged
+    assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"),
+                    reason="counting open files needs /proc")
+def test_iter_shuffled_fan_in(tmpdir):
+    records = ["sentence %d" % k for k in range(1000)]
+    nb_open = len(os.listdir("/proc/self/fd"))
+    shuffled = iter_shuffled(records, random.Random(1), 10, str(tmpdir),
+                             fan_in=4)
+    first = next(shuffled)
+    # 100 runs merged 4 at a time, then at most 4 left open
+    assert len(os.listdir("/proc/self/fd")) - nb_open <= 4
+    run_dir, = os.listdir(str(tmpdir))
+    assert len(os.listdir(os.path.join(str(tmpdir), run_dir))) <= 4
+    assert sorted([first] + list(shuffled)) == sorted(records)
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_iter_shuffled_fan_in_uniform():
+    rng = random.Random(3)
+    firsts = Counter(next(iter_shuffled(range(5), rng, buffer_size=1,
+                                        fan_in=2))
+                     for _ in range(2000))
+    assert all(320 < firsts[k] < 480 for k in range(5))
+
+
+def test_iter_shuffled_in_memory():
+    records = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+    assert sorted(iter_shuffled(records, random.Random(0)),
+                  key=lambda record: record["text"]) == records
+
+
+def test_iter_shuffled_uniform():
+    rng = random.Random(2)
+    firsts = Counter(next(iter_shuffled(range(4), rng, buffer_size=2))
+                     for _ in range(4000))
+    assert all(900 < firsts[k] < 1100 for k in range(4))
+
+
+def test_generate_shuffle(tmpdir_factory):
+    outputs = list()
+    for shuffle in (False, True):
+        fn = str(tmpdir_factory.mktemp('output'))
+        generate(input_path, output_path=fn, intent_string="acquisition",
+                 shuffle=shuffle, seed=5)
+        with open(fn + 'training.md') as training_file:
+            outputs.append(training_file.read().splitlines())
+    assert outputs[0][0] == outputs[1][0] == "## intent:acquisition"
+    assert outputs[0] != outputs[1]
+    assert sorted(outputs[0]) == sorted(outputs[1])
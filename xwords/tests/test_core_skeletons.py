@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_skeletons.py
+    Description : checking the enumeration of every distinct story
+    Python Version : 3.6
+"""
+
+import random
+import pytest
+from xwords import core_skeletons
+from xwords.core_output import generate
+from xwords.core_batch import iter_batch_stories
+from xwords.core_process import iter_stories
+from xwords.core_skeletons import StorySkeletons, StorySpace, count_stories
+
+entities_dic = {"@[geo]": ["France", "US"], "@[time]": ["today"],
+                "@[subject]": ["cats", "dogs", "birds"]}
+
+
+@pytest.mark.parametrize("nb_entities,count", [(0, 1), (1, 2), (3, 16),
+                                                (5, 326)])
+def test_skeleton_count(nb_entities, count):
+    assert len(StorySkeletons(nb_entities)) == count
+
+
+def test_skeletons_distinct():
+    skeletons = list(StorySkeletons(4))
+    assert len(set(skeletons)) == len(skeletons)
+    for inputs, asked in skeletons:
+        assert sorted(inputs + asked) == [0, 1, 2, 3]
+
+
+def test_skeletons_story_structure():
+    # entities given first in any order, the others asked in config order
+    skeletons = list(StorySkeletons(3))
+    assert ((2, 0), (1,)) in skeletons
+    assert all(list(asked) == sorted(asked) for _, asked in skeletons)
+
+
+def test_story_space_generated_stories():
+    # the distinct stories are the ones the story generators draw from
+    single_values = {key: values[:1] for key, values in entities_dic.items()}
+
+    def bodies(stories):
+        return {story.partition("\n")[2] for story in stories}
+
+    space = bodies(StorySpace("acquisition", single_values).iter_range())
+    assert len(space) == 16
+    assert bodies(iter_batch_stories("acquisition", single_values, 2000,
+                                     seed=0)) == space
+    assert bodies(iter_stories("acquisition", single_values, 2000,
+                               rng=random.Random(0))) == space
+
+
+def test_skeleton_unrank(monkeypatch):
+    expected = list(StorySkeletons(5))
+    # above the cache size, skeletons are decoded from their index
+    monkeypatch.setattr(core_skeletons, "SKELETON_CACHE_SIZE", 0)
+    skeletons = StorySkeletons(5)
+    assert [skeletons[k] for k in range(len(skeletons))] == expected
+    assert skeletons[-1] == expected[-1]
+
+
+def test_story_space():
+    space = StorySpace("acquisition", entities_dic)
+    assert len(space) == count_stories(entities_dic) == 16 * 6
+    stories = list(space.iter_range())
+    assert len(set(stories)) == len(stories)
+    assert stories[0] == ("## Generated Story 0\n"
+                          "* acquisition{}\n"
+                          "    - utter_ask_geo\n"
+                          "* acquisition{\"geo\": \"France\"}\n"
+                          "    - slot{\"geo\": \"France\"}\n"
+                          "    - utter_ask_time\n"
+                          "* acquisition{\"time\": \"today\"}\n"
+                          "    - slot{\"time\": \"today\"}\n"
+                          "    - utter_ask_subject\n"
+                          "* acquisition{\"subject\": \"cats\"}\n"
+                          "    - slot{\"subject\": \"cats\"}\n"
+                          "    - action_acquisition\n")
+    assert space[37] == stories[37]
+
+
+def test_story_space_sample():
+    space = StorySpace("acquisition", entities_dic)
+    sample = list(space.sample(40, random.Random(0)))
+    assert len(set(sample)) == 40
+    assert set(sample) <= set(space.iter_range())
+    assert len(list(space.sample(1000))) == len(space)
+
+
+def test_generate_distinct_stories(tmpdir):
+    report = generate("./xwords/tests/input_test.txt", str(tmpdir),
+                      "acquisition", for_story=True, n_sub=None,
+                      dry_run=True)
+    assert report["total"] == report["selected"] == 16 * 8 * 7 * 6
+    report = generate("./xwords/tests/input_test.txt", str(tmpdir),
+                      "acquisition", for_story=True, n_sub=50,
+                      distinct_stories=True, dry_run=True)
+    assert report["selected"] == 50
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_sources.py
+    Description : checking entity values read from outside the config file
+    Python Version : 3.6
+"""
+
+import pickle
+import pytest
+from xwords.core_parse import parse_config, ConfigError
+from xwords.core_process import iter_sentences
+from xwords.core_sources import FileValues, parse_source
+from xwords.core_compile import compile_config, load_compiled
+from xwords.core_template import SentenceTemplate, FormattedValues
+
+
+@pytest.fixture
+def config_path(tmpdir):
+    tmpdir.join("cities.txt").write("paris\r\ntel aviv\n\n  london\nrio")
+    config = tmpdir.join("config.txt")
+    config.write("weather in @[city] ~[when]\n\n"
+                 "@[city] <file:cities.txt>\n\n"
+                 "~[when]\n    today\n    tomorrow\n")
+    return str(config)
+
+
+def test_file_values(config_path):
+    cities = parse_config(config_path)[1]["@[city]"]
+    assert isinstance(cities, FileValues)
+    assert len(cities) == 4
+    assert list(cities) == ["paris", "tel aviv", "london", "rio"]
+    assert cities[-1] == "rio"
+    assert pickle.loads(pickle.dumps(cities)) == cities
+
+
+def test_file_values_sentences(config_path):
+    intents, entities, aliases = parse_config(config_path)
+    sentences = list(iter_sentences(intents, entities, aliases))
+    assert len(sentences) == 8
+    assert sentences[3] == "weather in [tel aviv](city) tomorrow"
+    assert len(list(iter_sentences(intents, entities, aliases, n_sub=3))) == 3
+
+
+def test_file_values_formatted_lazily(config_path):
+    intents, entities, aliases = parse_config(config_path)
+    template = SentenceTemplate(intents[0], {**entities, **aliases})
+    assert isinstance(template.values[0], FormattedValues)
+    assert template[7] == "weather in [rio](city) tomorrow"
+
+
+def test_file_values_missing(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("hi @[city]\n\n@[city] <file:missing.txt>\n")
+    with pytest.raises(ConfigError, match="line 3"):
+        parse_config(str(config))
+
+
+def test_file_values_compiled(config_path):
+    entities = load_compiled(compile_config(config_path))[1]
+    assert isinstance(entities["@[city]"], FileValues)
+    assert entities["@[city]"][1] == "tel aviv"
+
+
+def test_range_values():
+    party_size = parse_source("<range:1..500>")
+    assert len(party_size) == 500
+    assert (party_size[0], party_size[-1]) == ("1", "500")
+    assert list(parse_source("<range:10..0:-5>")) == ["10", "5", "0"]
+
+
+def test_date_values():
+    days = parse_source("<date:2018-12-30..2019-01-02>")
+    assert list(days) == ["2018-12-30", "2018-12-31", "2019-01-01",
+                          "2019-01-02"]
+    assert parse_source("<date:2018-01-01..2018-12-31:%d/%m>")[31] == "01/02"
+
+
+def test_pattern_values():
+    booking_id = parse_source("<pattern:ID-[0-9]{3}[AB]>")
+    assert len(booking_id) == 2000
+    assert (booking_id[0], booking_id[1], booking_id[-1]) == \
+        ("ID-000A", "ID-000B", "ID-999B")
+
+
+def test_generated_values_sentences(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("table for @[party_size] on @[day]\n\n"
+                 "@[party_size] <range:1..1000000>\n\n"
+                 "@[day] <date:2018-01-01..2018-12-31>\n")
+    intents, entities, aliases = parse_config(str(config))
+    sentences = list(iter_sentences(intents, entities, aliases, n_sub=5))
+    assert len(sentences) == 5
+    template = SentenceTemplate(intents[0], entities)
+    assert len(template) == 365 * 10**6
+    assert next(iter(template)) == \
+        "table for [1](party_size) on [2018-01-01](day)"
+    assert load_compiled(compile_config(str(config)))[1] == entities
+
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        parse_source("<zip:codes>")
+
+
+def test_generated_values_last_placeholder(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("x @[c] @[n]\n\n@[c]\n    a\n    b\n\n@[n] <range:1..3>\n")
+    intents, entities, aliases = parse_config(str(config))
+    sentences = ["x [" + c + "](c) [" + n + "](n)"
+                 for c in "ab" for n in "123"]
+    assert list(iter_sentences(intents, entities, aliases)) == sentences
+    template = SentenceTemplate(intents[0], entities)
+    assert list(template.iter_range(2, 5)) == sentences[2:5]
+    assert [e["text"] for e in template.iter_range(annotated=True)] == \
+        ["x " + c + " " + n for c in "ab" for n in "123"]
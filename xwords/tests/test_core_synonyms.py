@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_synonyms.py
+    Description : checking the hierarchy of indented values
+    Python Version : 3.6
+"""
+
+import pickle
+import pytest
+from xwords.core_parse import parse_config, parse_input, populate_entry_dicts
+from xwords.core_compile import compile_config, load_compiled
+from xwords.core_process import iter_sentences
+from xwords.core_template import SentenceTemplate
+from xwords.core_output import generate
+from xwords.core_synonyms import (SynonymTree, SynonymValues, ROOT,
+                                  indent_parents, apply_synonyms)
+
+input_path = "./xwords/tests/input_test.txt"
+intents, entities, aliases = parse_config(input_path)
+
+
+def test_indent_parents():
+    assert indent_parents([4, 4, 8, 12, 8, 4, 8]) == \
+        [ROOT, ROOT, 1, 2, 1, ROOT, 5]
+
+
+def test_synonym_tree():
+    tree = SynonymTree([ROOT, ROOT, 1, 2, 1, ROOT, 5])
+    assert list(tree.canonical_positions()) == [0, 1, 5]
+    assert [tree.canonical(k) for k in range(7)] == [0, 1, 1, 1, 1, 5, 5]
+    with pytest.raises(ValueError):
+        SynonymTree([0, ROOT])
+
+
+def test_parse_synonyms():
+    geo = entities["@[geo_filter]"]
+    assert geo == ["France", "Germany", "US", "United States", "America",
+                   "Canada", "Italy"]
+    assert list(geo.synonyms.parents) == [ROOT, ROOT, ROOT, 2, 2, ROOT,
+                                          ROOT]
+    assert pickle.loads(pickle.dumps(geo)).synonyms.offsets == \
+        geo.synonyms.offsets
+    # stripped lines keep no hierarchy
+    flat = populate_entry_dicts(parse_input(input_path))[1]
+    assert getattr(flat["@[geo_filter]"], "synonyms", None) is None
+    assert populate_entry_dicts(parse_input(input_path, keep_indent=True)) \
+        == (intents, entities, aliases)
+
+
+def test_compiled_synonyms(tmpdir):
+    config_path = str(tmpdir.join("config.txt"))
+    with open(input_path) as input_file, open(config_path, 'w') as config:
+        config.write(input_file.read())
+    compiled = load_compiled(compile_config(config_path))[1]
+    assert list(compiled["@[time_filter]"].synonyms.parents) == \
+        list(entities["@[time_filter]"].synonyms.parents)
+
+
+def test_synonyms_canonical():
+    canonical_entities, canonical_aliases = apply_synonyms(
+        entities, aliases, "canonical")
+    assert canonical_entities["@[geo_filter]"] == ["France", "Germany", "US",
+                                                   "Canada", "Italy"]
+    assert len(list(iter_sentences(intents, canonical_entities,
+                                   canonical_aliases))) < \
+        len(list(iter_sentences(intents, entities, aliases)))
+
+
+def test_synonyms_annotate():
+    annotated_entities, _ = apply_synonyms(entities, aliases, "annotate")
+    template = SentenceTemplate("in @[geo_filter]", annotated_entities)
+    assert list(template) == ["in [France](geo_filter)",
+                              "in [Germany](geo_filter)",
+                              "in [US](geo_filter)",
+                              "in [United States](geo_filter:US)",
+                              "in [America](geo_filter:US)",
+                              "in [Canada](geo_filter)",
+                              "in [Italy](geo_filter)"]
+    assert template.combination(4, annotated=True)["entities"] == \
+        [{"start": 3, "end": 10, "value": "US", "entity": "geo_filter"}]
+    weighted = SynonymValues(["US", "America"], [ROOT, 0], [2, 1])
+    assert apply_synonyms({"@[geo]": weighted}, {}, "canonical")[0] == \
+        {"@[geo]": ["US"]}
+
+
+def test_generate_synonyms(tmpdir):
+    fn = str(tmpdir) + "/"
+    generate(input_path, output_path=fn, intent_string="acquisition",
+             synonyms="annotate")
+    with open(fn + "training.md") as training_file:
+        assert "[America](geo_filter:US)" in training_file.read()
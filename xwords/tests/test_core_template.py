@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_template.py
+    Description : testing sentences compiled into templates
+    Python Version : 3.6
+"""
+
+import itertools
+from xwords.core_process import replace_in_str
+from xwords.core_template import SentenceTemplate
+
+replacement_dic = {"@[geo]": ["France", "US"],
+                   "~[owners]": ["owners", "possessors"],
+                   "@[time]": ["today", "this year", "LTD"]}
+sentence = "@[geo] ~[owners] in @[geo] %[unknown] @[time]"
+template = SentenceTemplate(sentence, replacement_dic)
+
+
+def replaced(combi):
+    sentence_mod = sentence
+    for key, value in zip(template.placeholders, combi):
+        sentence_mod = replace_in_str(sentence_mod, key, value)
+    return sentence_mod
+
+
+def test_template_placeholders():
+    assert template.placeholders == ["@[geo]", "~[owners]", "@[time]"]
+
+
+def test_template_len():
+    assert len(template) == 12
+
+
+def test_template_matches_replace():
+    expected = [replaced(combi) for combi in itertools.product(
+        *[replacement_dic[key] for key in template.placeholders])]
+    assert list(template) == expected
+
+
+def test_template_getitem():
+    assert template[5] == "[France](geo) possessors in [France](geo) " \
+                          "%[unknown] [LTD](time)"
+    assert template[-1] == list(template)[-1]
+
+
+def test_template_story():
+    story = SentenceTemplate("slot{@[geo]}", replacement_dic, for_story=True)
+    assert list(story) == ["slot{\"geo\": \"France\"}", "slot{\"geo\": \"US\"}"]
+
+
+def test_template_no_placeholder():
+    assert list(SentenceTemplate("hello", replacement_dic)) == ["hello"]
+
+
+def test_template_annotate():
+    example = template.combination(5, annotated=True)
+    assert example["text"] == "France possessors in France %[unknown] LTD"
+    assert example["entities"] == [
+        {"start": 0, "end": 6, "value": "France", "entity": "geo"},
+        {"start": 21, "end": 27, "value": "France", "entity": "geo"},
+        {"start": 39, "end": 42, "value": "LTD", "entity": "time"}]
+
+
+def test_template_iter_range():
+    assert list(template.iter_range(3, 9)) == list(template)[3:9]
+    assert [e["text"] for e in template.iter_range(10, annotated=True)] == \
+        [template.combination(k, True)["text"] for k in (10, 11)]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_weights.py
+    Description : checking weighted entity values and alias tables
+    Python Version : 3.6
+"""
+
+import pickle
+import random
+import collections
+import pytest
+from xwords.core_parse import parse_config, ConfigError
+from xwords.core_process import iter_sentences
+from xwords.core_compile import compile_config, load_compiled
+from xwords.core_template import SentenceTemplate
+from xwords.core_weights import split_weight, AliasTable, WeightedValues, \
+    sample_weighted_indices
+
+
+@pytest.fixture
+def config_path(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("sales of @[time_filter] in ~[place]\n\n"
+                 "@[time_filter]\n    this month  ^8\n    this year ^1.5\n"
+                 "    since beginning of fiscal year\n\n"
+                 "~[place]\n    paris\n    rome\n")
+    return str(config)
+
+
+def test_split_weight():
+    assert split_weight("this month  ^5") == ("this month", 5.0)
+    assert split_weight("this year ^.5") == ("this year", 0.5)
+    assert split_weight("this month") == ("this month", None)
+    assert split_weight("x^5") == ("x^5", None)
+
+
+def test_alias_table():
+    weights = [1, 0, 3, 6]
+    table = AliasTable(weights)
+    rng = random.Random(0)
+    draws = collections.Counter(table.draw(rng) for _ in range(100000))
+    assert draws[1] == 0
+    for i, weight in enumerate(weights):
+        assert abs(draws[i] / 100000 - weight / 10) < 0.01
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_parse_weighted_values(config_path):
+    entities, aliases = parse_config(config_path)[1:]
+    values = entities["@[time_filter]"]
+    assert isinstance(values, WeightedValues)
+    assert values == ["this month", "this year",
+                      "since beginning of fiscal year"]
+    assert values.weights == [8.0, 1.5, 1.0]
+    assert aliases["~[place]"] == ["paris", "rome"]
+    assert pickle.loads(pickle.dumps(values)).weights == values.weights
+
+
+def test_parse_zero_weight(tmpdir):
+    config = tmpdir.join("config.txt")
+    config.write("hi @[x]\n\n@[x]\n    a ^0\n    b\n")
+    with pytest.raises(ConfigError, match="line 3"):
+        parse_config(str(config))
+
+
+def test_weighted_choice(config_path):
+    entities = parse_config(config_path)[1]
+    template = SentenceTemplate("@[time_filter]", entities, True)
+    rng = random.Random(1)
+    draws = collections.Counter(template.choice(rng) for _ in range(10500))
+    assert draws['"time_filter": "this month"'] > \
+        5 * draws['"time_filter": "since beginning of fiscal year"']
+
+
+def test_weighted_sampling(config_path):
+    intents, entities, aliases = parse_config(config_path)
+    draws = collections.Counter()
+    for seed in range(300):
+        sample = list(iter_sentences(intents, entities, aliases, n_sub=1,
+                                     rng=random.Random(seed)))
+        assert len(sample) == 1
+        draws[sample[0].split("](")[0]] += 1
+    assert draws["sales of [this month"] > 150
+    sample = list(iter_sentences(intents, entities, aliases, n_sub=5,
+                                 rng=random.Random(0)))
+    assert len(set(sample)) == 5
+    assert sample == sorted(sample, key=list(iter_sentences(
+        intents, entities, aliases)).index)
+
+
+def test_skewed_weighted_sampling():
+    # the heavy value is drawn again and again, rejected draws are bounded
+    values = WeightedValues([str(k) for k in range(9)], [1e6] + [1] * 8)
+    template = SentenceTemplate("x @[a]", {"@[a]": values})
+    for seed in range(5):
+        indices = sample_weighted_indices([template], 8, random.Random(seed))
+        assert len(set(indices)) == 8
+        assert indices == sorted(indices)
+        assert 0 in indices
+
+def test_compiled_weights(config_path):
+    entities = load_compiled(compile_config(config_path))[1]
+    values = entities["@[time_filter]"]
+    assert list(values.weights) == [8.0, 1.5, 1.0]
+    assert list(pickle.loads(pickle.dumps(values)).weights) == \
+        [8.0, 1.5, 1.0]
+    assert values.alias_table.total == 10.5
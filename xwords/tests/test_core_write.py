@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    File name : test_core_write.py
+    Description : checking buffered writers and output formats
+    Python Version : 3.6
+"""
+
+import bz2
+import gzip
+import json
+import lzma
+import pytest
+from xwords.core_write import SentenceWriter
+from xwords.core_output import generate
+
+input_path = "./xwords/tests/input_test.txt"
+sentences = ["hello [Paris](city)", "bonjour"]
+
+
+@pytest.mark.parametrize("compression,opener", [(None, open),
+                                                ("gzip", gzip.open),
+                                                ("bz2", bz2.open),
+                                                ("lzma", lzma.open)])
+def test_writer_compression(tmpdir, compression, opener):
+    with SentenceWriter(str(tmpdir.join("out.md")), "greet",
+                        compression=compression, buffer_lines=1) as writer:
+        for s in sentences:
+            writer.write(s)
+    with opener(writer.name, mode='rt') as output_file:
+        assert output_file.read() == "## intent:greet\n- hello [Paris](city)\n" \
+                                     "- bonjour\n"
+
+
+def test_writer_jsonl(tmpdir):
+    with SentenceWriter(str(tmpdir.join("out.jsonl")), "greet",
+                        output_format="jsonl") as writer:
+        for s in sentences:
+            writer.write(s)
+    with open(writer.name) as output_file:
+        documents = [json.loads(line) for line in output_file]
+    assert documents == [{"text": s, "intent": "greet"} for s in sentences]
+    assert writer.count == 2
+
+
+def test_generate_jsonl_gzip(tmpdir):
+    generate(input_path, output_path=str(tmpdir), output_format="jsonl",
+             compression="gzip")
+    with gzip.open(str(tmpdir) + "training.jsonl.gz", mode='rt') as output_file:
+        assert sum(1 for line in output_file) == 684
+
+
+def test_generate_rasa_json(tmpdir):
+    generate(input_path, output_path=str(tmpdir), intent_string="count",
+             training_ratio=.7, output_format="rasa_json", workers=2)
+    examples = list()
+    for file_name in ("training.json", "testing.json"):
+        with open(str(tmpdir) + file_name) as output_file:
+            examples.extend(json.load(output_file)["rasa_nlu_data"]
+                            ["common_examples"])
+    assert len(examples) == 684
+    for example in examples:
+        assert example["intent"] == "count"
+        for entity in example["entities"]:
+            assert example["text"][entity["start"]:entity["end"]] == \
+                entity["value"]
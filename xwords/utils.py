@@ -9,6 +9,11 @@
     Python Version : 3.6
 """
 
+import sys
+import json
+import random
+from .core_grammar import get_grammar
+
 
 def unique(sequence):
     """
@@ -42,15 +47,116 @@ def remove_grammar(element, grammar=None):
     element:
         element to remove any grammar keyword from
     grammar:
-        list of keywords signaling configuration structure
-        (entities, aliases, intents)
+        core_grammar.Grammar, or list of keywords signaling configuration
+        structure (entities, aliases, intents)
 
     Returns
     -------
         element cleaned from any grammar keyword
 
     """
-    if grammar is None:
-        grammar = ["%", "@", "~", "&"]
-    reg = "[" + "".join(grammar) + "]"
-    return str.strip(element, reg)
+    return get_grammar(grammar).strip(element)
+
+
+def sample_indices(population_size, k, rng=None):
+    """
+    Summary
+    ----------
+    Drawing k distinct indices uniformly from range(population_size) without
+    building the population, in O(k) time and memory
+
+    Parameters
+    ----------
+    population_size:
+        number of indices to draw from
+    k:
+        number of indices to draw, lower than or equal to population_size
+    rng:
+        random.Random instance to draw with. If None, uses the random module
+
+    Returns
+    -------
+        sorted list of k distinct indices
+
+    """
+    if rng is None:
+        rng = random
+    if population_size <= sys.maxsize:
+        # random.sample only enumerates ranges whose size it can take len of
+        return sorted(rng.sample(range(population_size), k))
+    selected = set()
+    while len(selected) < k:
+        selected.add(rng.randrange(population_size))
+    return sorted(selected)
+
+
+def unrank(index, cardinalities):
+    """
+    Summary
+    ----------
+    Decoding a combination index into one position per dimension, following
+    the order of itertools.product (last dimension varies fastest)
+
+    Parameters
+    ----------
+    index:
+        integer in range(product of cardinalities)
+    cardinalities:
+        list of the number of values of each dimension
+
+    Returns
+    -------
+        list of positions, one for each dimension
+
+    """
+    positions = [0] * len(cardinalities)
+    for i in range(len(cardinalities) - 1, -1, -1):
+        index, positions[i] = divmod(index, cardinalities[i])
+    return positions
+
+
+def rank(positions, cardinalities):
+    """
+    Summary
+    ----------
+    Encoding one position per dimension into a combination index, the
+    inverse of unrank
+
+    Parameters
+    ----------
+    positions:
+        list of positions, one for each dimension
+    cardinalities:
+        list of the number of values of each dimension
+
+    Returns
+    -------
+        integer in range(product of cardinalities)
+
+    """
+    index = 0
+    for position, cardinality in zip(positions, cardinalities):
+        index = index * cardinality + position
+    return index
+
+
+def record_key(record):
+    """
+    Summary
+    ----------
+    Encoding a generated sentence, story or annotated example into stable
+    bytes, for hashing
+
+    Parameters
+    ----------
+    record:
+        string, or dictionary for annotated examples
+
+    Returns
+    -------
+        UTF-8 encoded bytes
+
+    """
+    if isinstance(record, str):
+        return record.encode("utf-8")
+    return json.dumps(record, sort_keys=True).encode("utf-8")